@@ -0,0 +1,133 @@
+"""
+Shared cache helpers on top of Django's default cache (Redis outside of tests).
+
+Keys are namespaced and versioned as  <namespace>:v<KEY_VERSION>:<part>:<part>...
+so changing the shape of a cached value only needs a KEY_VERSION bump.
+
+Tags give group invalidation without scanning keys: every tag has a generation
+token, each entry remembers the generations of its tags when it was written,
+and `invalidate_tags("course:<guid>")` swaps the token so every entry derived
+from that course misses on its next read.
+
+`get_or_set` also protects against stampedes: entries are recomputed slightly
+before they expire by a single lucky caller (probabilistic early expiration),
+instead of by every worker at once when the key disappears.
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache as backend
+
+# Bump to orphan every key written by older code
+KEY_VERSION = 2
+
+DEFAULT_TIMEOUT = 300
+
+
+def make_key(namespace, key):
+    parts = key if isinstance(key, (list, tuple)) else (key,)
+    return ":".join([namespace, f"v{KEY_VERSION}", *(str(part) for part in parts)])
+
+
+def tag(*parts):
+    """tag('course', guid) -> 'course:<guid>'"""
+    return ":".join(str(part) for part in parts)
+
+
+def _tag_key(name):
+    return f"tag:{name}"
+
+
+def _tag_versions(tags):
+    """Current generation token of each tag, creating missing ones."""
+    if not tags:
+        return {}
+    keys = {name: _tag_key(name) for name in tags}
+    found = backend.get_many(list(keys.values()))
+    versions = {}
+    for name, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            backend.add(key, time.time_ns(), None)
+            version = backend.get(key)
+        versions[name] = version
+    return versions
+
+
+def invalidate_tags(*tags):
+    """Invalidate every entry written with any of these tags."""
+    for name in tags:
+        backend.set(_tag_key(name), time.time_ns(), None)
+
+
+def _is_fresh(entry):
+    if not isinstance(entry, dict) or "value" not in entry:
+        return False
+    tags = entry.get("tags") or {}
+    return _tag_versions(list(tags)) == tags
+
+
+def get(namespace, key, default=None):
+    entry = backend.get(make_key(namespace, key))
+    if _is_fresh(entry):
+        return entry["value"]
+    return default
+
+
+def _store(namespace, key, value, timeout, tag_versions, compute_time=0.0):
+    entry = {
+        "value": value,
+        "tags": tag_versions,
+        "expires_at": time.time() + timeout if timeout else None,
+        "compute_time": compute_time,
+    }
+    backend.set(make_key(namespace, key), entry, timeout)
+
+
+def set(namespace, key, value, timeout=DEFAULT_TIMEOUT, tags=()):
+    _store(namespace, key, value, timeout, _tag_versions(list(tags)))
+
+
+def get_many(namespace, keys):
+    """{key: value} for the keys with a fresh entry, read in one round trip."""
+    cache_keys = {make_key(namespace, key): key for key in keys}
+    found = backend.get_many(list(cache_keys))
+    return {cache_keys[cache_key]: entry["value"] for cache_key, entry in found.items() if _is_fresh(entry)}
+
+
+def set_many(namespace, values, timeout=DEFAULT_TIMEOUT, tags=()):
+    """Store every {key: value} pair in one round trip."""
+    tag_versions = _tag_versions(list(tags))
+    expires_at = time.time() + timeout if timeout else None
+    backend.set_many({
+        make_key(namespace, key): {"value": value, "tags": tag_versions, "expires_at": expires_at, "compute_time": 0.0}
+        for key, value in values.items()
+    }, timeout)
+
+
+def delete(namespace, key):
+    backend.delete(make_key(namespace, key))
+
+
+def _should_recompute_early(entry, beta):
+    """XFetch: the closer to expiry and the slower the computation, the likelier a refresh."""
+    expires_at = entry.get("expires_at")
+    if not expires_at or not beta:
+        return False
+    compute_time = entry.get("compute_time") or 0.0
+    return time.time() - compute_time * beta * math.log(random.random() or 1e-12) >= expires_at
+
+
+def get_or_set(namespace, key, compute, timeout=DEFAULT_TIMEOUT, tags=(), beta=1.0):
+    """Return the cached value or compute, store and return it."""
+    entry = backend.get(make_key(namespace, key))
+    if _is_fresh(entry) and not _should_recompute_early(entry, beta):
+        return entry["value"]
+
+    # Snapshot tag generations first so an invalidation during compute() is not masked
+    tag_versions = _tag_versions(list(tags))
+    started = time.monotonic()
+    value = compute()
+    _store(namespace, key, value, timeout, tag_versions, time.monotonic() - started)
+    return value
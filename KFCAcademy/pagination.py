@@ -0,0 +1,144 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on the ordering columns instead of using OFFSET,
+    so every page costs the same no matter how deep the client scrolls.
+
+    Views order on ('-created_at', '-id') unless they set `pagination_ordering`.
+    The last column must be unique (normally `id`) so that rows sharing a
+    timestamp are neither skipped nor repeated.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = tuple(getattr(view, 'pagination_ordering', None) or self.ordering)
+        self.page_size = self.get_page_size(request, view)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request, view=None):
+        page_size = getattr(view, 'page_size', None) or api_settings.PAGE_SIZE or 20
+        max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 100)
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, page_size))
+        except (TypeError, ValueError):
+            pass
+        return max(1, min(page_size, max_page_size))
+
+    def seek_filter(self, position):
+        """(a, b, c) > (x, y, z) expanded per column so mixed directions work."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def encode_cursor(self, row):
+        """Cursor for the page that starts right after `row` (a model instance or a values() dict)."""
+        position = [
+            self._encode_value(row[field.lstrip('-')] if isinstance(row, dict) else getattr(row, field.lstrip('-')))
+            for field in self.ordering
+        ]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, queryset=None):
+        """
+        The position encoded in the request's cursor. With a queryset, each value is also
+        checked against the type of its ordering column, so a tampered cursor is reported
+        as invalid instead of failing in the query.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+            position = [self._decode_value(value) for value in position]
+            if queryset is not None:
+                position = [
+                    self._check_value(queryset, field.lstrip('-'), value) for field, value in zip(self.ordering, position)
+                ]
+            return position
+        except (KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound('Invalid cursor')
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_cursor(),
+            'page_size': self.page_size,
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'page_size': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, datetime):
+            return {'dt': value.isoformat()}
+        if value is not None and not isinstance(value, (int, float, str, bool)):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _check_value(queryset, name, value):
+        """value converted to the python type of the `name` column (a model field or an annotation)."""
+        annotation = queryset.query.annotations.get(name)
+        try:
+            column = annotation.output_field if annotation is not None else queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError
+        if isinstance(value, datetime) != (column.get_internal_type() == 'DateTimeField'):
+            raise ValueError
+        return column.to_python(value)
+
+    @staticmethod
+    def _decode_value(value):
+        if isinstance(value, dict):
+            return datetime.fromisoformat(value['dt'])
+        return value
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import logging
 import django
 import os
+import sys
 import django.db.models.signals
 import sentry_sdk
 
@@ -130,6 +131,11 @@ CORS_EXPOSE_HEADERS = [
     'authorization',
     'x-total-count',
     'x-pagination-count',
+    # Resumable uploads
+    'location',
+    'upload-offset',
+    'upload-length',
+    'tus-resumable',
 ]
 
 # Allow common headers
@@ -146,12 +152,16 @@ CORS_ALLOW_HEADERS = [
     'access-control-allow-origin',
     'access-control-allow-headers',
     'access-control-allow-methods',
+    'upload-offset',
+    'upload-length',
+    'tus-resumable',
 ]
 
 # Allow common HTTP methods
 CORS_ALLOW_METHODS = [
     'DELETE',
     'GET',
+    'HEAD',
     'OPTIONS',
     'PATCH',
     'POST',
@@ -207,9 +217,14 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ),
-    'DEFAULT_SCHEMA_CLASS':'rest_framework.schemas.coreapi.AutoSchema'
+    'DEFAULT_SCHEMA_CLASS':'rest_framework.schemas.coreapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'KFCAcademy.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
+# Upper bound for the ?page_size= query parameter on paginated list endpoints
+PAGINATION_MAX_PAGE_SIZE = 100
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=2),
     'REFRESH_TOKEN_LIFETIME': timedelta(hours=2),
@@ -336,6 +351,21 @@ MINIO_STORAGE_ACCESS_KEY = os.getenv('MINIO_STORAGE_ACCESS_KEY', 'E3rFWEtLMSqk8g
 MINIO_STORAGE_SECRET_KEY = os.getenv('MINIO_STORAGE_SECRET_KEY', 'LGkzHNF8kNthtM47ScDalgGiPIG02G0o1B4jdaRq')
 MINIO_STORAGE_BUCKET_NAME = os.getenv('MINIO_STORAGE_BUCKET_NAME', 'kfc-academy')
 
+# Uploads are streamed to MinIO in parts of this size, so it bounds the memory one upload holds.
+# S3 multipart uploads need parts of at least 5 MiB.
+MINIO_UPLOAD_PART_SIZE = max(int(os.getenv('MINIO_UPLOAD_PART_SIZE', 10 * 1024 * 1024)), 5 * 1024 * 1024)
+
+# How long a direct upload URL (UploadSession) stays valid, in seconds
+UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', 60 * 60))
+# Resumable uploads may be picked up again for this long, in seconds
+RESUMABLE_UPLOAD_TTL = int(os.getenv('RESUMABLE_UPLOAD_TTL', 24 * 60 * 60))
+
+# Presigned download URLs are valid for PRESIGNED_URL_EXPIRY seconds and served from the
+# shared cache until PRESIGNED_URL_CACHE_MARGIN seconds before that, so clients never get
+# a URL that is about to lapse
+PRESIGNED_URL_EXPIRY = int(os.getenv('PRESIGNED_URL_EXPIRY', 60 * 60))
+PRESIGNED_URL_CACHE_MARGIN = int(os.getenv('PRESIGNED_URL_CACHE_MARGIN', 5 * 60))
+
 
 if DEBUG:
     MINIO_PUBLIC_ENDPOINT = 'kfc.uat.devligence.com/bucket'
@@ -381,6 +411,39 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = "json"
 
+# Shared cache, visible to every gunicorn worker and the Celery worker.
+# Lives next to the broker on its own Redis database; tests use local memory.
+TESTING = 'test' in sys.argv
+if TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_CACHE_URL', CELERY_BROKER_URL.rsplit('/', 1)[0] + '/1'),
+            'KEY_PREFIX': 'kfc',
+            'TIMEOUT': 300,
+        }
+    }
+
+# Module progress after quiz answers is recalculated by one debounced Celery task per
+# (user, module); tests recompute synchronously on commit instead (main/progress.py).
+PROGRESS_RECALC_ASYNC = not TESTING
+PROGRESS_RECALC_DEBOUNCE = int(os.environ.get('PROGRESS_RECALC_DEBOUNCE', 30))  # seconds
+
+# Quiz item analysis is cached per quiz and rebuilt by a debounced Celery task after new
+# answers; tests compute it on read instead (main/analytics.py).
+ITEM_ANALYSIS_ASYNC = not TESTING
+ITEM_ANALYSIS_DEBOUNCE = int(os.environ.get('ITEM_ANALYSIS_DEBOUNCE', 300))  # seconds
+
+# Files sent to UploadCourseResources are staged under MEDIA_ROOT and pushed to MinIO or
+# Cloudflare by one Celery task per upload; tests upload inline on commit (main/uploads.py).
+UPLOAD_JOBS_ASYNC = not TESTING
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
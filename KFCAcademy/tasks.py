@@ -159,4 +159,49 @@ def process_user_image(self, user_id):
         raise self.retry(exc=e)
 #     except Exception as e:
 #         print(f"[CELERY][ERROR] Failed to create StatusLog: {e}")
-#         self.retry(exc=e)
\ No newline at end of file
+#         self.retry(exc=e)
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def recalculate_module_progress(self, user_id, module_id):
+    """
+    Debounced module progress recalculation scheduled by main.progress.mark_dirty
+    """
+    from main.progress import recalculate_dirty
+
+    try:
+        return recalculate_dirty(user_id, module_id)
+    except Exception as e:
+        print(f"[CELERY] Error recalculating progress for user {user_id}, module {module_id}: {e}")
+        raise self.retry(exc=e)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def refresh_item_analysis(self, quiz_id):
+    """
+    Quiz item analysis rebuild queued by main.analytics.schedule_refresh (debounced) or request_refresh
+    """
+    from main.analytics import refresh_item_analysis as refresh
+
+    try:
+        analysis = refresh(quiz_id)
+        return {'quiz_id': quiz_id, 'respondents': analysis['respondents']}
+    except Exception as e:
+        print(f"[CELERY] Error refreshing item analysis for quiz {quiz_id}: {e}")
+        raise self.retry(exc=e)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def process_upload_job(self, job_id):
+    """
+    Push a file staged by UploadCourseResources to storage (main.uploads.process_job)
+    """
+    from main.uploads import fail_job, process_job
+
+    try:
+        return process_job(job_id)
+    except Exception as e:
+        print(f"[CELERY] Error processing upload job {job_id}: {e}")
+        if self.request.retries >= self.max_retries:
+            fail_job(job_id, str(e))
+            raise
+        raise self.retry(exc=e)
@@ -15,13 +15,17 @@ from django.db.models import F, Func, Value, CharField
 from django.contrib.postgres.fields import ArrayField
 
 from minio import Minio
+from minio.commonconfig import ComposeSource
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
 from django.conf import settings
+from KFCAcademy import cache as shared_cache
 logger = logging.getLogger('django')
 
 
 import os
 import json
+import hashlib
 
 # Cloudflare Stream API configuration
 CLOUDFLARE_STREAM_VIDEO_UPLOAD_URL = os.getenv('CLOUDFLARE_STREAM_VIDEO_UPLOAD_URL', 'https://api.cloudflare.com/client/v4/accounts/befb832641959f6fce604ecb85380a33/stream')
@@ -29,6 +33,8 @@ CLOUDFLARE_STREAM_IMAGE_UPLOAD_URL = os.getenv('CLOUDFLARE_STREAM_IMAGE_UPLOAD_U
 CLOUDFLARE_STREAM_VIDEO_DELETE_URL = os.getenv('CLOUDFLARE_STREAM_VIDEO_DELETE_URL', 'https://api.cloudflare.com/client/v4/accounts/befb832641959f6fce604ecb85380a33/stream/')
 CLOUDFLARE_STREAM_IMAGE_DELETE_URL = os.getenv('CLOUDFLARE_STREAM_IMAGE_DELETE_URL', 'https://api.cloudflare.com/client/v4/accounts/befb832641959f6fce604ecb85380a33/images/v1')
 CLOUDFLARE_STREAM_API_TOKEN = os.getenv('CLOUDFLARE_STREAM_API_TOKEN', 'RIXX-DWThGADZGwmmOhfmoGe_zuXely7nXWXKdl6')
+# Longest video a direct creator upload accepts (Cloudflare allows up to 6 hours)
+CLOUDFLARE_STREAM_MAX_DURATION = int(os.getenv('CLOUDFLARE_STREAM_MAX_DURATION', 6 * 60 * 60))
 
 file_prefix = ''
 if settings.DEBUG:
@@ -44,31 +50,110 @@ minio_client = Minio(
     region='us-east-1',  # Prevent region lookup
 )
 
+PRESIGNED_URL_NAMESPACE = "presigned_url"
+
+
+def _presigned_url_key(file_path, response_headers):
+    # Object paths are user data of any length; hash them into a fixed-size key
+    raw = json.dumps([file_path, response_headers], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def presign_from_minio(file_paths, response_headers=None):
+    """
+    Presigned GET URLs for many objects, as {file_path: url}.
+
+    URLs are cached in the shared cache per object path and response headers until
+    PRESIGNED_URL_CACHE_MARGIN seconds before they expire, so repeated reads of the
+    same files reuse them instead of signing again.
+    """
+    if response_headers is None:
+        response_headers = {"response-content-disposition": 'inline;'}
+    expiry = settings.PRESIGNED_URL_EXPIRY
+    keys = {file_path: _presigned_url_key(file_path, response_headers) for file_path in file_paths}
+    cached = shared_cache.get_many(PRESIGNED_URL_NAMESPACE, set(keys.values()))
+
+    urls, signed = {}, {}
+    for file_path, key in keys.items():
+        if key not in cached:
+            # Generate presigned URL (will use localhost), then point it at the public nginx proxy
+            signed[key] = cached[key] = public_minio_url(minio_client.presigned_get_object(
+                bucket_name=bucket_name,
+                object_name=file_path,
+                expires=timedelta(seconds=expiry),
+                response_headers=response_headers
+            ))
+        urls[file_path] = cached[key]
+    if signed:
+        shared_cache.set_many(PRESIGNED_URL_NAMESPACE, signed, timeout=expiry - settings.PRESIGNED_URL_CACHE_MARGIN)
+    return urls
+
+
 def get_from_minio(file_path):
     try:
-        print(f"Generating presigned URL for file: {file_path}, bucket: {bucket_name}")
-        
-        # Generate presigned URL (will use localhost)
-        url = minio_client.presigned_get_object(
-            bucket_name=bucket_name,
-            object_name=file_path,
-            expires=timedelta(hours=1),
-            response_headers={
-                "response-content-disposition": f'inline;'
-            }
-        )
-        
-        # Replace localhost with public nginx proxy URL
-        url = url.replace('127.0.0.1:9000', settings.MINIO_PUBLIC_ENDPOINT)
-        url = url.replace('http://', 'https://')
-        
-        print(f"Generated presigned URL: {url}")
-        return url
+        return presign_from_minio([file_path])[file_path]
     except Exception as err:
         print(f"MinIO Error: {err}")
         raise
 
 
+def public_minio_url(url):
+    """Point a presigned MinIO URL at the public nginx proxy instead of the local endpoint"""
+    url = url.replace('127.0.0.1:9000', settings.MINIO_PUBLIC_ENDPOINT)
+    return url.replace('http://', 'https://')
+
+
+def presigned_put_to_minio(object_name, expires=timedelta(hours=1)):
+    """URL the browser PUTs the object to directly, bypassing the API server"""
+    url = minio_client.presigned_put_object(bucket_name, object_name, expires=expires)
+    return public_minio_url(url)
+
+
+def stat_minio_object(object_name):
+    """Object metadata (size, content type, etag); raises S3Error with code NoSuchKey if it is missing"""
+    return minio_client.stat_object(bucket_name, object_name)
+
+
+def create_cloudflare_direct_upload(file_name, expiry):
+    """One-time Cloudflare Stream upload URL for the browser; returns (video uid, upload URL)"""
+    response = requests.post(
+        f"{CLOUDFLARE_STREAM_VIDEO_UPLOAD_URL}/direct_upload",
+        headers={"Authorization": f"Bearer {CLOUDFLARE_STREAM_API_TOKEN}"},
+        json={
+            "maxDurationSeconds": CLOUDFLARE_STREAM_MAX_DURATION,
+            "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "meta": {"name": file_prefix + file_name},
+        },
+        timeout=30
+    )
+    response.raise_for_status()
+    result = response.json().get("result") or {}
+    return result["uid"], result["uploadURL"]
+
+
+def copy_to_cloudflare(url, file_name):
+    """Have Cloudflare Stream fetch a video from url; returns the new video uid"""
+    response = requests.post(
+        f"{CLOUDFLARE_STREAM_VIDEO_UPLOAD_URL}/copy",
+        headers={"Authorization": f"Bearer {CLOUDFLARE_STREAM_API_TOKEN}"},
+        json={"url": url, "meta": {"name": file_prefix + file_name}},
+        timeout=30
+    )
+    response.raise_for_status()
+    return (response.json().get("result") or {})["uid"]
+
+
+def get_cloudflare_video(uid):
+    """Cloudflare Stream details of one video (status, playback URLs)"""
+    response = requests.get(
+        f"{CLOUDFLARE_STREAM_VIDEO_DELETE_URL}{uid}",
+        headers={"Authorization": f"Bearer {CLOUDFLARE_STREAM_API_TOKEN}"},
+        timeout=30
+    )
+    response.raise_for_status()
+    return response.json().get("result") or {}
+
+
 
 
 def upload_image_to_cloudflare_task(file_data, file_name):
@@ -84,41 +169,30 @@ def upload_image_to_cloudflare_task(file_data, file_name):
             "Authorization": f"Bearer {CLOUDFLARE_STREAM_API_TOKEN}"
         }
         
-        # Write bytes to temporary file for upload
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file_name)[1]) as tmp:
-            tmp.write(file_data)
-            tmp_path = tmp.name
-        
-        try:
-            with open(tmp_path, "rb") as f:
-                response = requests.post(
-                    CLOUDFLARE_STREAM_IMAGE_UPLOAD_URL,
-                    headers=headers,
-                    files={"file": (file_prefix + file_name, f)},
-                    timeout=30
-                )
-
-            response.raise_for_status()
-            response_data = response.json()
-            print(response_data)
-
-            if response.status_code == 200 and response_data.get("success"):
-
-                file_url = response_data.get("result", {}).get("variants", [None])[0]
-                if not file_url:
-                    logger.error(f"'variants' key missing in response: {response_data}")
-                    return None
-
-                return file_url
-            else:
-                logger.error(f"Failed to upload image: {response_data.get('errors')}")
+        # file_data is the uploaded file itself (or raw bytes); requests reads it straight into the form body
+        response = requests.post(
+            CLOUDFLARE_STREAM_IMAGE_UPLOAD_URL,
+            headers=headers,
+            files={"file": (file_prefix + file_name, file_data)},
+            timeout=30
+        )
+
+        response.raise_for_status()
+        response_data = response.json()
+        print(response_data)
+
+        if response.status_code == 200 and response_data.get("success"):
+
+            file_url = response_data.get("result", {}).get("variants", [None])[0]
+            if not file_url:
+                logger.error(f"'variants' key missing in response: {response_data}")
                 return None
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-                
+
+            return file_url
+        else:
+            logger.error(f"Failed to upload image: {response_data.get('errors')}")
+            return None
+
     except Exception as e:
         logger.exception(f"Error uploading image to Cloudflare: {str(e)}")
         return None
@@ -137,36 +211,26 @@ def upload_video_to_cloudflare_task(file_data, file_name):
             "Authorization": f"Bearer {CLOUDFLARE_STREAM_API_TOKEN}"
         }
 
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file_name)[1]) as tmp:
-            tmp.write(file_data)
-            tmp_path = tmp.name
-
-        try:
-            with open(tmp_path, "rb") as f:
-                response = requests.post(
-                    CLOUDFLARE_STREAM_VIDEO_UPLOAD_URL,
-                    headers=headers,
-                    files={"file": (file_prefix + file_name, f)},
-                    timeout=60
-                )
-                
-            response.raise_for_status()
-            response_data = response.json()
-
-            if response.status_code == 200 and response_data.get("success"):
-                file_url = response_data.get("result", {}).get("playback", {}).get("hls")
-                if not file_url:
-                    logger.error(f"'playback' key missing in response: {response_data}")
-                    return None
-                return file_url
-            else:
-                logger.error(f"Failed to upload video: {response_data.get('errors')}")
+        response = requests.post(
+            CLOUDFLARE_STREAM_VIDEO_UPLOAD_URL,
+            headers=headers,
+            files={"file": (file_prefix + file_name, file_data)},
+            timeout=60
+        )
+
+        response.raise_for_status()
+        response_data = response.json()
+
+        if response.status_code == 200 and response_data.get("success"):
+            file_url = response_data.get("result", {}).get("playback", {}).get("hls")
+            if not file_url:
+                logger.error(f"'playback' key missing in response: {response_data}")
                 return None
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-                
+            return file_url
+        else:
+            logger.error(f"Failed to upload video: {response_data.get('errors')}")
+            return None
+
     except Exception as e:
         logger.exception(f"Error uploading video to Cloudflare: {str(e)}")
         return None
@@ -210,26 +274,83 @@ def delete_cloudflare_file_task(file_url, resource_type):
 
 
 
+class ChunkedUploadStream:
+    """
+    Read-only file object over an uploaded file's chunks().
+
+    put_object() reads one part at a time through read(size); chunks are pulled
+    only as needed, so at most one part (plus the tail of one chunk) is held in
+    memory however large the upload is.
+    """
+
+    def __init__(self, uploaded_file, chunk_size=None):
+        self._chunks = iter(uploaded_file.chunks(chunk_size))
+        self._buffer = bytearray()
+
+    def read(self, size=-1):
+        while size is None or size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def put_minio_object(object_name, stream, length, content_type=None):
+    """put_object in MINIO_UPLOAD_PART_SIZE parts, reading one part of the stream at a time"""
+    import mimetypes
+    return minio_client.put_object(
+        bucket_name, object_name, stream, length,
+        content_type=content_type or mimetypes.guess_type(object_name)[0] or "application/octet-stream",
+        part_size=settings.MINIO_UPLOAD_PART_SIZE,
+        num_parallel_uploads=1,
+    )
+
+
+def compose_minio_object(object_name, source_names):
+    """Join objects server side, in order, into object_name (every source but the last must be at least 5 MiB)"""
+    return minio_client.compose_object(
+        bucket_name, object_name, [ComposeSource(bucket_name, source) for source in source_names]
+    )
+
+
+def remove_minio_objects(object_names):
+    errors = minio_client.remove_objects(bucket_name, [DeleteObject(name) for name in object_names])
+    for error in errors:
+        logger.error(f"Failed to delete {error.name} from MinIO: {error.message}")
+
+
 def upload_file_to_minio_task(file_data, file_name):
+    """
+    Stream an upload into MinIO.
+
+    file_data is an UploadedFile (or any object with chunks()) or raw bytes. The
+    object is sent in MINIO_UPLOAD_PART_SIZE parts with a single upload thread:
+    parallel uploads queue every part read ahead of the network, which would
+    bring the whole file back into memory.
+    """
     try:
         bucket_name = settings.MINIO_STORAGE_BUCKET_NAME
         if not minio_client.bucket_exists(bucket_name):
             minio_client.make_bucket(bucket_name)
 
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file_name)[1]) as tmp:
-            tmp.write(file_data)
-            tmp_path = tmp.name
+        if isinstance(file_data, (bytes, bytearray)):
+            stream, length, content_type = BytesIO(file_data), len(file_data), None
+        else:
+            # Unknown sizes (length=-1) are uploaded part by part until the stream runs dry
+            stream = ChunkedUploadStream(file_data)
+            length = file_data.size if getattr(file_data, 'size', None) is not None else -1
+            content_type = getattr(file_data, 'content_type', None)
+
+        put_minio_object(file_name, stream, length, content_type=content_type)
+        file_url = f"{bucket_name}/{file_name}"
 
-        try:
-            minio_client.fput_object(bucket_name, file_name, tmp_path)
-            file_url = f"{bucket_name}/{file_name}"
+        return file_url
 
-            return file_url
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-                
     except S3Error as e:
         logger.error(f"Failed to upload file to MinIO: {str(e)}")
         return None
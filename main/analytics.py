@@ -0,0 +1,149 @@
+"""
+Question-level item analysis for quizzes.
+
+For every live question of a ModuleQuizes: how many learners answered it, the
+share that answered correctly, how the answers spread across its options and a
+discrimination index, the correlation between getting the item right and the
+learner's score on the rest of the quiz (corrected item-total correlation).
+Items that strong learners get right and weak learners get wrong score close
+to 1; items that don't separate them sit near 0 or go negative.
+
+Counts come from grouped SQL and the correlations from NumPy over the
+learner x question correctness matrix. The result is cached per quiz with no
+expiry and rebuilt by a debounced Celery task whenever answers or questions
+change, so the analysis screen never scans raw responses on request.
+"""
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from KFCAcademy import cache as shared_cache
+from KFCAcademy.tasks import refresh_item_analysis as refresh_item_analysis_task
+from main.models import QuizQuestions, QuizResponses
+
+NAMESPACE = "item_analysis"
+
+
+def _dirty_key(quiz_id):
+    return f"item_analysis:dirty:{quiz_id}"
+
+
+def _requested_key(quiz_id):
+    return f"item_analysis:requested:{quiz_id}"
+
+
+def discrimination_index(item, rest):
+    """Pearson correlation of a 0/1 item column with the rest score, None when either is constant."""
+    if len(item) < 2 or item.std() == 0 or rest.std() == 0:
+        return None
+    return float(np.corrcoef(item, rest)[0, 1])
+
+
+def compute_item_analysis(quiz_id):
+    questions = list(QuizQuestions.objects.filter(quiz_id=quiz_id, deleted_at__isnull=True).order_by('order', 'id').values(
+        'id', 'guid', 'question_text', 'options', 'correct_answer', 'marks'
+    ))
+    question_ids = np.array([question['id'] for question in questions], dtype=np.int64)
+    responses = QuizResponses.objects.filter(question_id__in=question_ids.tolist(), deleted_at__isnull=True)
+
+    distribution = {}
+    for row in responses.values('question_id', 'selected_answer').annotate(total=Count('id')):
+        distribution.setdefault(row['question_id'], {})[row['selected_answer']] = row['total']
+
+    # learner x question matrices: answered at all, and answered correctly
+    rows = np.array(list(responses.values_list('user_id', 'question_id', 'is_correct').iterator(chunk_size=5000)), dtype=np.int64)
+    if len(rows):
+        learners, learner_index = np.unique(rows[:, 0], return_inverse=True)
+        order = np.argsort(question_ids)
+        question_index = order[np.searchsorted(question_ids, rows[:, 1], sorter=order)]
+    else:
+        learners = learner_index = question_index = np.empty(0, dtype=np.int64)
+    answered = np.zeros((len(learners), len(questions)), dtype=bool)
+    correct = np.zeros((len(learners), len(questions)), dtype=np.float64)
+    answered[learner_index, question_index] = True
+    correct[learner_index, question_index] = rows[:, 2] if len(rows) else []
+
+    marks = np.array([question['marks'] for question in questions], dtype=np.float64)
+    scores = correct @ marks
+
+    items = []
+    for column, question in enumerate(questions):
+        took = answered[:, column]
+        item = correct[took, column]
+        counts = distribution.get(question['id'], {})
+        response_count = int(took.sum())
+        correct_count = int(item.sum())
+        items.append({
+            'guid': str(question['guid']),
+            'question_text': question['question_text'],
+            'response_count': response_count,
+            'correct_count': correct_count,
+            'percent_correct': round(correct_count * 100 / response_count, 2) if response_count else None,
+            'discrimination_index': discrimination_index(item, scores[took] - item * marks[column]),
+            'options': [
+                {
+                    'option': option,
+                    'count': counts.get(option, 0),
+                    'percent': round(counts.get(option, 0) * 100 / response_count, 2) if response_count else None,
+                    'is_correct': option == question['correct_answer'],
+                }
+                for option in question['options']
+            ],
+        })
+
+    return {
+        'computed_at': timezone.now().isoformat(),
+        'respondents': len(learners),
+        'mean_score': round(float(scores.mean()), 2) if len(learners) else None,
+        'total_marks': int(marks.sum()),
+        'questions': items,
+    }
+
+
+def get_item_analysis(quiz_id):
+    """The last computed analysis of this quiz, or None if it was never computed."""
+    return shared_cache.get(NAMESPACE, quiz_id)
+
+
+def refresh_item_analysis(quiz_id):
+    """Recompute and cache the analysis; the dirty mark is cleared first so answers arriving mid-run queue another pass."""
+    cache.delete_many([_dirty_key(quiz_id), _requested_key(quiz_id)])
+    analysis = compute_item_analysis(quiz_id)
+    shared_cache.set(NAMESPACE, quiz_id, analysis, timeout=None)
+    return analysis
+
+
+def schedule_refresh(quiz_id):
+    """Queue one refresh per debounce window; inline when ITEM_ANALYSIS_ASYNC is off."""
+    if not settings.ITEM_ANALYSIS_ASYNC:
+        refresh_item_analysis(quiz_id)
+        return
+    debounce = settings.ITEM_ANALYSIS_DEBOUNCE
+    if cache.add(_dirty_key(quiz_id), 1, timeout=debounce * 10):
+        refresh_item_analysis_task.apply_async(args=[quiz_id], countdown=debounce)
+
+
+def request_refresh(quiz_id):
+    """
+    A read found no analysis: compute it right away instead of waiting out a debounced
+    refresh that may already be pending. Queued once until it runs; inline when
+    ITEM_ANALYSIS_ASYNC is off.
+    """
+    if not settings.ITEM_ANALYSIS_ASYNC:
+        refresh_item_analysis(quiz_id)
+        return
+    if cache.add(_requested_key(quiz_id), 1, timeout=settings.ITEM_ANALYSIS_DEBOUNCE):
+        refresh_item_analysis_task.apply_async(args=[quiz_id], countdown=0)
+
+
+def mark_stale(quiz_id):
+    """Answers or questions of this quiz changed; refresh the cached analysis once the change commits."""
+    if quiz_id is None or not settings.ITEM_ANALYSIS_ASYNC:
+        # Recomputing inline on every answer would defeat the cache; the next read rebuilds it instead
+        if quiz_id is not None:
+            transaction.on_commit(lambda: shared_cache.delete(NAMESPACE, quiz_id))
+        return
+    transaction.on_commit(lambda: schedule_refresh(quiz_id))
@@ -0,0 +1,74 @@
+"""
+Cached answer keys for grading quiz responses.
+
+The answer key of a ModuleQuizes maps each live question id to what grading and
+the enrollment check need:
+
+    {question_id: {"guid", "options", "correct_answer", "marks", "quiz_id", "module_id", "course_id"}}
+
+so submitting an answer no longer walks question -> quiz -> module -> course.
+Keys live in the shared cache under a per-quiz tag; saving a question or its quiz
+(edits and soft deletes alike) bumps the tag, which versions every key built
+before the change.
+"""
+from django.db import transaction
+
+from KFCAcademy import cache as shared_cache
+
+NAMESPACE = "answer_key"
+
+# Keys are invalidated on every edit, so they only expire to drop quizzes nobody takes anymore
+TIMEOUT = 60 * 60 * 24
+
+
+def _tag(quiz_id):
+    return shared_cache.tag(NAMESPACE, quiz_id)
+
+
+def _build(quiz_id):
+    from main.models import QuizQuestions
+
+    rows = QuizQuestions.objects.filter(quiz_id=quiz_id, deleted_at__isnull=True).values_list(
+        'id', 'guid', 'options', 'correct_answer', 'marks',
+        'quiz__module_id', 'quiz__module__course_id', 'quiz__course_id'
+    )
+    return {
+        question_id: {
+            "guid": str(guid),
+            "options": list(options),
+            "correct_answer": correct_answer,
+            "marks": marks,
+            "quiz_id": quiz_id,
+            "module_id": module_id,
+            # Final assessments hang off the course directly
+            "course_id": module_course_id if module_id else course_id,
+        }
+        for question_id, guid, options, correct_answer, marks, module_id, module_course_id, course_id in rows
+    }
+
+
+def get_answer_key(quiz_id):
+    """Answer key of one quiz, built from a single query on a miss."""
+    return shared_cache.get_or_set(NAMESPACE, quiz_id, lambda: _build(quiz_id), timeout=TIMEOUT, tags=(_tag(quiz_id),))
+
+
+def get_question_key(question):
+    """Answer key entry of one question, or None if it is deleted."""
+    return get_answer_key(question.quiz_id).get(question.pk)
+
+
+def grade(entry, selected_answer):
+    """Whether selected_answer is correct; ValueError if it is not one of the question's options."""
+    if selected_answer not in entry["options"]:
+        raise ValueError("Selected answer must be one of the available options.")
+    return selected_answer == entry["correct_answer"]
+
+
+def invalidate(*quiz_ids):
+    """Version out the answer keys of these quizzes, now and again once the edit commits."""
+    tags = [_tag(quiz_id) for quiz_id in quiz_ids if quiz_id is not None]
+    if not tags:
+        return
+    shared_cache.invalidate_tags(*tags)
+    # A reader racing the transaction may rebuild from the old rows under the new version
+    transaction.on_commit(lambda: shared_cache.invalidate_tags(*tags))
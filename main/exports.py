@@ -0,0 +1,110 @@
+"""
+Streaming spreadsheet exports.
+
+Rows come from `.iterator(chunk_size=2000)` querysets and are written one at a
+time, so an export holds a single chunk in memory however many rows it has:
+
+- csv:  a StreamingHttpResponse that yields each row as soon as it is formatted
+- xlsx: an openpyxl write-only workbook (rows are flushed to disk as they are
+        appended) saved to a temporary file and returned as a FileResponse
+
+Views pick the format from the `file_type` query parameter (csv by default).
+
+Text that a spreadsheet would read as a formula (=, +, -, @ and friends at the
+start) is prefixed with a quote, since names, emails and feedback come from users.
+"""
+import csv
+import logging
+import tempfile
+from datetime import datetime
+from uuid import UUID
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from openpyxl import Workbook
+
+CHUNK_SIZE = 2000
+
+FILE_TYPES = ('csv', 'xlsx')
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Last line of a CSV whose rows failed part way, since the status code has already been sent
+CSV_ERROR_MARKER = '# Export failed: this file is incomplete'
+
+logger = logging.getLogger(__name__)
+
+
+class Echo:
+    """File-like object whose write() hands the formatted line back instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def _text(value):
+    if value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return _text(value)
+    return value
+
+
+def _xlsx_value(value):
+    # openpyxl only accepts naive datetimes
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, str):
+        return _text(value)
+    return value
+
+
+def stream_csv(filename, header, rows):
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        try:
+            for row in rows:
+                yield writer.writerow([_csv_value(value) for value in row])
+        except Exception:
+            # Raised after the response started, out of reach of the view's error handling
+            logger.exception("Streaming %s.csv failed", filename)
+            yield writer.writerow([CSV_ERROR_MARKER])
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def xlsx_file(filename, header, rows, title=None):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=(title or filename)[:31])
+    sheet.append(header)
+    for row in rows:
+        sheet.append([_xlsx_value(value) for value in row])
+
+    # FileResponse closes (and so deletes) the temporary file once it has been sent
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f"{filename}.xlsx", content_type=XLSX_CONTENT_TYPE)
+
+
+def export_response(file_type, filename, header, rows, title=None):
+    """CSV or XLSX download of `rows` (an iterable of tuples in `header` order)."""
+    if file_type == 'xlsx':
+        return xlsx_file(filename, header, rows, title=title)
+    return stream_csv(filename, header, rows)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.models import CourseModules, Courses
+
+
+class Command(BaseCommand):
+    help = "Recompute the persisted total_duration of course modules and courses from their topics"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', help="Only backfill the course with this GUID")
+        parser.add_argument('--batch-size', type=int, default=500, help="Courses updated per transaction")
+
+    def handle(self, *args, **options):
+        courses = Courses.objects.order_by('id')
+        if options['course']:
+            courses = courses.filter(guid=options['course'])
+
+        course_ids = list(courses.values_list('id', flat=True))
+        batch_size = max(1, options['batch_size'])
+
+        for start in range(0, len(course_ids), batch_size):
+            batch = course_ids[start:start + batch_size]
+            with transaction.atomic():
+                module_ids = list(CourseModules.objects.filter(course_id__in=batch).values_list('id', flat=True))
+                CourseModules.refresh_total_durations(module_ids)
+                Courses.refresh_total_durations(batch)
+            self.stdout.write(f"Backfilled {min(start + batch_size, len(course_ids))}/{len(course_ids)} courses")
+
+        self.stdout.write(self.style.SUCCESS("Course durations backfilled"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.models import Courses, UserCourseProgress, UsersCourseEnrollment
+
+
+class Command(BaseCommand):
+    help = "Recount the UserCourseProgress counters of every enrolled learner from topic completions and quiz answers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', help="Only backfill the course with this GUID")
+
+    def handle(self, *args, **options):
+        courses = Courses.objects.order_by('id')
+        if options['course']:
+            courses = courses.filter(guid=options['course'])
+
+        course_ids = list(courses.values_list('id', flat=True))
+        for index, course_id in enumerate(course_ids, start=1):
+            # Existing rows are recounted too, so counters that drifted for unenrolled learners get corrected
+            user_ids = set(UsersCourseEnrollment.objects.filter(course_id=course_id).values_list('user_id', flat=True))
+            user_ids.update(UserCourseProgress.objects.filter(course_id=course_id).values_list('user_id', flat=True))
+            with transaction.atomic():
+                UserCourseProgress.rebuild(course_id, sorted(user_ids))
+            self.stdout.write(f"Backfilled {index}/{len(course_ids)} courses ({len(user_ids)} learners)")
+
+        self.stdout.write(self.style.SUCCESS("Course progress backfilled"))
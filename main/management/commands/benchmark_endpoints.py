@@ -0,0 +1,218 @@
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from main.models import ModuleTopics, QuizQuestions, UsersCourseEnrollment
+
+# name: (method, route, kwargs, data, authenticated), built from the picked learner, course, quiz, question and topic
+ENDPOINTS = {
+    'one_course': lambda f: ('get', 'main:one_course', {'guid': f['course'].guid}, None, True),
+    'my_courses': lambda f: ('get', 'main:my_courses', {}, None, True),
+    'course_progress': lambda f: ('get', 'main:course_progress', {'course_guid': f['course'].guid}, None, True),
+    'public_courses': lambda f: ('get', 'main:public_courses', {}, None, False),
+    'one_quiz': lambda f: ('get', 'main:one_quiz', {'guid': f['quiz'].guid}, None, True),
+    'submit_quiz_response': lambda f: ('post', 'main:submit_quiz_response', {},
+                                       {'question': str(f['question'].guid), 'selected_answer': f['question'].correct_answer}, True),
+    'submit_all_quiz_responses': lambda f: ('post', 'main:submit_all_quiz_responses', {}, {
+        'quiz': str(f['quiz'].guid),
+        'answers': [{'question': str(question.guid), 'selected_answer': question.correct_answer} for question in f['quiz_questions']],
+    }, True),
+    'mark_topic_complete': lambda f: ('post', 'main:mark_topic_complete', {}, {'topic_guid': str(f['topic'].guid)}, True),
+}
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = (len(values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the hot endpoints through the test client against the current (seeded) database, "
+            "save the results as a JSON baseline and flag regressions against it")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help="Timed requests per endpoint")
+        parser.add_argument('--warmup', type=int, default=5, help="Untimed requests per endpoint before measuring")
+        parser.add_argument('--endpoint', action='append', choices=sorted(ENDPOINTS),
+                            help="Only benchmark this endpoint; repeat for several")
+        parser.add_argument('--user', help="Email of the learner to act as; defaults to the first enrolled learner")
+        parser.add_argument('--course', help="GUID of the enrolled course to use; defaults to one with quiz questions")
+        parser.add_argument('--cold-cache', action='store_true', help="Clear the cache before every request")
+        parser.add_argument('--baseline', default=os.path.join(settings.BASE_DIR, 'benchmark_baseline.json'),
+                            help="JSON file holding the previous results")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Allowed relative slowdown of p95 latency and peak memory before a regression is flagged")
+        parser.add_argument('--update-baseline', action='store_true',
+                            help="Overwrite the baseline with this run even when it already exists")
+
+    def handle(self, *args, **options):
+        fixture = self.pick_fixture(options['user'], options['course'])
+        names = options['endpoint'] or list(ENDPOINTS)
+        token = str(AccessToken.for_user(fixture['user']))
+        clients = {
+            True: Client(HTTP_AUTHORIZATION=f'Bearer {token}'),
+            False: Client(),
+        }
+
+        self.stdout.write(
+            f"Benchmarking as {fixture['user'].email} on course {fixture['course'].guid} "
+            f"({options['iterations']} iterations, {options['warmup']} warmup)"
+        )
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for name in names:
+                method, route, kwargs, data, authenticated = ENDPOINTS[name](fixture)
+                request = self.request_factory(clients[authenticated], method, reverse(route, kwargs=kwargs), data)
+                results[name] = self.measure(name, request, options)
+
+        self.report(results)
+        self.compare_and_save(results, options)
+
+    # =============================================================================
+    # MEASUREMENT
+    # =============================================================================
+
+    def pick_fixture(self, email, course_guid):
+        enrollments = UsersCourseEnrollment.objects.filter(
+            deleted_at__isnull=True,
+            course__deleted_at__isnull=True,
+            course__coursemodules__quizzes__quizquestions__isnull=False,
+        )
+        if email:
+            enrollments = enrollments.filter(user__email=email)
+        if course_guid:
+            enrollments = enrollments.filter(course__guid=course_guid)
+        enrollment = enrollments.select_related('user', 'course').order_by('id').first()
+        if enrollment is None:
+            raise CommandError("No enrollment in a course with module quiz questions found; run seed_academy first")
+
+        course = enrollment.course
+        question = QuizQuestions.objects.filter(quiz__module__course=course).select_related('quiz').order_by('id').first()
+        # Seeded learners complete topics in order, so the last topic is the one most likely still open
+        topic = ModuleTopics.objects.filter(module__course=course, deleted_at__isnull=True).order_by(
+            '-module__order', '-topic_order'
+        ).first()
+        quiz_questions = list(QuizQuestions.objects.filter(quiz=question.quiz, deleted_at__isnull=True).order_by('order'))
+        return {'user': enrollment.user, 'course': course, 'quiz': question.quiz, 'question': question,
+                'quiz_questions': quiz_questions, 'topic': topic}
+
+    def request_factory(self, client, method, path, data):
+        def request():
+            # Writes are rolled back so every iteration sees the same data and reruns stay comparable
+            with transaction.atomic():
+                if method == 'get':
+                    response = client.get(path)
+                else:
+                    response = client.post(path, data, content_type='application/json')
+                transaction.set_rollback(True)
+            return response
+        return request
+
+    def measure(self, name, request, options):
+        for _ in range(options['warmup']):
+            request()
+
+        # Query capture and tracemalloc both slow requests down, so they get a pass of their own
+        if options['cold_cache']:
+            cache.clear()
+        # request_started empties the query log, which would leave a non-empty log shorter than where capture began
+        reset_queries()
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            response = request()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if response.status_code >= 400:
+            raise CommandError(f"{name} returned {response.status_code}: {response.content[:500]!r}")
+
+        timings = []
+        for _ in range(max(1, options['iterations'])):
+            if options['cold_cache']:
+                cache.clear()
+            started = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+
+        return {
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'queries': len(queries),
+            'peak_kb': round(peak / 1024, 1),
+            'status': response.status_code,
+        }
+
+    # =============================================================================
+    # REPORTING
+    # =============================================================================
+
+    def report(self, results):
+        self.stdout.write(f"{'endpoint':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'peak KB':>12}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<24}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['queries']:>10}{result['peak_kb']:>12.1f}"
+            )
+
+    def compare_and_save(self, results, options):
+        path = options['baseline']
+        baseline = None
+        if os.path.exists(path):
+            with open(path) as handle:
+                baseline = json.load(handle)
+            if baseline.get('cold_cache') != options['cold_cache']:
+                raise CommandError(f"{path} was recorded with cold_cache={baseline.get('cold_cache')}; "
+                                   f"rerun with the same cache mode or pass another --baseline")
+
+        regressions = []
+        if baseline is not None:
+            threshold = 1 + options['threshold']
+            for name, result in results.items():
+                previous = baseline['endpoints'].get(name)
+                if previous is None:
+                    continue
+                # Query counts are deterministic, so any increase is a regression
+                if result['queries'] > previous['queries']:
+                    regressions.append(f"{name}: queries {previous['queries']} -> {result['queries']}")
+                for metric in ('p95_ms', 'peak_kb'):
+                    if previous[metric] and result[metric] > previous[metric] * threshold:
+                        regressions.append(f"{name}: {metric} {previous[metric]} -> {result[metric]}")
+
+        if baseline is None or options['update_baseline']:
+            endpoints = dict(baseline['endpoints']) if baseline else {}
+            endpoints.update(results)
+            with open(path, 'w') as handle:
+                json.dump({
+                    'generated_at': datetime.now(timezone.utc).isoformat(),
+                    'iterations': options['iterations'],
+                    'cold_cache': options['cold_cache'],
+                    'endpoints': endpoints,
+                }, handle, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline written to {path}")
+
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(f"Regression {regression}"))
+        # An explicit baseline update accepts the new numbers, so only plain comparisons fail the run
+        if regressions and not options['update_baseline']:
+            raise CommandError(f"{len(regressions)} regression(s) beyond the {options['threshold']:.0%} threshold")
+
+        self.stdout.write(self.style.SUCCESS("No regressions" if baseline is not None else "Benchmark complete"))
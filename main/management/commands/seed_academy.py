@@ -0,0 +1,293 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main.models import (
+    CourseInteractions, CourseInteractionStats, CourseModules, Courses, ModuleQuizes, ModuleTopics,
+    Organizations, QuizQuestions, QuizResponses, Role, UserCourseProgress, UserModuleProgress,
+    UserTopicCompletion, Users, UsersCourseEnrollment, refresh_durations
+)
+
+CATEGORIES = ['Floriculture', 'Post-harvest', 'Pest management', 'Compliance', 'Irrigation', 'Sustainability']
+LEVELS = ['Beginner', 'Intermediate', 'Advanced']
+OPTIONS = ['A', 'B', 'C', 'D']
+REVIEWS = ['Very practical', 'Well structured', 'Too long', 'Helpful for my team', 'Great examples']
+
+
+class Command(BaseCommand):
+    help = "Generate a production-sized synthetic academy (bulk inserts, deterministic per --seed) for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help="Random seed; the same seed produces the same data")
+        parser.add_argument('--prefix', default='seed', help="Prefix for generated usernames, emails and titles")
+        parser.add_argument('--organizations', type=int, default=500)
+        parser.add_argument('--users', type=int, default=50000)
+        parser.add_argument('--instructors', type=int, default=100)
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--modules-per-course', type=int, default=6, help="Average; each course varies by +/-50%%")
+        parser.add_argument('--topics-per-module', type=int, default=5, help="Average; each module varies by +/-50%%")
+        parser.add_argument('--questions-per-quiz', type=int, default=5, help="Average; each quiz varies by +/-50%%")
+        parser.add_argument('--enrollments-per-user', type=int, default=3)
+        parser.add_argument('--completion-rate', type=float, default=0.6,
+                            help="Share of enrolled content (topics and questions) each learner has worked through, on average")
+        parser.add_argument('--interaction-rate', type=float, default=0.3,
+                            help="Chance that an enrolled learner likes, saves, rates or reviews the course")
+        parser.add_argument('--role', default=None, help="Name of an existing role to give generated users")
+        parser.add_argument('--password', default='Seed-Pass-123', help="Password of every generated user")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        # GUIDs come from the generator too, so the prefix is mixed in to keep reruns under a new prefix unique
+        self.rng = random.Random(f"{options['seed']}:{prefix}")
+        self.batch_size = max(1, options['batch_size'])
+
+        if Users.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f"Users prefixed '{prefix}_' already exist; pick another --prefix")
+
+        role = None
+        if options['role']:
+            role = Role.objects.filter(name=options['role'], deleted_at__isnull=True).first()
+            if role is None:
+                raise CommandError(f"Role '{options['role']}' does not exist")
+
+        with transaction.atomic():
+            organizations = self.create_organizations(prefix, options['organizations'])
+            instructors, learners = self.create_users(prefix, options, role, organizations)
+            courses = self.create_courses(prefix, options, instructors)
+        self.log(f"{len(organizations)} organizations, {len(instructors) + len(learners)} users, {len(courses)} courses")
+
+        with transaction.atomic():
+            content = self.create_content(courses, options)
+            refresh_durations(module_ids=[module_id for modules in content.values() for module_id in modules],
+                              course_ids=[course.id for course in courses])
+        self.log(f"{sum(len(modules) for modules in content.values())} modules with topics, quizzes and questions")
+
+        enrollments = self.create_enrollments(learners, courses, options['enrollments_per_user'])
+        self.log(f"{len(enrollments)} enrollments")
+
+        self.create_activity(enrollments, content, options['completion_rate'])
+        self.create_progress(enrollments)
+        self.create_interactions(enrollments, options['interaction_rate'])
+        CourseInteractionStats.rebuild([course.id for course in courses])
+
+        self.stdout.write(self.style.SUCCESS(f"Academy seeded with seed {options['seed']}"))
+
+    # =============================================================================
+    # GENERATORS
+    # =============================================================================
+
+    def create_organizations(self, prefix, count):
+        return Organizations.objects.bulk_create([
+            Organizations(
+                guid=self.uuid(),
+                member_id=f'{prefix.upper()}-{index:05d}',
+                org_name=f'{prefix.title()} Farm {index}',
+                address=f'P.O. Box {self.rng.randint(100, 99999)}',
+                is_active=True,
+                created_by='seed_academy',
+            )
+            for index in range(count)
+        ], batch_size=self.batch_size)
+
+    def create_users(self, prefix, options, role, organizations):
+        # Hash once: every seeded user shares the password and hashing is the slow part
+        password = make_password(options['password'])
+        instructor_count = min(options['instructors'], options['users'])
+
+        users = []
+        for index in range(options['users']):
+            is_instructor = index < instructor_count
+            users.append(Users(
+                guid=self.uuid(),
+                username=f'{prefix}_{index}',
+                email=f'{prefix}_{index}@seed.kfcacademy.test',
+                first_name=f'{"Instructor" if is_instructor else "Learner"}{index}',
+                last_name=prefix.title(),
+                password=password,
+                role=role,
+                organization=self.rng.choice(organizations) if organizations and not is_instructor else None,
+                is_staff=is_instructor,
+                is_first_time_login=False,
+                created_by='seed_academy',
+            ))
+        users = Users.objects.bulk_create(users, batch_size=self.batch_size)
+        return users[:instructor_count], users[instructor_count:]
+
+    def create_courses(self, prefix, options, instructors):
+        return Courses.objects.bulk_create([
+            Courses(
+                guid=self.uuid(),
+                title=f'{prefix.title()} course {index}: {self.rng.choice(CATEGORIES)}',
+                description='Generated for load testing',
+                category=self.rng.choice(CATEGORIES),
+                tags=self.rng.sample(CATEGORIES, 2),
+                expertise_level=self.rng.choice(LEVELS),
+                isFeatured=self.rng.random() < 0.1,
+                learning_mode='online',
+                order=index,
+                instructor=self.rng.choice(instructors) if instructors else None,
+                status='PUBLISHED' if self.rng.random() < 0.9 else 'DRAFT',
+                created_by='seed_academy',
+            )
+            for index in range(options['courses'])
+        ], batch_size=self.batch_size)
+
+    def create_content(self, courses, options):
+        """Modules, topics, module quizzes plus a final assessment, and their questions.
+
+        Returns {course_id: {module_id: (topic_ids, [(question_id, correct_answer)])}}.
+        """
+        modules = CourseModules.objects.bulk_create([
+            CourseModules(guid=self.uuid(), course=course, name=f'Module {order + 1}', order=order, created_by='seed_academy')
+            for course in courses
+            for order in range(self.around(options['modules_per_course']))
+        ], batch_size=self.batch_size)
+
+        topics = ModuleTopics.objects.bulk_create([
+            ModuleTopics(
+                guid=self.uuid(),
+                module=module,
+                name=f'Topic {order + 1}',
+                topic_order=order,
+                duration=timedelta(minutes=self.rng.choice([5, 10, 15, 20, 30, 45])),
+                created_by='seed_academy',
+            )
+            for module in modules
+            for order in range(self.around(options['topics_per_module']))
+        ], batch_size=self.batch_size)
+
+        quizzes = ModuleQuizes.objects.bulk_create(
+            [ModuleQuizes(guid=self.uuid(), module=module, name=f'{module.name} quiz', created_by='seed_academy') for module in modules]
+            + [ModuleQuizes(guid=self.uuid(), course=course, name='Final assessment', created_by='seed_academy') for course in courses],
+            batch_size=self.batch_size
+        )
+
+        questions = []
+        for quiz in quizzes:
+            for order in range(self.around(options['questions_per_quiz'])):
+                questions.append(QuizQuestions(
+                    guid=self.uuid(),
+                    quiz=quiz,
+                    question_type='mcq',
+                    question_text=f'Question {order + 1}',
+                    options=OPTIONS,
+                    correct_answer=self.rng.choice(OPTIONS),
+                    order=order,
+                    created_by='seed_academy',
+                ))
+        questions = QuizQuestions.objects.bulk_create(questions, batch_size=self.batch_size)
+
+        content = {course.id: {} for course in courses}
+        for module in modules:
+            content[module.course_id][module.id] = ([], [])
+        for topic in topics:
+            content[topic.module.course_id][topic.module_id][0].append(topic.id)
+        for question in questions:
+            module = question.quiz.module
+            if module is not None:
+                content[module.course_id][module.id][1].append((question.id, question.correct_answer))
+        return content
+
+    def create_enrollments(self, learners, courses, per_user):
+        per_user = min(per_user, len(courses))
+        enrollments = (
+            UsersCourseEnrollment(guid=self.uuid(), user_id=learner.id, course_id=course.id, created_by='seed_academy')
+            for learner in learners
+            for course in self.rng.sample(courses, per_user)
+        )
+        return self.insert(UsersCourseEnrollment, enrollments)
+
+    def create_activity(self, enrollments, content, completion_rate):
+        """Topic completions, module progress and quiz answers for every enrollment."""
+        completions, progress_rows, responses = [], [], []
+        for enrollment in enrollments:
+            # Learners drift through courses at different paces around the target rate
+            pace = min(1.0, max(0.0, self.rng.gauss(completion_rate, 0.25)))
+            for module_id, (topic_ids, questions) in content[enrollment.course_id].items():
+                completed = topic_ids[:round(len(topic_ids) * pace)]
+                if not completed:
+                    continue
+                completions.extend(
+                    UserTopicCompletion(guid=self.uuid(), user_id=enrollment.user_id, topic_id=topic_id)
+                    for topic_id in completed
+                )
+                progress_rows.append(UserModuleProgress(
+                    guid=self.uuid(),
+                    user_id=enrollment.user_id,
+                    module_id=module_id,
+                    progress=len(completed) / len(topic_ids) * 100.0,
+                    quiz_completed=len(completed) == len(topic_ids),
+                ))
+                for question_id, correct_answer in questions[:round(len(questions) * pace)]:
+                    answer = correct_answer if self.rng.random() < 0.7 else self.rng.choice(OPTIONS)
+                    responses.append(QuizResponses(
+                        guid=self.uuid(),
+                        user_id=enrollment.user_id,
+                        question_id=question_id,
+                        selected_answer=answer,
+                        is_correct=answer == correct_answer,
+                        created_by='seed_academy',
+                    ))
+            if len(responses) >= self.batch_size * 10:
+                self.flush(completions, progress_rows, responses)
+        self.flush(completions, progress_rows, responses)
+
+    def create_progress(self, enrollments):
+        """UserCourseProgress counters for every enrollment, counted from the activity above."""
+        learners = {}
+        for enrollment in enrollments:
+            learners.setdefault(enrollment.course_id, []).append(enrollment.user_id)
+        for course_id, user_ids in learners.items():
+            with transaction.atomic():
+                UserCourseProgress.rebuild(course_id, user_ids)
+        self.log(f"{len(enrollments)} course progress rows")
+
+    def create_interactions(self, enrollments, rate):
+        interactions = []
+        for enrollment in enrollments:
+            for interaction_type in ('like', 'save', 'rating', 'review'):
+                if self.rng.random() >= rate:
+                    continue
+                interactions.append(CourseInteractions(
+                    guid=self.uuid(),
+                    course_id=enrollment.course_id,
+                    user_id=enrollment.user_id,
+                    interaction_type=interaction_type,
+                    rating=self.rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 6, 5])[0] if interaction_type in ('rating', 'review') else None,
+                    review_text=self.rng.choice(REVIEWS) if interaction_type == 'review' else None,
+                ))
+        self.insert(CourseInteractions, interactions)
+        self.log(f"{len(interactions)} course interactions")
+
+    # =============================================================================
+    # HELPERS
+    # =============================================================================
+
+    def flush(self, completions, progress_rows, responses):
+        self.insert(UserTopicCompletion, completions)
+        self.insert(UserModuleProgress, progress_rows)
+        self.insert(QuizResponses, responses)
+        self.log(f"{len(completions)} topic completions, {len(progress_rows)} progress rows, {len(responses)} quiz responses")
+        completions.clear()
+        progress_rows.clear()
+        responses.clear()
+
+    def insert(self, model, rows):
+        with transaction.atomic():
+            return model.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def around(self, average):
+        """A count within +/-50% of the average, never below one."""
+        average = max(1, average)
+        return self.rng.randint(max(1, average // 2), max(1, average * 3 // 2))
+
+    def log(self, message):
+        self.stdout.write(f"Seeded {message}")
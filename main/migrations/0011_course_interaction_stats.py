@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:50
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_interaction_stats(apps, schema_editor):
+    Courses = apps.get_model('main', 'Courses')
+    CourseInteractions = apps.get_model('main', 'CourseInteractions')
+    CourseInteractionStats = apps.get_model('main', 'CourseInteractionStats')
+
+    totals = {
+        row['course_id']: row
+        for row in CourseInteractions.objects.filter(course__isnull=False).values('course_id').annotate(
+            likes=Count('id', filter=Q(interaction_type='like')),
+            saves=Count('id', filter=Q(interaction_type='save')),
+            rating_sum=Sum('rating', filter=Q(interaction_type='rating')),
+            rating_count=Count('id', filter=Q(interaction_type='rating')),
+            reviews_count=Count('id', filter=Q(interaction_type='review')),
+        )
+    }
+
+    stats = []
+    for course_id in Courses.objects.values_list('id', flat=True):
+        row = totals.get(course_id, {})
+        stats.append(CourseInteractionStats(
+            course_id=course_id,
+            likes=row.get('likes', 0),
+            saves=row.get('saves', 0),
+            rating_sum=row.get('rating_sum') or 0,
+            rating_count=row.get('rating_count', 0),
+            reviews_count=row.get('reviews_count', 0),
+        ))
+    CourseInteractionStats.objects.bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_alter_courses_venue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseInteractionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('likes', models.IntegerField(default=0)),
+                ('saves', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('reviews_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='interaction_stats', to='main.courses')),
+            ],
+            options={
+                'db_table': 'course_interaction_stats',
+            },
+        ),
+        migrations.RunPython(backfill_interaction_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:55
+
+import datetime
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_total_durations(apps, schema_editor):
+    Courses = apps.get_model('main', 'Courses')
+    CourseModules = apps.get_model('main', 'CourseModules')
+    ModuleTopics = apps.get_model('main', 'ModuleTopics')
+
+    topic_totals = ModuleTopics.objects.filter(
+        module=OuterRef('pk'), deleted_at__isnull=True
+    ).values('module').annotate(total=Sum('duration')).values('total')
+    CourseModules.objects.update(
+        total_duration=Coalesce(Subquery(topic_totals), Value(datetime.timedelta(0)))
+    )
+
+    module_totals = CourseModules.objects.filter(
+        course=OuterRef('pk'), deleted_at__isnull=True
+    ).values('course').annotate(total=Sum('total_duration')).values('total')
+    Courses.objects.update(
+        total_duration=Coalesce(Subquery(module_totals), Value(datetime.timedelta(0)))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_course_interaction_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursemodules',
+            name='total_duration',
+            field=models.DurationField(default=datetime.timedelta(0)),
+        ),
+        migrations.AddField(
+            model_name='courses',
+            name='total_duration',
+            field=models.DurationField(default=datetime.timedelta(0)),
+        ),
+        migrations.RunPython(backfill_total_durations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:10
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_persisted_total_duration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCourseProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('completed_topics', models.IntegerField(default=0)),
+                ('answered_questions', models.IntegerField(default=0)),
+                ('total_topics', models.IntegerField(default=0)),
+                ('total_questions', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_progress', to='main.courses')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_course_progress',
+                'unique_together': {('user', 'course')},
+            },
+        ),
+    ]
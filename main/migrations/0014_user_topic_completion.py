@@ -0,0 +1,79 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:16
+
+import django.db.models.deletion
+import uuid
+from collections import defaultdict
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_completed_topics(apps, schema_editor):
+    ModuleTopics = apps.get_model('main', 'ModuleTopics')
+    UserModuleProgress = apps.get_model('main', 'UserModuleProgress')
+    UserTopicCompletion = apps.get_model('main', 'UserTopicCompletion')
+
+    # Arrays may hold GUIDs of topics that were since hard deleted or moved; only keep the module's own topics
+    topic_ids = {
+        (module_id, guid): topic_id
+        for topic_id, module_id, guid in ModuleTopics.objects.values_list('id', 'module_id', 'guid')
+    }
+
+    completions = []
+    rows = UserModuleProgress.objects.exclude(topics_completed=[]).values_list('user_id', 'module_id', 'topics_completed')
+    for user_id, module_id, topics_completed in rows.iterator(chunk_size=2000):
+        for guid in topics_completed or []:
+            topic_id = topic_ids.get((module_id, uuid.UUID(str(guid))))
+            if topic_id is not None:
+                completions.append(UserTopicCompletion(user_id=user_id, topic_id=topic_id))
+        if len(completions) >= 5000:
+            UserTopicCompletion.objects.bulk_create(completions, ignore_conflicts=True)
+            completions = []
+    UserTopicCompletion.objects.bulk_create(completions, ignore_conflicts=True)
+
+
+def restore_completed_topics(apps, schema_editor):
+    UserModuleProgress = apps.get_model('main', 'UserModuleProgress')
+    UserTopicCompletion = apps.get_model('main', 'UserTopicCompletion')
+
+    completed = defaultdict(list)
+    for user_id, module_id, guid in UserTopicCompletion.objects.order_by('id').values_list(
+        'user_id', 'topic__module_id', 'topic__guid'
+    ).iterator(chunk_size=2000):
+        completed[(user_id, module_id)].append(guid)
+
+    rows = []
+    for progress in UserModuleProgress.objects.only('id', 'user_id', 'module_id').iterator(chunk_size=2000):
+        topics_completed = completed.get((progress.user_id, progress.module_id))
+        if topics_completed:
+            progress.topics_completed = topics_completed
+            rows.append(progress)
+    UserModuleProgress.objects.bulk_update(rows, ['topics_completed'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_user_course_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTopicCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('completed_at', models.DateTimeField(auto_now_add=True)),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completions', to='main.moduletopics')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='topic_completions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_topic_completion',
+                'constraints': [models.UniqueConstraint(fields=('user', 'topic'), name='unique_user_topic_completion')],
+            },
+        ),
+        migrations.RunPython(copy_completed_topics, restore_completed_topics),
+        migrations.RemoveField(
+            model_name='usermoduleprogress',
+            name='topics_completed',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:18
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def drop_duplicate_responses(apps, schema_editor):
+    QuizResponses = apps.get_model('main', 'QuizResponses')
+
+    duplicates = QuizResponses.objects.values('user_id', 'question_id').annotate(total=Count('id')).filter(total__gt=1)
+    for pair in duplicates.iterator(chunk_size=2000):
+        # Keep the live answer the learner gave last; soft-deleted and older rows go
+        ids = list(QuizResponses.objects.filter(
+            user_id=pair['user_id'], question_id=pair['question_id']
+        ).order_by(F('deleted_at').desc(nulls_first=True), '-updated_at', '-id').values_list('id', flat=True))
+        QuizResponses.objects.filter(id__in=ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_user_topic_completion'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_responses, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='quizresponses',
+            name='quiz_questi_user_id_df545e_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='quizresponses',
+            constraint=models.UniqueConstraint(fields=('user', 'question'), name='unique_user_question_response'),
+        ),
+    ]
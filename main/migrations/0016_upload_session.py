@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:32
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_unique_quiz_response'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('resource_type', models.CharField(choices=[('file', 'File'), ('audio', 'Audio'), ('video', 'Video')], max_length=10)),
+                ('provider', models.CharField(choices=[('minio', 'MinIO'), ('cloudflare', 'Cloudflare Stream')], max_length=20)),
+                ('file_name', models.CharField(max_length=255)),
+                ('content_type', models.CharField(blank=True, max_length=200, null=True)),
+                ('size', models.BigIntegerField(blank=True, null=True)),
+                ('object_name', models.CharField(blank=True, max_length=300, null=True)),
+                ('provider_uid', models.CharField(blank=True, max_length=100, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('url', models.CharField(blank=True, max_length=300, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('topic', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='main.moduletopics')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'upload_session',
+                'indexes': [models.Index(fields=['user', 'status'], name='upload_sess_user_id_53a157_idx')],
+            },
+        ),
+    ]
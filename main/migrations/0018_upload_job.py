@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:37
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_resumable_upload_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('resource_type', models.CharField(max_length=10)),
+                ('file_name', models.CharField(max_length=255)),
+                ('content_type', models.CharField(blank=True, max_length=200, null=True)),
+                ('size', models.BigIntegerField(default=0)),
+                ('staged_path', models.CharField(blank=True, max_length=300, null=True)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('uploading', 'Uploading'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('url', models.CharField(blank=True, max_length=300, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'upload_job',
+                'indexes': [models.Index(fields=['user', 'status'], name='upload_job_user_id_575f1c_idx')],
+            },
+        ),
+    ]
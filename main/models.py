@@ -8,8 +8,10 @@ from io import BytesIO
 from django.core.files import File
 from PIL import Image
 from django.contrib.postgres.fields import ArrayField
+from django.db.models.functions import Cast
 import uuid
 from django.db import connection
+from main import answer_keys
 
 
 class SoftDeleteManager(models.Manager):
@@ -228,6 +230,7 @@ class Courses(models.Model):
     training_date = models.DateTimeField(blank=True,null=True)
 
     order = models.IntegerField(blank=True,null=True, default=0)
+    total_duration = models.DurationField(default=timedelta(0))
     instructor = models.ForeignKey(settings.AUTH_USER_MODEL,on_delete=models.SET_NULL,blank=True,null=True,related_name='instructor')
     status = models.CharField(max_length=200,blank=False,null=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -250,21 +253,9 @@ class Courses(models.Model):
         ]
     
     @property
-    def total_duration(self):
-        """Compute total duration across all modules and topics, return as string."""
-        from django.db.models import Sum
-        from django.core.cache import cache
-
-        # Use caching to avoid repeated calculations
-        cache_key = f"course_duration_{self.guid}"
-        cached_duration = cache.get(cache_key)
-        if cached_duration is not None:
-            return cached_duration
-
-        # Optimized query to sum all durations at once
-        total_duration = self.coursemodules_set.aggregate(
-            total=Sum('moduletopics__duration')
-        )['total']
+    def total_duration_display(self):
+        """Persisted total duration as a string, e.g. "1w 2d 3h"."""
+        total_duration = self.total_duration
 
         if not total_duration:
             result = "0h"
@@ -285,10 +276,23 @@ class Courses(models.Model):
 
             result = " ".join(parts) or "0h"
 
-        # Cache for 1 hour
-        cache.set(cache_key, result, 2)
         return result
-    
+
+    @classmethod
+    def refresh_total_durations(cls, course_ids):
+        """Recompute total_duration from the (non-deleted) module totals."""
+        from django.db.models import OuterRef, Subquery, Sum
+        from django.db.models.functions import Coalesce
+
+        module_totals = CourseModules.objects.filter(
+            course=OuterRef('pk'),
+            deleted_at__isnull=True
+        ).values('course').annotate(total=Sum('total_duration')).values('total')
+
+        cls.objects.filter(id__in=course_ids).update(
+            total_duration=Coalesce(Subquery(module_totals), models.Value(timedelta(0)))
+        )
+
     # def course_progress(self, user):
     #     """Return average module progress for this user."""
     #     from django.core.cache import cache
@@ -315,59 +319,19 @@ class Courses(models.Model):
     def course_progress(self, user):
         """
         Content-weighted course progress:
-        (completed topics + correct quiz answers) / (total topics + total questions)
+        (completed topics + answered quiz questions) / (total topics + total questions),
+        read from the user's UserCourseProgress counters; 0 when the user isn't enrolled
         """
-
-
-        total_topics = ModuleTopics.objects.filter(
-            module__course=self,
-            deleted_at__isnull=True
-        ).count()
-
-        total_questions = QuizQuestions.objects.filter(
-            quiz__module__course=self
-        ).count()
-
-        total_units = total_topics + total_questions
-
-        if total_units == 0:
-            return 100.0 
-
-      
-        progress_records = UserModuleProgress.objects.filter(
-            user=user,
-            module__course=self
-        )
-
-       
-        valid_topic_ids = set(
-            ModuleTopics.objects.filter(
-                module__course=self,
-                deleted_at__isnull=True
-            ).values_list('guid', flat=True)
-        )
-
-        completed_topics = 0
-        for record in progress_records:
-            completed_topics += len(
-                [tid for tid in (record.topics_completed or []) if tid in valid_topic_ids]
-            )
-        
-        completed_questions = QuizResponses.objects.filter(
-            user=user,
-            question__quiz__module__course=self
-        ).values("question").distinct().count()
-
-        completed_units = completed_topics + completed_questions
-
-        return round((completed_units / total_units) * 100, 2)
+        progress = UserCourseProgress.for_user(user, self)
+        return progress.percentage if progress is not None else 0
     
     def save(self, *args, **kwargs):
-        from django.core.cache import cache
-        # Invalidate duration cache when course is updated
-        cache.delete(f"course_duration_{self.guid}")
-        # Note: In production, consider using cache patterns for wildcard deletion
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not adding:
+                # The row was written from memory, don't let a stale total win
+                refresh_durations(course_ids={self.pk})
 
 class CourseModules(models.Model):
     guid = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
@@ -375,6 +339,7 @@ class CourseModules(models.Model):
     description = models.TextField(blank=True,null=True)
     course = models.ForeignKey(Courses,on_delete=models.CASCADE)
     order = models.IntegerField(blank=False,null=False)
+    total_duration = models.DurationField(default=timedelta(0))
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.CharField(max_length=200,blank=True,null=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -389,8 +354,40 @@ class CourseModules(models.Model):
             models.Index(fields=['name']),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_course_id = instance.__dict__.get('course_id')
+        return instance
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Soft-deleting or moving a module changes the course totals
+            course_ids = {self.course_id, getattr(self, '_loaded_course_id', None)} - {None}
+            refresh_durations(module_ids={self.pk}, course_ids=course_ids)
+            # Answer keys carry the course of their quiz's module
+            if len(course_ids) > 1:
+                answer_keys.invalidate(*self.quizzes.values_list('id', flat=True))
+                # Its topics and questions now count towards the other course
+                for course_id in course_ids:
+                    UserCourseProgress.rebuild(course_id)
+        self._loaded_course_id = self.course_id
+
+    @classmethod
+    def refresh_total_durations(cls, module_ids):
+        """Recompute total_duration from the (non-deleted) topic durations."""
+        from django.db.models import OuterRef, Subquery, Sum
+        from django.db.models.functions import Coalesce
+
+        topic_totals = ModuleTopics.objects.filter(
+            module=OuterRef('pk'),
+            deleted_at__isnull=True
+        ).values('module').annotate(total=Sum('duration')).values('total')
+
+        cls.objects.filter(id__in=module_ids).update(
+            total_duration=Coalesce(Subquery(topic_totals), models.Value(timedelta(0)))
+        )
     
     def module_progress(self, user):
         """Return module progress (0-100%) for a given user."""
@@ -440,13 +437,47 @@ class ModuleTopics(models.Model):
             models.Index(fields=['name']),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_module_id = instance.__dict__.get('module_id')
+        instance._loaded_deleted = instance.__dict__.get('deleted_at') is not None
+        return instance
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Duration edits, soft deletes and moves between modules all change the totals
+            module_ids = {self.module_id, getattr(self, '_loaded_module_id', None)} - {None}
+            refresh_durations(module_ids=module_ids)
+
+            if adding:
+                UserCourseProgress.refresh_totals([self.module.course_id])
+            elif len(module_ids) > 1 or getattr(self, '_loaded_deleted', False) != (self.deleted_at is not None):
+                # Soft deletes and moves also change how many completed topics still count
+                UserCourseProgress.rebuild_modules(module_ids)
+        self._loaded_module_id = self.module_id
+        self._loaded_deleted = self.deleted_at is not None
+
+def refresh_durations(module_ids=(), course_ids=()):
+    """
+    Recompute persisted module and course durations in the caller's transaction.
+    The course rows are locked first so concurrent topic edits on the same
+    course recompute one after the other instead of overwriting each other.
+    """
+    course_ids = set(course_ids)
+    if module_ids:
+        course_ids.update(
+            CourseModules.objects.filter(id__in=module_ids).values_list('course_id', flat=True)
+        )
+    if not course_ids:
+        return
 
-        # Clear course duration cache when topic duration changes
-        from django.core.cache import cache
-        cache_key = f"course_duration_{self.module.course.guid}"
-        cache.delete(cache_key)
+    list(Courses.objects.select_for_update().filter(id__in=course_ids).order_by('id').values_list('id', flat=True))
+    if module_ids:
+        CourseModules.refresh_total_durations(module_ids)
+    Courses.refresh_total_durations(course_ids)
 
 class ModuleQuizes(models.Model):
     guid = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
@@ -476,9 +507,22 @@ class ModuleQuizes(models.Model):
 
     class Meta:
         db_table = 'module_quizes'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_module_id = instance.__dict__.get('module_id')
+        return instance
     
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        answer_keys.invalidate(self.pk)
+        loaded_module_id = getattr(self, '_loaded_module_id', None)
+        if not adding and loaded_module_id != self.module_id:
+            # Its questions move with it; final assessments (no module) don't count towards progress
+            UserCourseProgress.rebuild_modules({self.module_id, loaded_module_id} - {None})
+        self._loaded_module_id = self.module_id
     
     def clean(self):
         if not self.module and not self.course:
@@ -507,6 +551,12 @@ class QuizQuestions(models.Model):
 
     class Meta:
         db_table = 'quiz_questions'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_quiz_id = instance.__dict__.get('quiz_id')
+        return instance
     
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -523,8 +573,20 @@ class QuizQuestions(models.Model):
             })
 
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         self.full_clean()
         super().save(*args, **kwargs)
+        answer_keys.invalidate(self.quiz_id, getattr(self, '_loaded_quiz_id', None))
+        from main.analytics import mark_stale
+        for quiz_id in {self.quiz_id, getattr(self, '_loaded_quiz_id', None)}:
+            mark_stale(quiz_id)
+        loaded_quiz_id = getattr(self, '_loaded_quiz_id', None)
+        self._loaded_quiz_id = self.quiz_id
+        if adding and self.quiz.module_id:
+            UserCourseProgress.refresh_totals([self.quiz.module.course_id])
+        elif not adding and loaded_quiz_id != self.quiz_id:
+            module_ids = ModuleQuizes.objects.filter(id__in=[self.quiz_id, loaded_quiz_id]).values_list('module_id', flat=True)
+            UserCourseProgress.rebuild_modules(set(module_ids) - {None})
 
 class QuizResponses(models.Model):
     guid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -541,38 +603,57 @@ class QuizResponses(models.Model):
     deleted_by = models.CharField(max_length=200,blank=True,null=True)
 
     def save(self, *args, **kwargs):
-        if self.selected_answer not in self.question.options:
-            raise ValueError("Selected answer must be one of the available options.")
-        self.is_correct = self.selected_answer == self.question.correct_answer
+        # Views that already hold the answer key pass it as _answer_key to skip the question lookup
+        entry = getattr(self, '_answer_key', None) or answer_keys.get_question_key(self.question)
+        if entry is None:
+            raise ValueError("Question not found or has been deleted.")
+        self.is_correct = answer_keys.grade(entry, self.selected_answer)
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
-        try:
-            # Fixed: Correct relationship path quiz -> module
-            # progress, created = UserModuleProgress.objects.get_or_create(
-            #     user=self.user,
-            #     module=self.question.quiz.module
-            # )
-            # progress.update_quiz_progress()
-            transaction.on_commit(lambda: self.update_user_module_progress())
-        except Exception as e:
-            # Optional: log
-            print(f"Error updating module progress: {e}")
-
-    def update_user_module_progress(self):
-            """Update the user's module progress."""
-            progress, created = UserModuleProgress.objects.get_or_create(
-                user=self.user,
-                module=self.question.quiz.module
-            )
-            progress.update_quiz_progress()
+        # One row per (user, question), so only the first answer counts towards course progress
+        if adding and entry['module_id'] is not None:
+            UserCourseProgress.apply_delta(self.user_id, entry['course_id'], answered_questions=1)
+
+        # Coalesced with the user's other answers into one recalculation per module
+        from main.analytics import mark_stale
+        from main.progress import mark_dirty
+        mark_dirty(self.user_id, entry['module_id'])
+        mark_stale(entry['quiz_id'])
+
+    @classmethod
+    def submission_summary(cls, quiz_ids):
+        """
+        One row per (quiz, learner) who answered any of these quizzes, from a single grouped
+        aggregate: answered and correct counts, the latest answer and whether the instructor
+        left feedback, alongside the learner's name and email.
+        """
+        from django.db.models import Count, Exists, F, Max, OuterRef, Q
+
+        return cls.objects.filter(
+            question__quiz_id__in=quiz_ids,
+            deleted_at__isnull=True
+        ).values(
+            'user_id', 'user__guid', 'user__first_name', 'user__last_name', 'user__email',
+            quiz_id=F('question__quiz_id'),
+        ).annotate(
+            answered_questions=Count('id'),
+            correct_answers=Count('id', filter=Q(is_correct=True)),
+            submitted_at=Max('answered_at'),
+            has_feedback=Exists(QuizSubmissionFeedback.objects.filter(
+                user_id=OuterRef('user_id'), quiz_id=OuterRef('quiz_id'), deleted_at__isnull=True
+            )),
+        )
 
     def __str__(self):
         return f"{self.question.question_text[:30]}"
 
     class Meta:
         db_table = 'quiz_question_response'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'question'], name='unique_user_question_response'),
+        ]
         indexes = [
-            models.Index(fields=['user', 'question']),
             models.Index(fields=['is_correct']),
             models.Index(fields=['answered_at']),
         ]
@@ -626,9 +707,6 @@ class UserModuleProgress(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     module = models.ForeignKey(CourseModules, on_delete=models.CASCADE)
     progress = models.FloatField(default=0.0) 
-    topics_completed = ArrayField(
-        models.UUIDField(), blank=True, default=list
-    )
     quiz_completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(blank=True, null=True)
     
@@ -641,14 +719,6 @@ class UserModuleProgress(models.Model):
             models.Index(fields=['completed_at']),
         ]
     
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        
-        # Clear course progress cache when module progress changes
-        from django.core.cache import cache
-        cache_key = f"course_progress_{self.module.course.guid}_{self.user.guid}"
-        cache.delete(cache_key)
-    
     def update_quiz_progress(self):
         """Update progress based on quiz responses for this module."""
         # Total questions in this module
@@ -671,20 +741,262 @@ class UserModuleProgress(models.Model):
         self.progress = (correct_answers / total_questions) * 100.0
         self.save()
 
+    @classmethod
+    def refresh_quiz_progress(cls, user, modules):
+        """
+        update_quiz_progress for every module at once: one grouped aggregate over the modules'
+        questions and the user's correct responses, then inserts for missing rows and
+        updates only for rows whose progress changed. Returns the rows in module order.
+        """
+        from django.db.models import Count, FilteredRelation, Q
+
+        modules = list(modules)
+        totals = {
+            row['quiz__module']: row
+            for row in QuizQuestions.objects.filter(quiz__module__in=modules).annotate(
+                user_responses=FilteredRelation('responses', condition=Q(responses__user=user, responses__is_correct=True))
+            ).values('quiz__module').annotate(
+                total_questions=Count('id', distinct=True),
+                correct_answers=Count('user_responses'),
+            )
+        }
+
+        def quiz_progress(module):
+            row = totals.get(module.id)
+            if not row:
+                return 100.0
+            return (row['correct_answers'] / row['total_questions']) * 100.0
+
+        existing = {progress.module_id: progress for progress in cls.objects.filter(user=user, module__in=modules)}
+        missing = [
+            cls(user=user, module=module, progress=quiz_progress(module))
+            for module in modules if module.id not in existing
+        ]
+        changed = []
+        for module in modules:
+            progress = existing.get(module.id)
+            if progress is not None and progress.progress != quiz_progress(module):
+                progress.progress = quiz_progress(module)
+                changed.append(progress)
+
+        if changed:
+            cls.objects.bulk_update(changed, ['progress'])
+        if missing:
+            # A concurrent request may have inserted some of them; re-read so guids match the database
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+            existing.update(
+                (progress.module_id, progress)
+                for progress in cls.objects.filter(user=user, module__in=[row.module for row in missing])
+            )
+
+        rows = []
+        for module in modules:
+            progress = existing[module.id]
+            progress.module = module
+            progress.user = user
+            rows.append(progress)
+        return rows
+
     def update_topic_progress(self):
         """Calculate progress based on topics completed vs total topics."""
         total_topics = self.module.moduletopics_set.filter(deleted_at__isnull=True).count()
         if total_topics == 0:
             self.progress = 100.0
         else:
-            self.progress = (len(self.topics_completed) / total_topics) * 100.0
+            completed_topics = UserTopicCompletion.objects.filter(
+                user_id=self.user_id, topic__module_id=self.module_id, topic__deleted_at__isnull=True
+            ).count()
+            self.progress = (completed_topics / total_topics) * 100.0
         self.save()  
     
     @property
     def topics_completed_guids(self):
         """Return list of completed topic GUIDs"""
-        return self.topics_completed or []
-    
+        return list(
+            UserTopicCompletion.objects.filter(
+                user_id=self.user_id, topic__module_id=self.module_id
+            ).order_by('id').values_list('topic__guid', flat=True)
+        )
+
+
+class UserTopicCompletion(models.Model):
+    """One row per completed topic; the unique (user, topic) pair makes completing a topic idempotent"""
+    guid = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='topic_completions')
+    topic = models.ForeignKey(ModuleTopics, on_delete=models.CASCADE, related_name='completions')
+    completed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'user_topic_completion'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'topic'], name='unique_user_topic_completion'),
+        ]
+
+    @classmethod
+    def complete(cls, user, topic):
+        """
+        Record that the user completed the topic. Returns True only for the call that
+        inserted the row, so concurrent completions of the same topic are counted once.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {cls._meta.db_table} (guid, user_id, topic_id, completed_at) "
+                "VALUES (%s, %s, %s, %s) ON CONFLICT (user_id, topic_id) DO NOTHING RETURNING id",
+                [str(uuid.uuid4()), user.pk, topic.pk, timezone.now()]
+            )
+            return cursor.fetchone() is not None
+
+
+class UserCourseProgress(models.Model):
+    """Running progress counters per user and course, so progress reads don't recount topics and answers"""
+    guid = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='course_progress')
+    course = models.ForeignKey(Courses, on_delete=models.CASCADE, related_name='user_progress')
+    completed_topics = models.IntegerField(default=0)
+    answered_questions = models.IntegerField(default=0)
+    # Course-wide totals, copied onto every row so a single row answers a progress read
+    total_topics = models.IntegerField(default=0)
+    total_questions = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_course_progress'
+        unique_together = ('user', 'course')
+
+    @property
+    def percentage(self):
+        total_units = self.total_topics + self.total_questions
+        if total_units == 0:
+            return 100.0
+        return round((self.completed_topics + self.answered_questions) * 100 / total_units, 2)
+
+    @classmethod
+    def percentage_subquery(cls, user, course):
+        """
+        Progress percentage of one row as a subquery, for annotating course or enrollment querysets
+        (user and course may be OuterRefs). NULL when the row doesn't exist yet.
+        """
+        total_units = models.F('total_topics') + models.F('total_questions')
+        percentage = models.Case(
+            models.When(total_topics=0, total_questions=0, then=models.Value(100.0)),
+            default=Cast(models.F('completed_topics') + models.F('answered_questions'), models.FloatField()) * 100 / total_units,
+            output_field=models.FloatField(),
+        )
+        return models.Subquery(
+            cls.objects.filter(user=user, course=course).annotate(_percentage=percentage).values('_percentage')[:1]
+        )
+
+    @classmethod
+    def for_user(cls, user, course):
+        """
+        The user's counters on the course. Reads never create the row (apply_delta and
+        backfill_course_progress do): an enrolled user without one gets unsaved counters,
+        anyone else None.
+        """
+        progress = cls.objects.filter(user=user, course=course).first()
+        if progress is None and UsersCourseEnrollment.objects.filter(user=user, course=course, deleted_at__isnull=True).exists():
+            progress = cls.recount(course.pk, [user.pk])[0]
+        return progress
+
+    @classmethod
+    def lock(cls, user_id, course_id):
+        """Lock the user's row on the course until the transaction ends, creating it first if it's missing."""
+        rows = cls.objects.select_for_update().filter(user_id=user_id, course_id=course_id)
+        if not list(rows.values_list('id', flat=True)):
+            # A concurrent creator makes this insert wait for its commit and then skip, so the lock sees its counts
+            cls.objects.bulk_create(cls.recount(course_id, [user_id]), ignore_conflicts=True)
+            list(rows.values_list('id', flat=True))
+
+    @classmethod
+    def apply_delta(cls, user_id, course_id, **deltas):
+        """Increment counters in the database; a missing row is built from scratch, which already includes the change."""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        updated = cls.objects.filter(user_id=user_id, course_id=course_id).update(
+            updated_at=timezone.now(),
+            **{field: models.F(field) + delta for field, delta in deltas.items()}
+        )
+        if not updated:
+            cls.rebuild(course_id, [user_id])
+
+    @classmethod
+    def refresh_totals(cls, course_ids):
+        """Recount total topics and questions for every row of these courses in one UPDATE."""
+        from django.db.models import Count, OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+
+        topics = ModuleTopics.objects.filter(
+            module__course=OuterRef('course'), deleted_at__isnull=True
+        ).order_by().values('module__course').annotate(total=Count('id')).values('total')
+        questions = QuizQuestions.objects.filter(
+            quiz__module__course=OuterRef('course')
+        ).order_by().values('quiz__module__course').annotate(total=Count('id')).values('total')
+        cls.objects.filter(course_id__in=course_ids).update(
+            total_topics=Coalesce(Subquery(topics), 0),
+            total_questions=Coalesce(Subquery(questions), 0),
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def rebuild_modules(cls, module_ids):
+        """Rebuild every row of the courses these modules belong to, after content moved in or out of them."""
+        for course_id in set(CourseModules.objects.filter(id__in=module_ids).values_list('course_id', flat=True)):
+            cls.rebuild(course_id)
+
+    @classmethod
+    def rebuild(cls, course_id, user_ids=None):
+        """
+        Recount the counters of these users (default: everyone with a row) on one course
+        from UserTopicCompletion and QuizResponses, and upsert them.
+        """
+        if user_ids is None:
+            user_ids = list(cls.objects.filter(course_id=course_id).values_list('user_id', flat=True))
+        if not user_ids:
+            return []
+
+        return cls.objects.bulk_create(
+            cls.recount(course_id, user_ids),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['user', 'course'],
+            update_fields=['completed_topics', 'answered_questions', 'total_topics', 'total_questions', 'updated_at'],
+        )
+
+    @classmethod
+    def recount(cls, course_id, user_ids):
+        """Unsaved counters of these users on one course, counted from UserTopicCompletion and QuizResponses."""
+        from django.db.models import Count
+
+        total_topics = ModuleTopics.objects.filter(module__course_id=course_id, deleted_at__isnull=True).count()
+        total_questions = QuizQuestions.objects.filter(quiz__module__course_id=course_id).count()
+
+        completed = dict(
+            UserTopicCompletion.objects.filter(
+                user_id__in=user_ids, topic__module__course_id=course_id, topic__deleted_at__isnull=True
+            ).values('user_id').annotate(total=Count('id')).values_list('user_id', 'total')
+        )
+
+        answered = dict(
+            QuizResponses.objects.filter(
+                user_id__in=user_ids, question__quiz__module__course_id=course_id
+            ).values('user_id').annotate(total=Count('question', distinct=True)).values_list('user_id', 'total')
+        )
+
+        now = timezone.now()
+        return [
+            cls(
+                user_id=user_id,
+                course_id=course_id,
+                completed_topics=completed.get(user_id, 0),
+                answered_questions=answered.get(user_id, 0),
+                total_topics=total_topics,
+                total_questions=total_questions,
+                updated_at=now,
+            )
+            for user_id in user_ids
+        ]
+
 
 class UsersCourseEnrollment(models.Model):
     guid = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
@@ -727,6 +1039,151 @@ class CourseInteractions(models.Model):
             models.Index(fields=['user', 'interaction_type']),
         ]
 
+class CourseInteractionStats(models.Model):
+    """Running interaction counters per course, kept in step with CourseInteractions"""
+    COUNTER_FIELDS = {
+        'like': 'likes',
+        'save': 'saves',
+        'review': 'reviews_count',
+    }
+
+    guid = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
+    course = models.OneToOneField(Courses, on_delete=models.CASCADE, related_name='interaction_stats')
+    likes = models.IntegerField(default=0)
+    saves = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    reviews_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'course_interaction_stats'
+
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return 0
+        return round(self.rating_sum / self.rating_count, 1)
+
+    @classmethod
+    def apply_delta(cls, course, **deltas):
+        """Increment/decrement counters in the database so concurrent writers don't lose updates."""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        cls.objects.get_or_create(course=course)
+        cls.objects.filter(course=course).update(
+            updated_at=timezone.now(),
+            **{field: models.F(field) + delta for field, delta in deltas.items()}
+        )
+
+    @classmethod
+    def rebuild(cls, course_ids):
+        """Recount the counters of these courses from CourseInteractions in one grouped query."""
+        from django.db.models import Count, Q, Sum
+
+        totals = {
+            row['course_id']: row
+            for row in CourseInteractions.objects.filter(course_id__in=course_ids).values('course_id').annotate(
+                likes=Count('id', filter=Q(interaction_type='like')),
+                saves=Count('id', filter=Q(interaction_type='save')),
+                rating_sum=Sum('rating', filter=Q(interaction_type='rating')),
+                rating_count=Count('id', filter=Q(interaction_type='rating')),
+                reviews_count=Count('id', filter=Q(interaction_type='review')),
+            )
+        }
+        now = timezone.now()
+        stats = []
+        for course_id in course_ids:
+            row = totals.get(course_id, {})
+            stats.append(cls(
+                course_id=course_id,
+                likes=row.get('likes', 0),
+                saves=row.get('saves', 0),
+                rating_sum=row.get('rating_sum') or 0,
+                rating_count=row.get('rating_count', 0),
+                reviews_count=row.get('reviews_count', 0),
+                updated_at=now,
+            ))
+        cls.objects.bulk_create(
+            stats,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['course'],
+            update_fields=['likes', 'saves', 'rating_sum', 'rating_count', 'reviews_count', 'updated_at'],
+        )
+
+
+class UploadSession(models.Model):
+    """
+    A file the browser uploads straight to storage (MinIO presigned PUT or a Cloudflare Stream
+    direct creator upload) or in resumable chunks through the API. It is only attached to its
+    topic once the object has been verified.
+    """
+    RESOURCE_TYPES = [("file", "File"), ("audio", "Audio"), ("video", "Video")]
+    PROVIDERS = [("minio", "MinIO"), ("cloudflare", "Cloudflare Stream")]
+    STATUSES = [("pending", "Pending"), ("completed", "Completed"), ("failed", "Failed")]
+
+    guid = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    topic = models.ForeignKey(ModuleTopics, on_delete=models.CASCADE, blank=True, null=True, related_name='upload_sessions')
+    resource_type = models.CharField(max_length=10, choices=RESOURCE_TYPES)
+    provider = models.CharField(max_length=20, choices=PROVIDERS)
+    file_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=200, blank=True, null=True)
+    size = models.BigIntegerField(blank=True, null=True)  # declared by the client, checked on completion
+    object_name = models.CharField(max_length=300, blank=True, null=True)  # MinIO object key
+    provider_uid = models.CharField(max_length=100, blank=True, null=True)  # Cloudflare Stream video uid
+    # Resumable uploads: bytes stored so far and the start offset of every chunk object, in order
+    resumable = models.BooleanField(default=False)
+    offset = models.BigIntegerField(default=0)
+    parts = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default="pending")
+    url = models.CharField(max_length=300, blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    expires_at = models.DateTimeField()
+    completed_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'upload_session'
+        indexes = [
+            models.Index(fields=['user', 'status']),
+        ]
+
+    def __str__(self):
+        return f'{self.file_name} ({self.status})'
+
+
+class UploadJob(models.Model):
+    """A file staged by UploadCourseResources and pushed to storage by the process_upload_job Celery task"""
+    STATUSES = [("queued", "Queued"), ("uploading", "Uploading"), ("done", "Done"), ("failed", "Failed")]
+
+    guid = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_jobs')
+    resource_type = models.CharField(max_length=10)
+    file_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=200, blank=True, null=True)
+    size = models.BigIntegerField(default=0)
+    staged_path = models.CharField(max_length=300, blank=True, null=True)  # default_storage name until the upload finishes
+    status = models.CharField(max_length=20, choices=STATUSES, default="queued")
+    url = models.CharField(max_length=300, blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'upload_job'
+        indexes = [
+            models.Index(fields=['user', 'status']),
+        ]
+
+    def __str__(self):
+        return f'{self.file_name} ({self.status})'
+
 
 class Main2FALog(models.Model): 
     guid = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
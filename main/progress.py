@@ -0,0 +1,84 @@
+"""
+Debounced recalculation of UserModuleProgress after quiz answers.
+
+Writers call `mark_dirty(user_id, module_id)` instead of recomputing inline. Once the
+transaction commits, the first mark of a (user, module) key schedules a single Celery
+task `PROGRESS_RECALC_DEBOUNCE` seconds out; marks that arrive before it runs are
+absorbed, so a learner answering a whole quiz costs one recalculation.
+
+With PROGRESS_RECALC_ASYNC off (tests, local runs without a worker) dirty keys
+collect in a process-local set and `flush()` recomputes them synchronously on commit.
+"""
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from KFCAcademy.tasks import recalculate_module_progress
+from main.models import CourseModules, UserModuleProgress, Users
+
+_pending = set()
+_lock = threading.Lock()
+
+
+def _dirty_key(user_id, module_id):
+    return f"progress:dirty:{user_id}:{module_id}"
+
+
+def mark_dirty(user_id, module_id):
+    """Queue a recalculation of this user's progress on this module."""
+    if module_id is None:
+        return
+    key = (user_id, module_id)
+    if settings.PROGRESS_RECALC_ASYNC:
+        transaction.on_commit(lambda: _schedule(*key))
+    else:
+        with _lock:
+            _pending.add(key)
+        transaction.on_commit(flush)
+
+
+def _schedule(user_id, module_id):
+    # cache.add is atomic: only the first mark in a window enqueues. The key outlives the countdown
+    # so a lost task can't block the pair forever.
+    debounce = settings.PROGRESS_RECALC_DEBOUNCE
+    if cache.add(_dirty_key(user_id, module_id), 1, timeout=debounce * 10):
+        recalculate_module_progress.apply_async(args=[user_id, module_id], countdown=debounce)
+
+
+def recalculate(keys):
+    """Recompute progress for (user_id, module_id) pairs, one batch per user."""
+    modules_by_user = defaultdict(set)
+    for user_id, module_id in keys:
+        modules_by_user[user_id].add(module_id)
+    if not modules_by_user:
+        return 0
+
+    users = Users.objects.in_bulk(list(modules_by_user))
+    modules = CourseModules.objects.in_bulk({module_id for module_ids in modules_by_user.values() for module_id in module_ids})
+    count = 0
+    for user_id, module_ids in modules_by_user.items():
+        user = users.get(user_id)
+        user_modules = [modules[module_id] for module_id in module_ids if module_id in modules]
+        if user is None or not user_modules:
+            continue
+        with transaction.atomic():
+            UserModuleProgress.refresh_quiz_progress(user, user_modules)
+        count += len(user_modules)
+    return count
+
+
+def recalculate_dirty(user_id, module_id):
+    """Celery entry point: clear the dirty mark first so answers arriving mid-run schedule another pass."""
+    cache.delete(_dirty_key(user_id, module_id))
+    return recalculate([(user_id, module_id)])
+
+
+def flush():
+    """Synchronously recompute every key marked dirty in this process."""
+    with _lock:
+        keys = list(_pending)
+        _pending.clear()
+    return recalculate(keys)
@@ -1,10 +1,11 @@
 import re
 from rest_framework import serializers
-from django.db.models import Prefetch
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch, Subquery
 from .models import (
-    ActionLogs, CourseInteractions, CourseModules, Courses, Main2FALog, Organizations, Permission, Users, Role, 
+    ActionLogs, CourseInteractions, CourseInteractionStats, CourseModules, Courses, Main2FALog, Organizations, Permission, Users, Role, 
     QuizQuestions, ModuleTopics, ModuleQuizes, QuizResponses, CourseDiscussions,
-    UsersCourseEnrollment, UserModuleProgress, QuizSubmissionFeedback
+    UsersCourseEnrollment, UserModuleProgress, QuizSubmissionFeedback, UserCourseProgress, UserTopicCompletion, UploadJob, UploadSession
 )
 from django.db.models import Avg, Count
 
@@ -255,28 +256,21 @@ class CourseModuleSerializer(serializers.ModelSerializer):
         """Return related topics for this module with user completion state"""
         user = self.context.get('user')
 
-        topics = obj.moduletopics_set.filter(
-            deleted_at__isnull=True
-        ).order_by('topic_order')
+        topics = self._get_module_topics(obj)
 
         # Default: no completed topics
         completed_topic_ids = set()
 
-        if user:
-            # Use prefetched progress if available (best case)
-            if hasattr(obj, '_prefetched_progress') and obj._prefetched_progress:
-                progress = obj._prefetched_progress[0]
-                completed_topic_ids = set(progress.topics_completed or [])
-            else:
-                # Fallback single query (not per topic)
-                progress = obj.usermoduleprogress_set.filter(user=user).only("topics_completed").first()
-                if progress:
-                    completed_topic_ids = set(progress.topics_completed or [])
+        if user and not all(hasattr(topic, '_is_completed') for topic in topics):
+            # Fallback single query (not per topic)
+            completed_topic_ids = set(
+                UserTopicCompletion.objects.filter(user=user, topic__module=obj).values_list('topic_id', flat=True)
+            )
 
         topic_data = []
 
         for topic in topics:
-            is_completed = str(topic.guid) in completed_topic_ids or topic.guid in completed_topic_ids
+            is_completed = topic._is_completed if hasattr(topic, '_is_completed') else topic.id in completed_topic_ids
 
             topic_data.append({
                 'guid': str(topic.guid),
@@ -322,25 +316,26 @@ class CourseModuleSerializer(serializers.ModelSerializer):
         """Return related quizzes (questions) with user answer state"""
         user = self.context.get('user')
 
-        quizzes = QuizQuestions.objects.filter(
-            quiz__module=obj,
-            deleted_at__isnull=True
-        ).order_by('order')
+        if hasattr(obj, '_prefetched_quizzes'):
+            quizzes = sorted(
+                (question for quiz in obj._prefetched_quizzes for question in quiz._prefetched_questions),
+                key=lambda question: (question.order, question.id)
+            )
+        else:
+            quizzes = QuizQuestions.objects.filter(
+                quiz__module=obj,
+                deleted_at__isnull=True
+            ).order_by('order', 'id')
 
         answered_question_ids = set()
 
-        if user:
-            # Single query: get all questions the user has responded to in this module
-            answered_question_ids = set(
-                QuizResponses.objects.filter(
-                    user=user,
-                    question__quiz__module=obj
-                ).values_list('question_id', flat=True).distinct()
-            )
+        if user and not all(hasattr(quiz, '_is_answered') for quiz in quizzes):
+            answered_question_ids = self._get_answered_question_ids(obj, user)
 
         quiz_data = []
 
         for quiz in quizzes:
+            is_answered = quiz._is_answered if hasattr(quiz, '_is_answered') else quiz.id in answered_question_ids
             quiz_data.append({
                 'guid': str(quiz.guid),
                 'question_text': quiz.question_text,
@@ -349,7 +344,7 @@ class CourseModuleSerializer(serializers.ModelSerializer):
                 'correct_answer': quiz.correct_answer,
                 'marks': quiz.marks,
                 'order': quiz.order,
-                'is_answered': quiz.id in answered_question_ids, 
+                'is_answered': is_answered,
                 'created_at': quiz.created_at
             })
 
@@ -357,11 +352,34 @@ class CourseModuleSerializer(serializers.ModelSerializer):
     
     def get_topic_count(self, obj):
         """Return count of topics in this module"""
+        if hasattr(obj, '_prefetched_topics'):
+            return len(obj._prefetched_topics)
         return obj.moduletopics_set.filter(deleted_at__isnull=True).count()
     
     def get_quiz_count(self, obj):
         """Return count of quizzes in this module"""
+        if hasattr(obj, '_prefetched_quizzes'):
+            return sum(1 for quiz in obj._prefetched_quizzes if quiz.deleted_at is None)
         return obj.quizzes.filter(deleted_at__isnull=True).count()
+
+    def _get_module_topics(self, obj):
+        if hasattr(obj, '_prefetched_topics'):
+            return obj._prefetched_topics
+        return obj.moduletopics_set.filter(
+            deleted_at__isnull=True
+        ).order_by('topic_order')
+
+    def _get_answered_question_ids(self, obj, user):
+        """Answered questions of the whole course, looked up once per request and shared by sibling modules"""
+        answered_by_course = self.context.setdefault('_answered_question_ids', {})
+        if obj.course_id not in answered_by_course:
+            answered_by_course[obj.course_id] = set(
+                QuizResponses.objects.filter(
+                    user=user,
+                    question__quiz__module__course_id=obj.course_id
+                ).values_list('question_id', flat=True)
+            )
+        return answered_by_course[obj.course_id]
     
     def create(self, validated_data):
         """Convert course UUID to Course instance"""
@@ -392,23 +410,50 @@ class CourseModuleSerializer(serializers.ModelSerializer):
     def setup_eager_loading(cls, queryset, user=None):
         """Optimize queryset to prevent N+1 queries for CourseModules"""
         queryset = queryset.select_related('course')
-        queryset = queryset.prefetch_related(
-            'moduletopics_set',
-            'quizzes',
-            'quizzes__quizquestions_set'
-        )
-        
+        return queryset.prefetch_related(*cls.get_prefetches(user=user))
+
+    @classmethod
+    def get_prefetches(cls, user=None, prefix=''):
+        """
+        Filtered, ordered prefetches read by get_topics/get_quizzes/counts.
+        `prefix` lets CourseSerializer reuse them through 'coursemodules_set__'.
+        """
+        questions = QuizQuestions.objects.filter(deleted_at__isnull=True).order_by('order', 'id')
+        topics = ModuleTopics.objects.filter(deleted_at__isnull=True).order_by('topic_order')
         if user:
-            from .models import UserModuleProgress
-            queryset = queryset.prefetch_related(
+            # Answer and completion state come back with the rows instead of a query per module
+            questions = questions.annotate(
+                _is_answered=Exists(QuizResponses.objects.filter(user=user, question=OuterRef('pk')))
+            )
+            topics = topics.annotate(
+                _is_completed=Exists(UserTopicCompletion.objects.filter(user=user, topic=OuterRef('pk')))
+            )
+
+        prefetches = [
+            Prefetch(
+                prefix + 'moduletopics_set',
+                queryset=topics,
+                to_attr='_prefetched_topics'
+            ),
+            Prefetch(
+                prefix + 'quizzes',
+                queryset=ModuleQuizes.objects.prefetch_related(
+                    Prefetch('quizquestions_set', queryset=questions, to_attr='_prefetched_questions')
+                ),
+                to_attr='_prefetched_quizzes'
+            ),
+        ]
+
+        if user:
+            prefetches.append(
                 Prefetch(
-                    'usermoduleprogress_set',
+                    prefix + 'usermoduleprogress_set',
                     queryset=UserModuleProgress.objects.filter(user=user),
                     to_attr='_prefetched_progress'
                 )
             )
-        
-        return queryset
+
+        return prefetches
 
 class CourseReviewSerializer(serializers.ModelSerializer):
     user = serializers.SerializerMethodField()
@@ -451,8 +496,107 @@ class CourseInteractionResponseSerializer(serializers.Serializer):
     summary = CourseInteractionSummarySerializer()
     reviews = CourseReviewSerializer(many=True)
 
+# Number of latest reviews embedded in course payloads; the rest are served by CourseReviews
+TOP_REVIEWS_LIMIT = 3
+
+
+def top_reviews_prefetch():
+    """Prefetch the latest reviews of every course in one windowed query"""
+    return Prefetch(
+        'courseinteractions_set',
+        queryset=CourseInteractions.objects.filter(
+            interaction_type="review"
+        ).select_related('user').order_by('-created_at', '-id')[:TOP_REVIEWS_LIMIT],
+        to_attr='_top_reviews'
+    )
+
+
+def course_top_reviews(course):
+    reviews = getattr(course, '_top_reviews', None)
+    if reviews is None:
+        reviews = CourseInteractions.objects.filter(
+            course=course,
+            interaction_type="review"
+        ).select_related('user').order_by('-created_at', '-id')[:TOP_REVIEWS_LIMIT]
+    return reviews
+
+
+def course_interaction_summary(course, user=None):
+    """Interaction counters for a course, read from CourseInteractionStats instead of counting rows"""
+    try:
+        stats = course.interaction_stats
+    except CourseInteractionStats.DoesNotExist:
+        stats = CourseInteractionStats(course=course)
+
+    data = {
+        "likes": stats.likes,
+        "saves": stats.saves,
+        "average_rating": stats.average_rating,
+        "ratings_count": stats.rating_count,
+        "reviews_count": stats.reviews_count,
+    }
+
+    if user and hasattr(course, '_user_liked'):
+        # Flags annotated by with_user_interactions, no extra queries
+        data.update({
+            "user_liked": course._user_liked,
+            "user_saved": course._user_saved,
+            "user_rating": course._user_rating
+        })
+    elif user:
+        interactions = CourseInteractions.objects.filter(course=course, user=user)
+        data.update({
+            "user_liked": interactions.filter(interaction_type="like").exists(),
+            "user_saved": interactions.filter(interaction_type="save").exists(),
+            "user_rating": interactions.filter(
+                interaction_type="rating"
+            ).values_list("rating", flat=True).first()
+        })
+
+    return data
+
+
+def with_user_interactions(queryset, user):
+    """Annotate the current user's like/save/rating flags on a Courses queryset in the same query"""
+    if not user:
+        return queryset
+
+    interactions = CourseInteractions.objects.filter(course=OuterRef('pk'), user=user)
+    return queryset.annotate(
+        _user_liked=Exists(interactions.filter(interaction_type="like")),
+        _user_saved=Exists(interactions.filter(interaction_type="save")),
+        _user_rating=Subquery(interactions.filter(interaction_type="rating").values('rating')[:1])
+    )
+
+def course_progress_for(obj, course, user):
+    """Progress annotated as _course_progress on obj (see UserCourseProgress.percentage_subquery), else read per row"""
+    percentage = getattr(obj, '_course_progress', None)
+    if percentage is not None:
+        return round(percentage, 2)
+    if not getattr(obj, '_enrolled', True):
+        # No row and no enrollment, nothing to count
+        return 0
+    return course.course_progress(user)
+
+def quiz_submission_summary(row, total_questions):
+    """One learner's submission from a QuizResponses.submission_summary row"""
+    score_percentage = (row['correct_answers'] / total_questions * 100) if total_questions > 0 else 0
+    return {
+        'user': {
+            'guid': str(row['user__guid']),
+            'name': f"{row['user__first_name']} {row['user__last_name']}",
+            'email': row['user__email']
+        },
+        'answered_questions': row['answered_questions'],
+        'total_questions': total_questions,
+        'correct_answers': row['correct_answers'],
+        'score_percentage': round(score_percentage, 2),
+        'has_feedback': row['has_feedback'],
+        'submitted_at': row['submitted_at']
+    }
+
 class CourseSerializer(serializers.ModelSerializer):
-    total_duration = serializers.CharField(read_only=True)
+    total_duration = serializers.CharField(source='total_duration_display', read_only=True)
     course_progress = serializers.SerializerMethodField()
     modules = CourseModuleSerializer(source='coursemodules_set', many=True, read_only=True)
     instructor = serializers.CharField(required=False, allow_null=True, allow_blank=True)
@@ -511,63 +655,31 @@ class CourseSerializer(serializers.ModelSerializer):
         user = self.context.get('user')
         if not user:
             return 0
-        return obj.course_progress(user)
+        return course_progress_for(obj, obj, user)
     
     def get_course_iteractions(self, obj):
         user = self.context.get("user")
 
-        interactions = CourseInteractions.objects.filter(course=obj)
-
-        likes = interactions.filter(interaction_type="like").count()
-        saves = interactions.filter(interaction_type="save").count()
-
-        ratings = interactions.filter(interaction_type="rating")
-
-        avg_rating = ratings.aggregate(avg=Avg("rating"))["avg"]
-        ratings_count = ratings.count()
-
-        reviews_count = interactions.filter(interaction_type="review").count()
-
-        reviews = interactions.filter(interaction_type="review")
-
-        data = {
-            "likes": likes,
-            "saves": saves,
-            "average_rating": round(avg_rating, 1) if avg_rating else 0,
-            "ratings_count": ratings_count,
-            "reviews_count": reviews_count,
-            "reviews":CourseReviewSerializer(reviews,many=True).data
-        }
-
-        if user:
-            data.update({
-                "user_liked": interactions.filter(user=user, interaction_type="like").exists(),
-                "user_saved": interactions.filter(user=user, interaction_type="save").exists(),
-                "user_rating": interactions.filter(
-                    user=user, interaction_type="rating"
-                ).values_list("rating", flat=True).first()
-            })
+        data = course_interaction_summary(obj, user)
+        data["reviews"] = CourseReviewSerializer(course_top_reviews(obj), many=True).data
 
         return data
     
     @classmethod
     def setup_eager_loading(cls, queryset, user=None):
         """Optimize queryset to prevent N+1 queries"""
-        queryset = queryset.select_related('instructor', 'instructor__role')
-        queryset = queryset.prefetch_related(
-            'coursemodules_set__moduletopics_set',
-            'coursemodules_set__quizzes'
-        )
-        
+        queryset = queryset.select_related('instructor', 'instructor__role', 'interaction_stats')
+        queryset = with_user_interactions(queryset, user)
         if user:
-            from .models import UserModuleProgress
-            queryset = queryset.prefetch_related(
-                Prefetch(
-                    'coursemodules_set__usermoduleprogress_set',
-                    queryset=UserModuleProgress.objects.filter(user=user),
-                    to_attr='_prefetched_progress'
-                )
+            queryset = queryset.annotate(
+                _course_progress=UserCourseProgress.percentage_subquery(user, OuterRef('pk')),
+                _enrolled=Exists(UsersCourseEnrollment.objects.filter(user=user, course=OuterRef('pk'), deleted_at__isnull=True)),
             )
+        queryset = queryset.prefetch_related(
+            'coursemodules_set',
+            *CourseModuleSerializer.get_prefetches(user=user, prefix='coursemodules_set__'),
+            top_reviews_prefetch()
+        )
         
         return queryset
     
@@ -613,51 +725,63 @@ class CourseInteractSerializer(serializers.Serializer):
         course = Courses.objects.get(guid=validated_data["course_guid"])
         interaction_type = validated_data["interaction_type"]
 
-        interaction = CourseInteractions.objects.filter(
-            user=user,
-            course=course,
-            interaction_type=interaction_type
-        ).first()
-
-        # Toggle for like/save
-        if interaction_type in ["like", "save"]:
-            if interaction:
-                interaction.delete()
-                return {"removed": True, "interaction_type": interaction_type}
-
-            CourseInteractions.objects.create(
+        with transaction.atomic():
+            interaction = CourseInteractions.objects.filter(
                 user=user,
                 course=course,
                 interaction_type=interaction_type
-            )
-
-            return {"removed": False, "interaction_type": interaction_type}
+            ).first()
 
-        # Rating (update if exists)
-        if interaction_type == "rating":
-            if interaction:
-                interaction.rating = validated_data["rating"]
-                interaction.save()
-            else:
-                interaction = CourseInteractions.objects.create(
-                    user=user,
-                    course=course,
-                    interaction_type="rating",
-                    rating=validated_data["rating"]
-                )
+            # Toggle for like/save
+            if interaction_type in ["like", "save"]:
+                counter = CourseInteractionStats.COUNTER_FIELDS[interaction_type]
+                if interaction:
+                    interaction.delete()
+                    CourseInteractionStats.apply_delta(course, **{counter: -1})
+                    return {"removed": True, "interaction_type": interaction_type}
 
-        # Review (update if exists)
-        if interaction_type == "review":
-            if interaction:
-                interaction.review_text = validated_data["review_text"]
-                interaction.save()
-            else:
-                interaction = CourseInteractions.objects.create(
+                CourseInteractions.objects.create(
                     user=user,
                     course=course,
-                    interaction_type="review",
-                    review_text=validated_data["review_text"]
+                    interaction_type=interaction_type
                 )
+                CourseInteractionStats.apply_delta(course, **{counter: 1})
+
+                return {"removed": False, "interaction_type": interaction_type}
+
+            # Rating (update if exists)
+            if interaction_type == "rating":
+                if interaction:
+                    previous_rating = interaction.rating or 0
+                    interaction.rating = validated_data["rating"]
+                    interaction.save()
+                    CourseInteractionStats.apply_delta(
+                        course, rating_sum=validated_data["rating"] - previous_rating
+                    )
+                else:
+                    interaction = CourseInteractions.objects.create(
+                        user=user,
+                        course=course,
+                        interaction_type="rating",
+                        rating=validated_data["rating"]
+                    )
+                    CourseInteractionStats.apply_delta(
+                        course, rating_sum=validated_data["rating"], rating_count=1
+                    )
+
+            # Review (update if exists)
+            if interaction_type == "review":
+                if interaction:
+                    interaction.review_text = validated_data["review_text"]
+                    interaction.save()
+                else:
+                    interaction = CourseInteractions.objects.create(
+                        user=user,
+                        course=course,
+                        interaction_type="review",
+                        review_text=validated_data["review_text"]
+                    )
+                    CourseInteractionStats.apply_delta(course, reviews_count=1)
 
         return {
             "message": "Interaction processed successfully",
@@ -924,6 +1048,9 @@ class QuizResponseSerializer(serializers.ModelSerializer):
             'selected_answer', 'is_correct', 'correct_answer', 'answered_at', 'created_at'
         ]
         read_only_fields = ['guid', 'is_correct', 'answered_at', 'created_at']
+        # user/question arrive as GUIDs, so the validator generated from the (user, question) constraint can't
+        # check them; SubmitQuizResponse updates the existing row instead of creating a second one
+        validators = []
 
     def get_user_details(self, obj):
         """Return user details for display"""
@@ -1048,7 +1175,14 @@ class CourseEnrollmentSerializer(serializers.ModelSerializer):
         return f"{obj.user.first_name} {obj.user.last_name}"
     
     def get_progress(self, obj):
-        return obj.course.course_progress(obj.user) if obj.course else 0
+        return course_progress_for(obj, obj.course, obj.user) if obj.course else 0
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load users and courses in the same query and annotate each enrollee's progress"""
+        return queryset.select_related('user', 'course').annotate(
+            _course_progress=UserCourseProgress.percentage_subquery(OuterRef('user'), OuterRef('course'))
+        )
     
     def create(self, validated_data):
         """Convert user and course UUIDs to model instances"""
@@ -1104,6 +1238,7 @@ class UserProgressSerializer(serializers.ModelSerializer):
     user_details = serializers.SerializerMethodField(read_only=True)
     module_details = serializers.SerializerMethodField(read_only=True)
     progress = serializers.SerializerMethodField()
+    topics_completed = serializers.SerializerMethodField()
     module_name = serializers.CharField(source='module.name', read_only=True)
     course_title = serializers.CharField(source='module.course.title', read_only=True)
     
@@ -1137,11 +1272,12 @@ class UserProgressSerializer(serializers.ModelSerializer):
     def get_progress(self, obj):
         return obj.progress
 
-    def to_representation(self, instance):
-        """Override to ensure fresh data"""
-        # Refresh the instance from database to get latest values
-        instance.refresh_from_db()
-        return super().to_representation(instance)
+    def get_topics_completed(self, obj):
+        """Completed topic GUIDs, attached by CourseProgress for all modules at once when available"""
+        topics_completed = getattr(obj, '_topics_completed', None)
+        if topics_completed is None:
+            topics_completed = obj.topics_completed_guids
+        return [str(guid) for guid in topics_completed]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1177,7 +1313,7 @@ class PublicCourseSerializer(serializers.ModelSerializer):
     """Simplified serializer for public course listings"""
     instructor_name = serializers.SerializerMethodField()
     instructor_image = serializers.SerializerMethodField()
-    total_duration = serializers.CharField(read_only=True)
+    total_duration = serializers.CharField(source='total_duration_display', read_only=True)
     course_iteractions = serializers.SerializerMethodField(read_only=True)
     
     class Meta:
@@ -1197,41 +1333,19 @@ class PublicCourseSerializer(serializers.ModelSerializer):
         if obj.instructor and obj.instructor.image.url:
             return obj.instructor.image.url
         return None
+
+    @staticmethod
+    def setup_eager_loading(queryset, user=None):
+        """Optimize catalog queryset: counters and user flags come back with the courses"""
+        queryset = queryset.select_related('instructor', 'interaction_stats')
+        queryset = queryset.prefetch_related(top_reviews_prefetch())
+        return with_user_interactions(queryset, user)
     
     def get_course_iteractions(self, obj):
         user = self.context.get("user")
 
-        interactions = CourseInteractions.objects.filter(course=obj)
-
-        likes = interactions.filter(interaction_type="like").count()
-        saves = interactions.filter(interaction_type="save").count()
-
-        ratings = interactions.filter(interaction_type="rating")
-
-        avg_rating = ratings.aggregate(avg=Avg("rating"))["avg"]
-        ratings_count = ratings.count()
-
-        reviews_count = interactions.filter(interaction_type="review").count()
-
-        reviews = interactions.filter(interaction_type="review")
-
-        data = {
-            "likes": likes,
-            "saves": saves,
-            "average_rating": round(avg_rating, 1) if avg_rating else 0,
-            "ratings_count": ratings_count,
-            "reviews_count": reviews_count,
-            "reviews":CourseReviewSerializer(reviews,many=True).data
-        }
-
-        if user:
-            data.update({
-                "user_liked": interactions.filter(user=user, interaction_type="like").exists(),
-                "user_saved": interactions.filter(user=user, interaction_type="save").exists(),
-                "user_rating": interactions.filter(
-                    user=user, interaction_type="rating"
-                ).values_list("rating", flat=True).first()
-            })
+        data = course_interaction_summary(obj, user)
+        data["reviews"] = CourseReviewSerializer(course_top_reviews(obj), many=True).data
 
         return data
     
@@ -1273,7 +1387,7 @@ class CourseDiscussionSerializer(serializers.ModelSerializer):
                 'guid': str(obj.user.guid),
                 'name': f"{obj.user.first_name} {obj.user.last_name}",
                 'email': obj.user.email,
-                'image': obj.user.image.image if obj.user.image else None,
+                'image': obj.user.image.url if obj.user.image else None,
             }
         return None
 
@@ -1363,6 +1477,18 @@ class TopicCompletionSerializer(serializers.Serializer):
             raise serializers.ValidationError("Topic not found or has been deleted")
 
 
+class QuizAnswerSerializer(serializers.Serializer):
+    """One answer inside a bulk quiz submission"""
+    question = serializers.UUIDField(required=True)
+    selected_answer = serializers.CharField(max_length=255)
+
+
+class QuizSubmissionSerializer(serializers.Serializer):
+    """Serializer for submitting every answer of a quiz at once"""
+    quiz = serializers.UUIDField(required=True)
+    answers = QuizAnswerSerializer(many=True, allow_empty=False)
+
+
 class EnrolledCourseSerializer(serializers.ModelSerializer):
     """Serializer for courses in 'My Courses' view"""
     guid = serializers.UUIDField(source='course.guid', read_only=True)
@@ -1372,7 +1498,7 @@ class EnrolledCourseSerializer(serializers.ModelSerializer):
     isPaid = serializers.BooleanField(source='course.isPaid', read_only=True)
     amount = serializers.DecimalField(source='course.amount', max_digits=10, decimal_places=2, read_only=True)
     currency = serializers.CharField(source='course.currency', read_only=True)
-    total_duration = serializers.CharField(source='course.total_duration', read_only=True)
+    total_duration = serializers.CharField(source='course.total_duration_display', read_only=True)
     learning_mode = serializers.CharField(source='course.learning_mode', read_only=True)
     venue = serializers.CharField(source='course.venue', read_only=True)
     training_date = serializers.DateTimeField(source='course.training_date', read_only=True)
@@ -1398,7 +1524,7 @@ class EnrolledCourseSerializer(serializers.ModelSerializer):
         # Get the user from context
         user = self.context.get('user')
         if user:
-            return obj.course.course_progress(user)
+            return course_progress_for(obj, obj.course, user)
         return 0
     
     def get_instructor(self, obj):
@@ -1419,6 +1545,9 @@ class EnrolledCourseSerializer(serializers.ModelSerializer):
         ).filter(
             deleted_at__isnull=True,
             course__deleted_at__isnull=True
+        ).annotate(
+            # Progress of the enrolled user, the same user the view lists courses for
+            _course_progress=UserCourseProgress.percentage_subquery(OuterRef('user'), OuterRef('course'))
         )
 
 
@@ -1639,3 +1768,45 @@ class FilePathSerializer(serializers.Serializer):
         help_text="Path of the file for generating a presigned URL."
     )
 
+
+class FilePathsSerializer(serializers.Serializer):
+    file_paths = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=200,
+        help_text="Paths of the files for generating presigned URLs."
+    )
+
+
+class CreateUploadSessionSerializer(serializers.Serializer):
+    """Serializer for opening a direct-to-storage upload"""
+    type = serializers.ChoiceField(choices=[choice for choice, _ in UploadSession.RESOURCE_TYPES])
+    file_name = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1, required=False)
+    content_type = serializers.CharField(max_length=200, required=False)
+    topic = serializers.UUIDField(required=False)
+
+
+class ResumableUploadSerializer(CreateUploadSessionSerializer):
+    """Serializer for opening a resumable upload; the total size is required up front"""
+    size = serializers.IntegerField(min_value=1)
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    topic = serializers.UUIDField(source='topic.guid', read_only=True, default=None)
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'guid', 'topic', 'resource_type', 'provider', 'file_name', 'content_type', 'size',
+            'resumable', 'offset', 'status', 'url', 'error', 'expires_at', 'completed_at', 'created_at'
+        ]
+
+
+class UploadJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadJob
+        fields = [
+            'guid', 'resource_type', 'file_name', 'content_type', 'size', 'status', 'url', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
@@ -6,7 +6,7 @@ import asyncio
 
 from KFCAcademy.tasks import create_action_log_async, send_email
 # from compliance_tool.tasks import create_action_log_async
-from main.models import ActionLogs, QuizResponses, UserModuleProgress
+from main.models import ActionLogs
 from django.db.models.signals import post_save, post_delete
 from django.apps import apps
 from django.forms.models import model_to_dict
@@ -105,14 +105,3 @@ def log_soft_delete(instance, user=None):
         action=f'delete {instance.__class__.__name__}',
         extra_details=extra_details
     )
-
-@receiver(post_save, sender=QuizResponses)
-def update_module_progress(sender, instance, **kwargs):
-    try:
-        progress, _ = UserModuleProgress.objects.get_or_create(
-            user=instance.user,
-            module=instance.question.quiz.module
-        )
-        progress.update_quiz_progress()
-    except Exception as e:
-        print(f"Error updating progress: {e}")
\ No newline at end of file
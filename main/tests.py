@@ -1,3 +1,1709 @@
-from django.test import TestCase
+"""
+Query budgets for every API endpoint.
 
-# Create your tests here.
+Each route in KFCAcademy/urls.py (and the main app it includes) has one row in
+BUDGETS with the request to send and the most SQL queries it may run.  The
+fixtures are seeded at a configurable size so an endpoint that is O(1) in
+queries keeps the same count however big the data gets, while an N+1 blows
+through its budget:
+
+    QUERY_BUDGET_SIZES="courses=5,modules=4,topics=6,questions=5,learners=8" python manage.py test main
+
+Endpoints that still scale with the data declare their budget as a function
+of the fixture sizes so the growth stays visible (and reviewable) until they
+are fixed.  Adding a route without a budget row fails the suite.
+"""
+import base64
+import csv
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import urlencode
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, models, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone
+from django_rest_passwordreset.models import ResetPasswordToken
+from openpyxl import load_workbook
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from KFCAcademy import cache as shared_cache
+from KFCAcademy.pagination import KeysetPagination
+from main.models import (
+    CourseDiscussions, CourseInteractions, CourseInteractionStats, CourseModules, Courses,
+    Main2FALog, ModuleQuizes, ModuleTopics, Organizations, Permission, QuizQuestions,
+    QuizResponses, QuizSubmissionFeedback, Role, UploadJob, UploadSession, UserCourseProgress, UserModuleProgress,
+    UserTopicCompletion, Users, UsersCourseEnrollment, refresh_durations
+)
+from main import analytics, answer_keys, exports, progress, uploads
+
+DEFAULT_SIZES = {'courses': 3, 'modules': 3, 'topics': 3, 'questions': 3, 'learners': 3}
+
+# URL namespaces that belong to third-party apps and are not ours to budget
+IGNORED_NAMESPACES = {'admin'}
+
+PASSWORD = 'Budget-Pass-123'
+
+
+def fixture_sizes():
+    """DEFAULT_SIZES overridden by QUERY_BUDGET_SIZES="courses=5,learners=10"."""
+    sizes = dict(DEFAULT_SIZES)
+    for item in filter(None, os.environ.get('QUERY_BUDGET_SIZES', '').split(',')):
+        name, _, value = item.partition('=')
+        if name.strip() not in sizes:
+            raise ValueError(f"Unknown fixture size {name!r}, expected one of {sorted(sizes)}")
+        sizes[name.strip()] = max(1, int(value))
+    return SimpleNamespace(**sizes)
+
+
+def endpoint(queries, method='get', user='learner', kwargs=None, data=None, query=None,
+             multipart=False, status=None):
+    """
+    One row of the budget table.
+
+    queries -- max SQL queries, or a callable taking the fixture sizes for endpoints that still scale
+    user    -- 'learner', 'instructor' or None for an anonymous request
+    kwargs/data/query -- callables taking the fixture namespace, for URL kwargs, body and query string
+    status  -- exact status expected; by default any non-error status passes
+    """
+    return {
+        'queries': queries, 'method': method, 'user': user, 'kwargs': kwargs, 'data': data,
+        'query': query, 'multipart': multipart, 'status': status,
+    }
+
+
+def paged(rows):
+    """Rows on the first page of a paginated list."""
+    return min(rows, api_settings.PAGE_SIZE)
+
+
+# =============================================================================
+# BUDGETS
+# =============================================================================
+
+BUDGETS = {
+    # Project level
+    'health_check': endpoint(0, user=None),
+    'schema-json': endpoint(0, user=None, kwargs=lambda f: {'format': '.json'}),
+    'schema-swagger-ui': endpoint(0, user=None),
+    'schema-redoc': endpoint(0, user=None),
+    'token-obtain': endpoint(5, 'post', user=None, data=lambda f: {'email': f.learner.email, 'password': PASSWORD}),
+    'token-2fa-obtain': endpoint(7, 'post', user=None, data=lambda f: {'email': f.learner.email, 'password': PASSWORD, 'otp': f.otp.otp}),
+    'token-refresh': endpoint(1, 'post', user=None, data=lambda f: {'refresh': str(RefreshToken.for_user(f.learner))}),
+    'password_reset:reset-password-request': endpoint(4, 'post', user=None, data=lambda f: {'email': f.learner.email}),
+    'password_reset:reset-password-validate': endpoint(1, 'post', user=None, data=lambda f: {'token': f.reset_token.key}),
+    'password_reset:reset-password-confirm': endpoint(7, 'post', user=None, data=lambda f: {'token': f.reset_token.key, 'password': 'An0ther-Budget-Pass'}),
+
+    # Organization & users
+    'main:sync_organization': endpoint(2, 'post', user=None, data=lambda f: {'member_id': f.organization.member_id}),
+    # N+1: UserSerializer loads each user's role
+    'main:all_users_by_entity': endpoint(lambda s: 5 + paged(s.learners + 2), user='instructor'),
+    'main:user_register': endpoint(12, 'post', user=None, data=lambda f: {
+        'email': 'new.learner@example.com', 'first_name': 'New', 'last_name': 'Learner',
+        'password': PASSWORD, 'is_active': True, 'organization': str(f.organization.guid),
+    }),
+    'main:one_user': endpoint(4, user='instructor', kwargs=lambda f: {'guid': f.learner.guid}),
+    'main:org_users': endpoint(4, user='instructor', kwargs=lambda f: {'guid': f.organization.id}),
+    'main:admin_create_user': endpoint(9, 'post', user='instructor', data=lambda f: {
+        'email': 'created.learner@example.com', 'first_name': 'Created', 'last_name': 'Learner',
+        'is_active': True, 'role': str(f.role.guid),
+    }),
+    'main:admin_reactivate_user': endpoint(4, 'post', user='instructor', data=lambda f: {'user_guid': str(f.inactive_user.guid)}),
+    'main:update_user_image': endpoint(4, 'put', user='learner', kwargs=lambda f: {'guid': f.learner.guid}, multipart=True,
+                                       data=lambda f: {'image': SimpleUploadedFile('avatar.gif', f.gif, 'image/gif')}),
+    'main:update_user': endpoint(6, 'patch', kwargs=lambda f: {'guid': f.learner.guid}, data=lambda f: {'bio': 'Grower'}),
+    'main:delete_user': endpoint(6, 'delete', user='instructor', kwargs=lambda f: {'guid': f.learners[-1].guid}),
+    'main:current_user': endpoint(3),
+    'main:first_time_update_user': endpoint(6, 'patch', kwargs=lambda f: {'guid': f.learner.guid}, data=lambda f: {'is_first_time_login': False}),
+
+    # Roles & permissions
+    'main:all_role': endpoint(3, user='instructor'),
+    'main:one_role': endpoint(3, user='instructor', kwargs=lambda f: {'guid': f.role.guid}),
+    'main:create_role': endpoint(5, 'post', user='instructor', data=lambda f: {'name': 'AUDITOR', 'permission': [str(f.permission.guid)]}),
+    'main:update_role': endpoint(4, 'patch', user='instructor', kwargs=lambda f: {'guid': f.role.guid}, data=lambda f: {'description': 'Learners'}),
+    'main:all_permissions': endpoint(2, user='instructor'),
+    'main:one_permission': endpoint(2, user='instructor', kwargs=lambda f: {'guid': f.permission.guid}),
+    'main:create_permissions': endpoint(2, 'post', user='instructor', data=lambda f: {'action': 'EXPORT', 'description': 'Export reports'}),
+    'main:update_permissions': endpoint(3, 'patch', user='instructor', kwargs=lambda f: {'guid': f.permission.guid}, data=lambda f: {'description': 'Read'}),
+    'main:delete_permissions': endpoint(4, 'delete', user='instructor', kwargs=lambda f: {'guid': f.permission.guid}),
+    'main:action_logs': endpoint(2, user='instructor'),
+
+    # Courses
+    'main:all_courses': endpoint(8),
+    'main:create_course': endpoint(8, 'post', user='instructor', data=lambda f: {
+        'title': 'New course', 'description': 'd', 'status': 'DRAFT', 'tags': [], 'expertise_level': 'Beginner',
+        'prerequisites': [], 'objectives': [], 'isPaid': False, 'amount': '0.00', 'currency': 'KES', 'isFeatured': False,
+        'learning_mode': 'online', 'venue': 'Online', 'training_date': '2026-01-15T09:00:00Z', 'instructor': str(f.instructor.guid),
+    }),
+    'main:one_course': endpoint(14, kwargs=lambda f: {'guid': f.course.guid}),
+    # N+1: the response re-serializes modules without prefetching
+    'main:update_course': endpoint(lambda s: 16 + 4 * s.modules, 'patch', user='instructor', kwargs=lambda f: {'guid': f.course.guid}, data=lambda f: {'title': 'Renamed'}),
+    'main:delete_course': endpoint(8, 'delete', user='instructor', kwargs=lambda f: {'guid': f.course.guid}),
+
+    # Course modules
+    'main:all_modules': endpoint(6),
+    'main:course_modules': endpoint(7, kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:create_module': endpoint(15, 'post', user='instructor', data=lambda f: {'course': str(f.course.guid), 'name': 'New module', 'order': 99}),
+    'main:one_module': endpoint(6, kwargs=lambda f: {'guid': f.module.guid}),
+    'main:update_module': endpoint(15, 'patch', user='instructor', kwargs=lambda f: {'guid': f.module.guid}, data=lambda f: {'name': 'Renamed'}),
+    'main:delete_module': endpoint(11, 'delete', user='instructor', kwargs=lambda f: {'guid': f.module.guid}),
+
+    # Module topics
+    'main:all_topics': endpoint(2),
+    'main:module_topics': endpoint(3, kwargs=lambda f: {'module_guid': f.module.guid}),
+    'main:create_topic': endpoint(14, 'post', user='instructor', data=lambda f: {
+        'module': str(f.module.guid), 'name': 'New topic', 'topic_order': 99, 'duration': '00:15:00',
+    }),
+    'main:one_topic': endpoint(4, kwargs=lambda f: {'guid': f.topic.guid}),
+    'main:update_topic': endpoint(12, 'patch', user='instructor', kwargs=lambda f: {'guid': f.topic.guid}, data=lambda f: {'duration': '00:20:00'}),
+    # Deleting a topic recounts every learner's progress on the course
+    'main:delete_topic': endpoint(19, 'delete', user='instructor', kwargs=lambda f: {'guid': f.topic.guid}),
+
+    # Quizzes
+    # N+1: question_count and final assessment course lookups per quiz
+    'main:all_quizzes': endpoint(lambda s: 3 + paged(s.courses * s.modules) + 2 * s.courses),
+    'main:module_quizzes': endpoint(5, kwargs=lambda f: {'module_guid': f.module.guid}),
+    'main:final_assess_quizzes': endpoint(5, kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:create_quiz': endpoint(9, 'post', user='instructor', data=lambda f: {'module': str(f.module.guid), 'name': 'New quiz'}),
+    # N+1: the user's response is looked up per question
+    'main:one_quiz': endpoint(lambda s: 7 + s.questions, kwargs=lambda f: {'guid': f.quiz.guid}),
+    'main:update_quiz': endpoint(7, 'patch', user='instructor', kwargs=lambda f: {'guid': f.quiz.guid}, data=lambda f: {'name': 'Renamed'}),
+    'main:delete_quiz': endpoint(3, 'delete', user='instructor', kwargs=lambda f: {'guid': f.quiz.guid}),
+
+    # Quiz questions
+    # N+1: quiz and module details are loaded per question
+    'main:all_questions': endpoint(lambda s: 2 + 2 * paged(s.questions * s.courses * (s.modules + 1)), user='instructor'),
+    # N+1: quiz and module details are loaded per question
+    'main:quiz_questions': endpoint(lambda s: 3 + 2 * s.questions, user='instructor', kwargs=lambda f: {'quiz_guid': f.quiz.guid}),
+    'main:create_question': endpoint(9, 'post', user='instructor', data=lambda f: {
+        'quiz': str(f.quiz.guid), 'question_type': 'mcq', 'question_text': 'New?', 'options': ['a', 'b'],
+        'correct_answer': 'a', 'marks': 1, 'order': 99,
+    }),
+    'main:one_question': endpoint(4, user='instructor', kwargs=lambda f: {'guid': f.question.guid}),
+    'main:update_question': endpoint(8, 'patch', user='instructor', kwargs=lambda f: {'guid': f.question.guid}, data=lambda f: {'marks': 2}),
+    'main:delete_question': endpoint(8, 'delete', user='instructor', kwargs=lambda f: {'guid': f.question.guid}),
+
+    # Learning
+    'main:enroll_course': endpoint(13, 'post', user='instructor', data=lambda f: {'course': str(f.course.guid)}),
+    'main:unenroll_course': endpoint(4, 'delete', kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:my_courses': endpoint(2),
+    'main:course_progress': endpoint(9, kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:mark_topic_complete': endpoint(13, 'post', data=lambda f: {'topic_guid': str(f.last_topic.guid)}),
+    'main:create_course_interactions': endpoint(8, 'post', data=lambda f: {'course_guid': str(f.course.guid), 'interaction_type': 'save'}),
+    'main:delete_course_interactions': endpoint(8, 'delete', kwargs=lambda f: {'interaction_guid': f.review.guid}, status=204),
+    'main:course_interactions': endpoint(6, kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:course_reviews': endpoint(3, kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:course_certificate': endpoint(4, 'post', kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:submit_quiz_response': endpoint(6, 'post', data=lambda f: {'question': str(f.question.guid), 'selected_answer': 'b'}),
+    'main:submit_all_quiz_responses': endpoint(9, 'post', data=lambda f: {
+        'quiz': str(f.quiz.guid), 'answers': [{'question': str(question.guid), 'selected_answer': 'a'} for question in f.quiz_questions],
+    }),
+    # N+1: question details are loaded per response
+    'main:quiz_results': endpoint(lambda s: 9 + s.questions, kwargs=lambda f: {'quiz_guid': f.quiz.guid}),
+
+    # Public catalogue
+    'main:public_courses': endpoint(2, user=None),
+    'main:featured_courses': endpoint(2, user=None),
+
+    # Instructor
+    'main:course_gradebook': endpoint(5, user='instructor', kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:course_enrollments_export': endpoint(3, user='instructor', kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:course_enrollments': endpoint(4, user='instructor', kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:course_quiz_submissions': endpoint(4, user='instructor', kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:quiz_submissions': endpoint(4, user='instructor', kwargs=lambda f: {'quiz_guid': f.quiz.guid}),
+    'main:quiz_submissions_export': endpoint(3, user='instructor', kwargs=lambda f: {'quiz_guid': f.quiz.guid}, query=lambda f: {'file_type': 'xlsx'}),
+    # Computed inline on the cold cache; cached reads run 2
+    'main:quiz_item_analysis': endpoint(5, user='instructor', kwargs=lambda f: {'quiz_guid': f.quiz.guid}),
+    # N+1: the response is looked up per question
+    'main:user_quiz_submission_detail': endpoint(lambda s: 12 + s.questions, user='instructor', kwargs=lambda f: {'user_guid': f.learner.guid, 'quiz_guid': f.quiz.guid}),
+    'main:add_quiz_feedback': endpoint(13, 'post', user='instructor', kwargs=lambda f: {'user_guid': f.learner.guid, 'quiz_guid': f.quiz.guid},
+                                       data=lambda f: {'feedback': 'Well done', 'score': '80.00'}),
+
+    # Discussions
+    'main:course_discussions': endpoint(5, kwargs=lambda f: {'course_guid': f.course.guid}),
+    'main:create_discussion': endpoint(8, 'post', data=lambda f: {'course': str(f.course.guid), 'comment': 'Hello'}),
+    'main:one_discussion': endpoint(6, kwargs=lambda f: {'guid': f.discussion.guid}),
+    'main:update_discussion': endpoint(6, 'patch', kwargs=lambda f: {'guid': f.discussion.guid}, data=lambda f: {'comment': 'Edited'}),
+    'main:delete_discussion': endpoint(6, 'delete', kwargs=lambda f: {'guid': f.discussion.guid}),
+
+    # Files
+    'main:upload_course_resource': endpoint(2, 'post', user='instructor', multipart=True, status=202,
+                                            data=lambda f: {'type': 'file', 'file': SimpleUploadedFile('notes.pdf', b'%PDF-1.4', 'application/pdf')}),
+    'main:upload_job_status': endpoint(2, user='instructor', kwargs=lambda f: {'guid': f.upload_job.guid}),
+    'main:delete_course_resource': endpoint(1, 'delete', user='instructor', query=lambda f: {'type': 'file', 'filename': 'notes.pdf'}),
+    'main:file_presign': endpoint(4, 'post', user='learner', data=lambda f: {'file_path': f.last_topic.files[0]}),
+    'main:file_presign_batch': endpoint(4, 'post', user='learner', data=lambda f: {'file_paths': f.last_topic.files}),
+    'main:create_upload_session': endpoint(3, 'post', user='instructor', data=lambda f: {
+        'type': 'file', 'file_name': 'handbook.pdf', 'size': 8, 'content_type': 'application/pdf', 'topic': str(f.topic.guid),
+    }, status=201),
+    'main:complete_upload_session': endpoint(6, 'post', user='instructor', kwargs=lambda f: {'guid': f.upload_session.guid}),
+    'main:create_resumable_upload': endpoint(3, 'post', user='instructor', data=lambda f: {
+        'type': 'video', 'file_name': 'lecture.mp4', 'size': 8 * 1024 * 1024 * 1024, 'topic': str(f.topic.guid),
+    }, status=201),
+    'main:resumable_upload': endpoint(2, 'head', user='instructor', kwargs=lambda f: {'guid': f.resumable_session.guid}),
+}
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+# 1x1 transparent GIF for image uploads
+GIF = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00'
+    b',\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+
+def build_fixture(sizes):
+    """Seed courses x modules x topics x questions with `learners` users enrolled in every course."""
+    role = Role.objects.create(name='LEARNER')
+    permission = Permission.objects.create(action='READ')
+    role.permission.add(permission)
+    organization = Organizations.objects.create(member_id='KFC-001', org_name='Budget Roses', is_active=True)
+
+    def make_user(name, **extra):
+        user = Users(username=name, email=f'{name}@example.com', first_name=name.title(), last_name='Budget',
+                     role=role, is_first_time_login=False, **extra)
+        user.set_password(PASSWORD)
+        user.save()
+        return user
+
+    instructor = make_user('instructor', is_staff=True)
+    learners = [make_user(f'learner{index}') for index in range(sizes.learners)]
+    inactive_user = make_user('inactive', is_active=False)
+
+    courses = [
+        Courses.objects.create(title=f'Course {index}', description='d', status='PUBLISHED', isFeatured=True,
+                               instructor=instructor, expertise_level='Beginner', order=index)
+        for index in range(sizes.courses)
+    ]
+    modules = CourseModules.objects.bulk_create([
+        CourseModules(course=course, name=f'Module {index}', order=index)
+        for course in courses for index in range(sizes.modules)
+    ])
+    topics = ModuleTopics.objects.bulk_create([
+        ModuleTopics(module=module, name=f'Topic {index}', topic_order=index, duration=timedelta(minutes=10))
+        for module in modules for index in range(sizes.topics)
+    ])
+    quizzes = ModuleQuizes.objects.bulk_create(
+        [ModuleQuizes(module=module, name=f'{module.name} quiz') for module in modules]
+        + [ModuleQuizes(course=course, name='Final assessment') for course in courses]
+    )
+    questions = QuizQuestions.objects.bulk_create([
+        QuizQuestions(quiz=quiz, question_type='mcq', question_text=f'Question {index}', options=['a', 'b', 'c'],
+                      correct_answer='a', order=index)
+        for quiz in quizzes for index in range(sizes.questions)
+    ])
+    refresh_durations(module_ids=[module.id for module in modules])
+
+    # The last course is only browsed, so catalogue reads also cover users without progress rows
+    enrolled_courses = courses[:-1] or courses
+    UsersCourseEnrollment.objects.bulk_create([
+        UsersCourseEnrollment(user=learner, course=course) for learner in learners for course in enrolled_courses
+    ])
+    QuizResponses.objects.bulk_create([
+        QuizResponses(user=learner, question=question, selected_answer=answer, is_correct=answer == question.correct_answer)
+        for learner in learners
+        for question, answer in zip(questions, ('a', 'b') * len(questions))
+    ])
+    first_topics = {topic.module_id: topic for topic in reversed(topics)}
+    UserModuleProgress.objects.bulk_create([
+        UserModuleProgress(user=learner, module=module, progress=50.0)
+        for learner in learners for module in modules
+    ])
+    UserTopicCompletion.objects.bulk_create([
+        UserTopicCompletion(user=learner, topic=first_topics[module.id])
+        for learner in learners for module in modules
+    ])
+    for course in enrolled_courses:
+        UserCourseProgress.rebuild(course.id, [learner.id for learner in learners])
+    QuizSubmissionFeedback.objects.bulk_create([
+        QuizSubmissionFeedback(user=learner, quiz=quizzes[0], instructor=instructor, feedback='Good')
+        for learner in learners
+    ])
+
+    discussions = CourseDiscussions.objects.bulk_create([
+        CourseDiscussions(course=course, user=learner, comment='Question about the course')
+        for course in courses for learner in learners
+    ])
+    reviews = CourseInteractions.objects.bulk_create([
+        CourseInteractions(course=course, user=learner, interaction_type=interaction_type, rating=4, review_text='Useful')
+        for course in courses for learner in learners for interaction_type in ('like', 'review')
+    ])
+    for course in courses:
+        CourseInteractionStats.apply_delta(
+            course, likes=len(learners), reviews_count=len(learners),
+            rating_sum=4 * len(learners), rating_count=len(learners)
+        )
+
+    # OrgUsers looks up a single member
+    learner = learners[0]
+    learner.organization = organization
+    learner.save(update_fields=['organization'])
+
+    course_modules = [module for module in modules if module.course_id == courses[0].id]
+    module_topics = [topic for topic in topics if topic.module_id == course_modules[0].id]
+    # Files learners of the course may download
+    module_topics[-1].files = [f'kfc-academy/notes-{index}.pdf' for index in range(15)]
+    ModuleTopics.objects.filter(pk=module_topics[-1].pk).update(files=module_topics[-1].files)
+    return SimpleNamespace(
+        sizes=sizes,
+        gif=GIF,
+        role=role,
+        permission=permission,
+        organization=organization,
+        instructor=instructor,
+        learners=learners,
+        learner=learner,
+        inactive_user=inactive_user,
+        course=courses[0],
+        module=course_modules[0],
+        topic=module_topics[0],
+        last_topic=module_topics[-1],
+        quiz=quizzes[0],
+        question=questions[0],
+        quiz_questions=[question for question in questions if question.quiz_id == quizzes[0].id],
+        discussion=next(d for d in discussions if d.user_id == learner.id and d.course_id == courses[0].id),
+        review=next(r for r in reviews if r.user_id == learner.id and r.course_id == courses[0].id and r.interaction_type == 'review'),
+        otp=Main2FALog.objects.create(user=learner, otp='4321', status='Active', reason='Login OTP'),
+        reset_token=ResetPasswordToken.objects.create(user=learner),
+        upload_session=UploadSession.objects.create(
+            user=instructor, topic=module_topics[0], resource_type='file', provider='minio', file_name='notes.pdf',
+            size=len(b'%PDF-1.4'), object_name='uploads/notes.pdf', expires_at=timezone.now() + timedelta(hours=1),
+        ),
+        upload_job=UploadJob.objects.create(user=instructor, resource_type='file', file_name='notes.pdf', size=8),
+        resumable_session=UploadSession.objects.create(
+            user=instructor, topic=module_topics[0], resource_type='video', provider='minio', file_name='lecture.mp4',
+            size=8 * 1024 * 1024 * 1024, object_name='uploads/lecture.mp4', resumable=True,
+            expires_at=timezone.now() + timedelta(hours=1),
+        ),
+    )
+
+
+def route_names(resolver=None, namespace=''):
+    """Every named route reachable from the root URLconf, as 'namespace:name'."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace in IGNORED_NAMESPACES:
+                continue
+            prefix = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            yield from route_names(pattern, prefix)
+        elif pattern.name:
+            yield namespace + pattern.name
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+class ExternalServicesMixin:
+    """Keep the request path hermetic: no broker, storage, HTTP or PDF rendering."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._media_root = tempfile.mkdtemp()
+        cls._overrides = override_settings(
+            MEDIA_ROOT=cls._media_root,
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        )
+        cls._overrides.enable()
+
+        organization_api = mock.Mock()
+        organization_api.json.return_value = {'status': True, 'kfc_no': 'KFC-001', 'member_name': 'Budget Roses'}
+        pdf = mock.Mock()
+        pdf.return_value.write_pdf.return_value = b'%PDF-1.4'
+        cls._patchers = [
+            mock.patch('celery.app.task.Task.apply_async'),
+            mock.patch('main.views.requests.post', return_value=organization_api),
+            mock.patch('main.views.HTML', pdf),
+            mock.patch('main.uploads.upload_file_to_minio_task', return_value='kfc-academy/notes.pdf'),
+            mock.patch('main.uploads.upload_image_to_cloudflare_task', return_value='https://images.example.com/x'),
+            mock.patch('main.uploads.upload_video_to_cloudflare_task', return_value='https://videos.example.com/x'),
+            mock.patch('main.views.delete_file_from_minio_task'),
+            mock.patch('main.views.delete_cloudflare_file_task'),
+            mock.patch('main.uploads.presigned_put_to_minio', return_value='https://storage.example.com/put'),
+            mock.patch('main.uploads.stat_minio_object', return_value=SimpleNamespace(size=len(b'%PDF-1.4'), content_type='application/pdf')),
+            mock.patch('main.uploads.create_cloudflare_direct_upload', return_value=('video-uid', 'https://upload.example.com/video-uid')),
+            mock.patch('main.uploads.get_cloudflare_video', return_value={
+                'status': {'state': 'ready'}, 'playback': {'hls': 'https://videos.example.com/video-uid/manifest/video.m3u8'},
+            }),
+            mock.patch('main.uploads.delete_file_from_minio_task'),
+            mock.patch('main.uploads.put_minio_object'),
+            mock.patch('main.uploads.compose_minio_object'),
+            mock.patch('main.uploads.remove_minio_objects'),
+            mock.patch('main.uploads.get_from_minio', return_value='https://storage.example.com/get'),
+            mock.patch('main.uploads.copy_to_cloudflare', return_value='video-uid'),
+        ]
+        for patcher in cls._patchers:
+            patcher.start()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for patcher in reversed(cls._patchers):
+            patcher.stop()
+        cls._overrides.disable()
+        shutil.rmtree(cls._media_root, ignore_errors=True)
+
+
+class FixtureTestCase(ExternalServicesMixin, TestCase):
+    """Behaviour tests against one default-size fixture, with external services mocked out."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixture = build_fixture(SimpleNamespace(**DEFAULT_SIZES))
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Runs main's migrations from migrate_from to migrate_to on rows seeded with the historical models."""
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        self.latest = MigrationExecutor(connection).loader.graph.leaf_nodes('main')
+        self.apps = self.migrate(self.migrate_from)
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(self.latest)
+
+    @staticmethod
+    def migrate(name):
+        """Migrate main to `name` and return the app registry as of that migration."""
+        executor = MigrationExecutor(connection)
+        executor.migrate([('main', name)])
+        return executor.loader.project_state([('main', name)]).apps
+
+
+class EndpointQueryBudgetTests(ExternalServicesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.sizes = fixture_sizes()
+        cls.fixture = build_fixture(cls.sizes)
+
+    def test_every_route_has_a_budget(self):
+        names = list(route_names())
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        self.assertEqual(duplicates, [], "Route names must be unique to be budgeted")
+        self.assertEqual(sorted(set(names) - set(BUDGETS)), [], "Routes without a query budget")
+        self.assertEqual(sorted(set(BUDGETS) - set(names)), [], "Budgets for routes that no longer exist")
+
+    def test_query_budgets(self):
+        for name, budget in BUDGETS.items():
+            with self.subTest(name):
+                self.assertWithinBudget(name, budget)
+
+    def assertWithinBudget(self, name, budget):
+        fixture = self.fixture
+        client = APIClient()
+        if budget['user']:
+            user = getattr(fixture, budget['user'])
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+        url = reverse(name, kwargs=budget['kwargs'](fixture) if budget['kwargs'] else None)
+        options = {}
+        if budget['data']:
+            options['data'] = budget['data'](fixture)
+            options['format'] = 'multipart' if budget['multipart'] else 'json'
+        if budget['query']:
+            url = f"{url}?{urlencode(budget['query'](fixture))}"
+
+        allowed = budget['queries']
+        if callable(allowed):
+            allowed = allowed(self.sizes)
+
+        # Cold cache so cached endpoints are measured on a miss, and every
+        # request rolled back so writes cannot leak into the next row
+        cache.clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, budget['method'])(url, **options)
+                # Streamed exports run their queries while the body is consumed
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+
+        if budget['status'] is not None:
+            self.assertEqual(response.status_code, budget['status'], self._describe(name, response))
+        else:
+            self.assertLess(response.status_code, 400, self._describe(name, response))
+
+        executed = len(queries)
+        self.assertLessEqual(
+            executed, allowed,
+            f"{name} ran {executed} queries, budget is {allowed}:\n"
+            + "\n".join(f"  {query['sql'][:200]}" for query in queries.captured_queries)
+        )
+
+    @staticmethod
+    def _describe(name, response):
+        content = getattr(response, 'content', b'')[:500]
+        return f"{name} returned {response.status_code}: {content!r}"
+
+
+class KeysetPaginationTests(FixtureTestCase):
+    """Cursors seek past the last row of a page whatever the ordering, and reject anything they didn't encode."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        instructor = cls.fixture.instructor
+        Courses.objects.bulk_create([
+            Courses(title=f'Extra {index}', status='PUBLISHED', instructor=instructor, order=index % 2) for index in range(4)
+        ])
+        # Rows sharing a timestamp are told apart by id alone
+        Courses.objects.filter(title__startswith='Extra').update(created_at=timezone.now())
+
+    @staticmethod
+    def paginate(queryset, view=None, **params):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, Request(APIRequestFactory().get('/', params)), view)
+        return paginator, page
+
+    def walk(self, view=None, page_size=2):
+        seen, cursor = [], None
+        while True:
+            params = {'page_size': page_size, **({'cursor': cursor} if cursor else {})}
+            paginator, page = self.paginate(Courses.objects.all(), view, **params)
+            seen.extend(course.pk for course in page)
+            cursor = paginator.get_next_cursor()
+            if cursor is None:
+                return seen
+
+    def test_cursor_round_trip_visits_every_row_once(self):
+        expected = list(Courses.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk(), expected)
+
+        paginator, page = self.paginate(Courses.objects.all(), page_size=2)
+        self.assertEqual(paginator.decode_cursor(Request(APIRequestFactory().get('/', {'cursor': paginator.get_next_cursor()}))),
+                         [page[-1].created_at, page[-1].pk])
+
+    def test_mixed_direction_ordering(self):
+        view = SimpleNamespace(pagination_ordering=('order', '-id'))
+        expected = list(Courses.objects.order_by('order', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk(view, page_size=1), expected)
+        self.assertEqual(self.walk(view, page_size=3), expected)
+
+    @override_settings(PAGINATION_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        for requested, expected in (('1000', 3), ('0', 1), ('-5', 1), ('abc', 3)):
+            with self.subTest(page_size=requested):
+                paginator, page = self.paginate(Courses.objects.all(), page_size=requested)
+                self.assertEqual((paginator.page_size, len(page)), (expected, expected))
+
+    def test_invalid_cursors_are_not_found(self):
+        def encode(value):
+            return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+        cursors = {
+            'not base64': '%%%',
+            'not json': encode('not json'),
+            'not a list': encode('{"dt": "2026-01-01T00:00:00"}'),
+            'wrong length': encode('[1]'),
+            'missing dt': encode('[{"ts": 1}, 1]'),
+            'bad datetime': encode('[{"dt": "yesterday"}, 1]'),
+            'non-string datetime': encode('[{"dt": 5}, 1]'),
+            'text in the datetime column': encode('["2026-01-01", 1]'),
+            'list in the datetime column': encode('[[2026, 1, 1], 1]'),
+            'datetime in the id column': encode('[{"dt": "2026-01-01T00:00:00"}, {"dt": "2026-01-01T00:00:00"}]'),
+            'text in the id column': encode('[{"dt": "2026-01-01T00:00:00"}, "abc"]'),
+            'null id': encode('[{"dt": "2026-01-01T00:00:00"}, null]'),
+        }
+        for label, cursor in cursors.items():
+            with self.subTest(label):
+                with self.assertRaises(NotFound):
+                    self.paginate(Courses.objects.all(), cursor=cursor)
+
+
+class SharedCacheTests(TestCase):
+    """KFCAcademy.cache: tag generations, early recomputation and the batch reads and writes."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidating_a_tag_misses_its_entries_only(self):
+        shared_cache.set('ns', 'a', 1, tags=[shared_cache.tag('course', 1)])
+        shared_cache.set('ns', 'b', 2, tags=[shared_cache.tag('course', 2)])
+
+        shared_cache.invalidate_tags(shared_cache.tag('course', 1))
+
+        self.assertIsNone(shared_cache.get('ns', 'a'))
+        self.assertEqual(shared_cache.get('ns', 'a', default='missing'), 'missing')
+        self.assertEqual(shared_cache.get('ns', 'b'), 2)
+
+    def test_get_or_set_computes_once_until_invalidated(self):
+        compute = mock.Mock(side_effect=[1, 2])
+        tags = [shared_cache.tag('quiz', 1)]
+
+        self.assertEqual([shared_cache.get_or_set('ns', 'k', compute, tags=tags, beta=0) for _ in range(2)], [1, 1])
+        shared_cache.invalidate_tags(*tags)
+        self.assertEqual(shared_cache.get_or_set('ns', 'k', compute, tags=tags, beta=0), 2)
+        self.assertEqual(compute.call_count, 2)
+
+    def test_invalidation_during_compute_is_not_masked(self):
+        tags = [shared_cache.tag('quiz', 1)]
+
+        def compute():
+            shared_cache.invalidate_tags(*tags)
+            return 'stale'
+
+        shared_cache.get_or_set('ns', 'k', compute, tags=tags)
+        self.assertIsNone(shared_cache.get('ns', 'k'))
+
+    def test_slow_entries_are_recomputed_early(self):
+        # The first computation takes 10s, so near its expiry a refresh becomes likely
+        with mock.patch('KFCAcademy.cache.time.monotonic', side_effect=[0, 10]):
+            shared_cache.get_or_set('ns', 'k', lambda: 'first', timeout=60)
+        compute = mock.Mock(return_value='second')
+
+        with mock.patch('KFCAcademy.cache.random.random', return_value=1.0):
+            self.assertEqual(shared_cache.get_or_set('ns', 'k', compute, timeout=60), 'first')
+        with mock.patch('KFCAcademy.cache.random.random', return_value=1e-6):
+            # -10 * ln(1e-6) is about 138s, past the 60s expiry
+            self.assertEqual(shared_cache.get_or_set('ns', 'k', compute, timeout=60), 'second')
+            self.assertEqual(shared_cache.get_or_set('ns', 'k', compute, timeout=60, beta=0), 'second')
+        self.assertEqual(compute.call_count, 1)
+
+    def test_get_many_returns_fresh_entries_only(self):
+        shared_cache.set_many('ns', {'a': 1, 'b': 2}, tags=[shared_cache.tag('files')])
+        shared_cache.set('ns', 'c', 3)
+        cache.set(shared_cache.make_key('ns', 'd'), 'written without an entry wrapper')
+
+        self.assertEqual(shared_cache.get_many('ns', ['a', 'b', 'c', 'd', 'missing']), {'a': 1, 'b': 2, 'c': 3})
+        shared_cache.invalidate_tags(shared_cache.tag('files'))
+        self.assertEqual(shared_cache.get_many('ns', ['a', 'b', 'c']), {'c': 3})
+
+    def test_keys_are_namespaced_and_versioned(self):
+        self.assertEqual(shared_cache.make_key('ns', ('quiz', 7)), f'ns:v{shared_cache.KEY_VERSION}:quiz:7')
+
+
+class ProgressRecalculationTests(FixtureTestCase):
+    """Quiz answers mark (user, module) dirty; bursts must collapse into one recalculation."""
+
+    def setUp(self):
+        cache.clear()
+        progress._pending.clear()
+        self.learner = self.fixture.learner
+        self.module = self.fixture.module
+        self.questions = list(QuizQuestions.objects.filter(quiz=self.fixture.quiz).order_by('order'))
+        QuizResponses.objects.filter(user=self.learner, question__in=self.questions).delete()
+
+    def answer_quiz(self, questions):
+        for question in questions:
+            QuizResponses(user=self.learner, question=question, selected_answer=question.correct_answer).save()
+
+    def module_progress(self):
+        return UserModuleProgress.objects.get(user=self.learner, module=self.module).progress
+
+    def test_answers_are_recalculated_once_on_commit(self):
+        with mock.patch.object(UserModuleProgress, 'refresh_quiz_progress',
+                               wraps=UserModuleProgress.refresh_quiz_progress) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.answer_quiz(self.questions)
+
+        refresh.assert_called_once()
+        self.assertEqual(self.module_progress(), 100.0)
+
+    def test_flush_recalculates_pending_keys(self):
+        self.answer_quiz(self.questions[:1])
+
+        self.assertEqual(progress.flush(), 1)
+        self.assertAlmostEqual(self.module_progress(), 100.0 / len(self.questions))
+        self.assertEqual(progress.flush(), 0)
+
+    @override_settings(PROGRESS_RECALC_ASYNC=True)
+    def test_async_schedules_one_task_per_debounce_window(self):
+        with mock.patch('main.progress.recalculate_module_progress') as task:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.answer_quiz(self.questions[:-1])
+            task.apply_async.assert_called_once_with(
+                args=[self.learner.id, self.module.id], countdown=settings.PROGRESS_RECALC_DEBOUNCE
+            )
+
+            progress.recalculate_dirty(self.learner.id, self.module.id)
+            self.assertAlmostEqual(self.module_progress(), 100.0 * (len(self.questions) - 1) / len(self.questions))
+
+            # The task cleared the mark, so the next answer schedules a new pass
+            with self.captureOnCommitCallbacks(execute=True):
+                self.answer_quiz(self.questions[-1:])
+            self.assertEqual(task.apply_async.call_count, 2)
+
+
+class BulkQuizSubmissionTests(FixtureTestCase):
+    """quiz/submit_all/ grades every answer in one request and counts each question once."""
+
+    def setUp(self):
+        cache.clear()
+        progress._pending.clear()
+        self.learner = self.fixture.learner
+        self.questions = list(QuizQuestions.objects.filter(quiz=self.fixture.quiz).order_by('order'))
+        QuizResponses.objects.filter(user=self.learner, question__in=self.questions).delete()
+        UserCourseProgress.rebuild(self.fixture.course.id, [self.learner.id])
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.learner)}')
+
+    def submit(self, answers):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('main:submit_all_quiz_responses'), {
+                'quiz': str(self.fixture.quiz.guid),
+                'answers': [{'question': str(question.guid), 'selected_answer': answer} for question, answer in answers],
+            }, format='json')
+
+    def answered_questions(self):
+        return UserCourseProgress.objects.get(user=self.learner, course=self.fixture.course).answered_questions
+
+    def test_grades_upserts_and_recalculates_once(self):
+        answers = [(question, question.correct_answer) for question in self.questions[:-1]] + [(self.questions[-1], 'b')]
+        answered_before = self.answered_questions()
+        with mock.patch.object(UserModuleProgress, 'refresh_quiz_progress',
+                               wraps=UserModuleProgress.refresh_quiz_progress) as refresh:
+            response = self.submit(answers)
+
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()['data']
+        self.assertEqual((data['answered'], data['correct']), (len(self.questions), len(self.questions) - 1))
+        refresh.assert_called_once()
+        self.assertEqual(self.answered_questions(), answered_before + len(self.questions))
+
+        # Resubmitting updates the same rows and does not count the questions again
+        response = self.submit([(question, question.correct_answer) for question in self.questions])
+        self.assertEqual(response.json()['data']['correct'], len(self.questions))
+        self.assertEqual(QuizResponses.objects.filter(user=self.learner, question__in=self.questions).count(), len(self.questions))
+        self.assertEqual(self.answered_questions(), answered_before + len(self.questions))
+        self.assertEqual(UserModuleProgress.objects.get(user=self.learner, module=self.fixture.module).progress, 100.0)
+
+    def test_first_submission_creates_the_progress_row(self):
+        UserCourseProgress.objects.filter(user=self.learner, course=self.fixture.course).delete()
+
+        response = self.submit([(question, question.correct_answer) for question in self.questions])
+
+        self.assertEqual(response.status_code, 200, response.content)
+        expected = UserCourseProgress.recount(self.fixture.course.id, [self.learner.id])[0].answered_questions
+        self.assertEqual(self.answered_questions(), expected)
+
+    def test_invalid_answer_rejects_the_whole_submission(self):
+        response = self.submit([(self.questions[0], self.questions[0].correct_answer), (self.questions[1], 'z')])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(self.questions[1].guid), response.json()['data'])
+        self.assertFalse(QuizResponses.objects.filter(user=self.learner, question__in=self.questions).exists())
+
+
+class CourseProgressCounterTests(FixtureTestCase):
+    """UserCourseProgress counters follow completions, answers and course content moving between courses."""
+
+    def setUp(self):
+        self.learner = self.fixture.learner
+        self.course = self.fixture.course
+        self.other_course = Courses.objects.exclude(pk=self.course.pk).order_by('order').first()
+        self.other_module = CourseModules.objects.filter(course=self.other_course).order_by('order').first()
+
+    def counters(self, course):
+        progress = UserCourseProgress.objects.get(user=self.learner, course=course)
+        return progress.completed_topics, progress.answered_questions, progress.total_topics, progress.total_questions
+
+    def test_module_move_rebuilds_both_courses(self):
+        module = CourseModules.objects.get(pk=self.fixture.module.pk)
+        module.course = self.other_course
+        module.save()
+
+        # every learner completed one topic per module and answered every question
+        self.assertEqual(self.counters(self.course), (2, 6, 6, 6))
+        self.assertEqual(self.counters(self.other_course), (4, 12, 12, 12))
+
+    def test_quiz_move_rebuilds_both_courses(self):
+        quiz = ModuleQuizes.objects.get(pk=self.fixture.quiz.pk)
+        quiz.module = self.other_module
+        quiz.save()
+
+        self.assertEqual(self.counters(self.course), (3, 6, 9, 6))
+        self.assertEqual(self.counters(self.other_course), (3, 12, 9, 12))
+
+    def test_quiz_turned_final_assessment_stops_counting(self):
+        quiz = ModuleQuizes.objects.get(pk=self.fixture.quiz.pk)
+        quiz.module, quiz.course = None, self.course
+        quiz.save()
+
+        self.assertEqual(self.counters(self.course), (3, 6, 9, 6))
+
+    def test_question_move_rebuilds_both_courses(self):
+        other_quiz = ModuleQuizes.objects.get(module=self.other_module)
+        question = QuizQuestions.objects.get(pk=self.fixture.question.pk)
+        question.quiz = other_quiz
+        question.save()
+
+        self.assertEqual(self.counters(self.course), (3, 8, 9, 8))
+        self.assertEqual(self.counters(self.other_course), (3, 10, 9, 10))
+
+    def test_topic_completion_counts_once(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.learner)}')
+        for _ in range(2):
+            response = client.post(reverse('main:mark_topic_complete'), {'topic_guid': str(self.fixture.last_topic.guid)}, format='json')
+            self.assertEqual(response.status_code, 200, response.content)
+
+        self.assertEqual(self.counters(self.course), (4, 9, 9, 9))
+
+    def test_only_the_first_answer_counts(self):
+        question = self.fixture.question
+        QuizResponses.objects.filter(user=self.learner, question=question).delete()
+        UserCourseProgress.rebuild(self.course.id, [self.learner.id])
+
+        QuizResponses(user=self.learner, question=question, selected_answer='b').save()
+        self.assertEqual(self.counters(self.course), (3, 9, 9, 9))
+
+        response = QuizResponses.objects.get(user=self.learner, question=question)
+        response.selected_answer = 'a'
+        response.save()
+        self.assertEqual(self.counters(self.course), (3, 9, 9, 9))
+
+    def test_new_topics_and_questions_raise_the_totals(self):
+        ModuleTopics.objects.create(module=self.fixture.module, name='Extra topic', duration=timedelta(minutes=5))
+        self.assertEqual(self.counters(self.course), (3, 9, 10, 9))
+
+        QuizQuestions(quiz=self.fixture.quiz, question_text='Extra', options=['a', 'b'], correct_answer='a', order=99).save()
+        final = ModuleQuizes.objects.get(course=self.course, module__isnull=True)
+        QuizQuestions(quiz=final, question_text='Final extra', options=['a', 'b'], correct_answer='a', order=99).save()
+        # final assessments don't count towards progress
+        self.assertEqual(self.counters(self.course), (3, 9, 10, 10))
+
+    def test_soft_deleted_topic_stops_counting(self):
+        topic = ModuleTopics.objects.get(pk=self.fixture.topic.pk)
+        topic.deleted_at = timezone.now()
+        topic.save()
+        self.assertEqual(self.counters(self.course), (2, 9, 8, 9))
+
+        topic.deleted_at = None
+        topic.save()
+        self.assertEqual(self.counters(self.course), (3, 9, 9, 9))
+
+    def test_topic_move_rebuilds_both_courses(self):
+        topic = ModuleTopics.objects.get(pk=self.fixture.topic.pk)
+        topic.module = self.other_module
+        topic.save()
+
+        self.assertEqual(self.counters(self.course), (2, 9, 8, 9))
+        self.assertEqual(self.counters(self.other_course), (4, 9, 10, 9))
+
+    def test_percentage_subquery_matches_percentage(self):
+        QuizResponses.objects.filter(user=self.learner, question=self.fixture.question).delete()
+        UserCourseProgress.rebuild(self.course.id, [self.learner.id])
+
+        courses = Courses.objects.annotate(
+            progress=UserCourseProgress.percentage_subquery(self.learner, models.OuterRef('pk'))
+        )
+        rows = {row.course_id: row for row in UserCourseProgress.objects.filter(user=self.learner)}
+        self.assertLess(len(rows), len(courses), "the fixture has a course without a progress row")
+        for course in courses:
+            with self.subTest(course.title):
+                if course.pk in rows:
+                    self.assertAlmostEqual(course.progress, rows[course.pk].percentage, places=2)
+                else:
+                    self.assertIsNone(course.progress)
+
+    def test_reads_do_not_create_rows(self):
+        browsed = Courses.objects.order_by('order').last()
+        UserCourseProgress.objects.filter(user=self.learner, course=self.course).delete()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.learner)}')
+
+        for course, expected in ((browsed, 0), (self.course, 100 * 12 / 18)):
+            with self.subTest(course.title):
+                response = client.get(reverse('main:one_course', kwargs={'guid': course.guid}))
+                self.assertEqual(response.status_code, 200, response.content)
+                self.assertAlmostEqual(response.json()['course_progress'], expected, places=2)
+        self.assertFalse(UserCourseProgress.objects.filter(user=self.learner, course__in=[browsed, self.course]).exists())
+
+
+class InteractionStatsTests(FixtureTestCase):
+    """CourseInteractionStats counters follow likes, saves, ratings and reviews."""
+
+    def setUp(self):
+        self.course = self.fixture.course
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.fixture.learner)}')
+
+    def interact(self, interaction_type, **data):
+        response = self.client.post(reverse('main:create_course_interactions'), {
+            'course_guid': str(self.course.guid), 'interaction_type': interaction_type, **data,
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['result']
+
+    def stats(self, *fields):
+        return tuple(CourseInteractionStats.objects.values_list(*fields).get(course=self.course))
+
+    def test_like_and_save_toggle(self):
+        likes, saves = self.stats('likes', 'saves')
+
+        # the fixture learner already likes the course
+        self.assertTrue(self.interact('like')['removed'])
+        self.assertEqual(self.stats('likes', 'saves'), (likes - 1, saves))
+        self.assertFalse(self.interact('like')['removed'])
+        self.assertFalse(self.interact('save')['removed'])
+        self.assertEqual(self.stats('likes', 'saves'), (likes, saves + 1))
+        self.assertTrue(self.interact('save')['removed'])
+        self.assertEqual(self.stats('likes', 'saves'), (likes, saves))
+
+    def test_rating_change_moves_the_sum_only(self):
+        rating_sum, rating_count = self.stats('rating_sum', 'rating_count')
+
+        self.interact('rating', rating=5)
+        self.assertEqual(self.stats('rating_sum', 'rating_count'), (rating_sum + 5, rating_count + 1))
+        self.interact('rating', rating=2)
+        self.assertEqual(self.stats('rating_sum', 'rating_count'), (rating_sum + 2, rating_count + 1))
+
+    def test_review_delete_and_create(self):
+        reviews_count, = self.stats('reviews_count')
+
+        response = self.client.delete(reverse('main:delete_course_interactions', kwargs={'interaction_guid': self.fixture.review.guid}))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.stats('reviews_count'), (reviews_count - 1,))
+
+        self.interact('review', review_text='Clear and practical')
+        self.interact('review', review_text='Edited review')
+        self.assertEqual(self.stats('reviews_count'), (reviews_count,))
+
+
+class InteractionStatsMigrationTests(MigrationTestCase):
+    """0011 backfills CourseInteractionStats from the existing CourseInteractions."""
+    migrate_from = '0010_alter_courses_venue'
+    migrate_to = '0011_course_interaction_stats'
+
+    def test_backfill_matches_interactions(self):
+        apps = self.apps
+        Users = apps.get_model('main', 'Users')
+        users = [Users.objects.create(username=f'user{index}', email=f'user{index}@example.com', password='x') for index in range(3)]
+        Courses = apps.get_model('main', 'Courses')
+        course, quiet_course = (Courses.objects.create(title=title, status='PUBLISHED') for title in ('Busy', 'Quiet'))
+        CourseInteractions = apps.get_model('main', 'CourseInteractions')
+        CourseInteractions.objects.bulk_create(
+            [CourseInteractions(course=course, user=user, interaction_type='like') for user in users[:2]]
+            + [CourseInteractions(course=course, user=users[0], interaction_type='save')]
+            + [CourseInteractions(course=course, user=user, interaction_type='rating', rating=rating) for user, rating in zip(users, (3, 4, 5))]
+            + [CourseInteractions(course=course, user=users[1], interaction_type='review', review_text='Good')]
+            + [CourseInteractions(course=None, user=users[2], interaction_type='like')]
+        )
+
+        apps = self.migrate(self.migrate_to)
+        stats = {
+            row[0]: row[1:]
+            for row in apps.get_model('main', 'CourseInteractionStats').objects.values_list(
+                'course_id', 'likes', 'saves', 'rating_sum', 'rating_count', 'reviews_count'
+            )
+        }
+        self.assertEqual(stats, {course.id: (2, 1, 12, 3, 1), quiet_course.id: (0, 0, 0, 0, 0)})
+
+
+class DurationTests(FixtureTestCase):
+    """Persisted module and course total_duration follow topic and module changes."""
+
+    def setUp(self):
+        self.module = self.fixture.module
+        self.course = self.fixture.course
+        self.other_course = Courses.objects.exclude(pk=self.course.pk).order_by('order').first()
+        self.other_module = CourseModules.objects.filter(course=self.other_course).order_by('order').first()
+        self.topic = ModuleTopics.objects.get(pk=self.fixture.topic.pk)
+
+    def assertDurations(self, expected):
+        """expected maps modules and courses to their total in minutes"""
+        actual = {item: type(item).objects.get(pk=item.pk).total_duration for item in expected}
+        self.assertEqual(actual, {item: timedelta(minutes=minutes) for item, minutes in expected.items()})
+
+    def test_new_topic_is_added(self):
+        ModuleTopics.objects.create(module=self.module, name='Extra topic', duration=timedelta(minutes=5))
+        self.assertDurations({self.module: 35, self.course: 95})
+
+    def test_duration_edit(self):
+        self.topic.duration = timedelta(minutes=20)
+        self.topic.save()
+        self.assertDurations({self.module: 40, self.course: 100})
+
+    def test_soft_deleted_topic_is_dropped(self):
+        self.topic.deleted_at = timezone.now()
+        self.topic.save()
+        self.assertDurations({self.module: 20, self.course: 80})
+
+    def test_topic_move_to_another_course(self):
+        self.topic.module = self.other_module
+        self.topic.save()
+        self.assertDurations({self.module: 20, self.course: 80, self.other_module: 40, self.other_course: 100})
+
+    def test_module_move_to_another_course(self):
+        module = CourseModules.objects.get(pk=self.module.pk)
+        module.course = self.other_course
+        module.save()
+        self.assertDurations({module: 30, self.course: 60, self.other_course: 120})
+
+    def test_backfill_command(self):
+        CourseModules.objects.update(total_duration=timedelta(0))
+        Courses.objects.update(total_duration=timedelta(0))
+
+        call_command('backfill_course_durations', batch_size=2, stdout=io.StringIO())
+        self.assertDurations({self.module: 30, self.course: 90, self.other_module: 30, self.other_course: 90})
+
+
+class CourseProgressTests(FixtureTestCase):
+    """courses/<guid>/progress/ settles module progress on the first read and only reads afterwards."""
+
+    def setUp(self):
+        self.learner = self.fixture.learner
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.learner)}')
+        self.url = reverse('main:course_progress', kwargs={'course_guid': self.fixture.course.guid})
+
+    def test_repeated_read_does_not_write(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200, response.content)
+        writes = [query['sql'] for query in queries.captured_queries if query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(writes, [])
+
+    def test_module_progress_matches_the_model(self):
+        data = self.client.get(self.url).json()
+
+        modules = CourseModules.objects.filter(course=self.fixture.course).order_by('order')
+        self.assertEqual(
+            [(row['module_name'], row['progress']) for row in data['modules_progress']],
+            [(module.name, module.module_progress(self.learner)) for module in modules]
+        )
+        completed = {row['module_name']: row['topics_completed'] for row in data['modules_progress']}
+        self.assertEqual(completed[self.fixture.module.name], [str(self.fixture.topic.guid)])
+        self.assertEqual(data['overall_progress'], UserCourseProgress.for_user(self.learner, self.fixture.course).percentage)
+
+
+class AnswerKeyTests(FixtureTestCase):
+    """Grading reads the cached answer key, which must follow question edits."""
+
+    def setUp(self):
+        cache.clear()
+        self.quiz = self.fixture.quiz
+        self.question = QuizQuestions.objects.get(pk=self.fixture.question.pk)
+
+    def test_answer_key_is_cached(self):
+        answer_keys.get_answer_key(self.quiz.pk)
+        with self.assertNumQueries(0):
+            entry = answer_keys.get_answer_key(self.quiz.pk)[self.question.pk]
+        self.assertEqual(entry['correct_answer'], 'a')
+        self.assertEqual(entry['course_id'], self.fixture.course.id)
+
+    def test_question_edits_version_the_answer_key(self):
+        answer_keys.get_answer_key(self.quiz.pk)
+        self.question.correct_answer = 'c'
+        self.question.save()
+        self.assertTrue(answer_keys.grade(answer_keys.get_question_key(self.question), 'c'))
+
+        self.question.deleted_at = timezone.now()
+        self.question.save()
+        self.assertNotIn(self.question.pk, answer_keys.get_answer_key(self.quiz.pk))
+        with self.assertRaises(ValueError):
+            QuizResponses(user=self.fixture.learner, question=self.question, selected_answer='c').save()
+
+
+class QuizSubmissionReportTests(FixtureTestCase):
+    """Instructor reports are built from one grouped aggregate and paged per quiz."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.fixture.instructor)}')
+
+    def test_course_report_matches_the_responses(self):
+        response = self.client.get(reverse('main:course_quiz_submissions', kwargs={'course_guid': self.fixture.course.guid}))
+
+        self.assertEqual(response.status_code, 200, response.content)
+        report = next(quiz for quiz in response.json()['quizzes'] if quiz['quiz']['guid'] == str(self.fixture.quiz.guid))
+        self.assertEqual(report['submissions_count'], len(self.fixture.learners))
+        self.assertIsNone(report['next'])
+        for submission in report['submitted_users']:
+            responses = QuizResponses.objects.filter(user__guid=submission['user']['guid'], question__quiz=self.fixture.quiz)
+            self.assertEqual(submission['answered_questions'], responses.count())
+            self.assertEqual(submission['correct_answers'], responses.filter(is_correct=True).count())
+            self.assertTrue(submission['has_feedback'])
+
+    def test_quiz_submissions_continue_from_the_course_report_cursor(self):
+        response = self.client.get(
+            reverse('main:course_quiz_submissions', kwargs={'course_guid': self.fixture.course.guid}), {'page_size': 1}
+        )
+        report = next(quiz for quiz in response.json()['quizzes'] if quiz['quiz']['guid'] == str(self.fixture.quiz.guid))
+        self.assertEqual(len(report['submitted_users']), 1)
+
+        seen = [report['submitted_users'][0]['user']['guid']]
+        cursor = report['next']
+        while cursor:
+            page = self.client.get(
+                reverse('main:quiz_submissions', kwargs={'quiz_guid': self.fixture.quiz.guid}), {'page_size': 1, 'cursor': cursor}
+            ).json()
+            seen += [submission['user']['guid'] for submission in page['submissions']]
+            self.assertTrue(all(submission['feedback'] for submission in page['submissions']))
+            cursor = page['next']
+        self.assertEqual(sorted(seen), sorted(str(learner.guid) for learner in self.fixture.learners))
+
+
+class ItemAnalysisTests(FixtureTestCase):
+    """Item statistics come from the cached analysis, rebuilt after new answers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.questions = list(QuizQuestions.objects.filter(quiz=cls.fixture.quiz).order_by('order'))
+        # learner i answers the first len(learners) - i questions correctly: strong learners get the hard items right
+        QuizResponses.objects.filter(question__in=cls.questions).delete()
+        QuizResponses.objects.bulk_create([
+            QuizResponses(user=learner, question=question, selected_answer='a' if rank < len(cls.questions) - index else 'b',
+                          is_correct=rank < len(cls.questions) - index)
+            for index, learner in enumerate(cls.fixture.learners)
+            for rank, question in enumerate(cls.questions)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.fixture.instructor)}')
+        self.url = reverse('main:quiz_item_analysis', kwargs={'quiz_guid': self.fixture.quiz.guid})
+
+    def test_statistics_match_the_responses(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()['data']
+        self.assertEqual(data['respondents'], len(self.fixture.learners))
+        first, last = data['questions'][0], data['questions'][-1]
+        self.assertEqual(first['percent_correct'], 100.0)
+        self.assertIsNone(first['discrimination_index'])
+        self.assertAlmostEqual(last['percent_correct'], 100 / len(self.fixture.learners), places=2)
+        self.assertGreater(last['discrimination_index'], 0)
+        self.assertEqual({option['option']: option['count'] for option in last['options']},
+                         {'a': 1, 'b': len(self.fixture.learners) - 1, 'c': 0})
+
+        # Served from the cache afterwards
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_staff_can_view_and_learners_cannot(self):
+        staff = Users.objects.create(username='staff', email='staff@example.com', role=self.fixture.role, is_staff=True)
+        for user, status in ((staff, 200), (self.fixture.learner, 403)):
+            with self.subTest(user.username):
+                self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+                self.assertEqual(self.client.get(self.url).status_code, status)
+
+    @override_settings(ITEM_ANALYSIS_ASYNC=True)
+    def test_missing_analysis_is_scheduled_and_new_answers_refresh_it(self):
+        with mock.patch('main.analytics.refresh_item_analysis_task') as task:
+            self.assertEqual(self.client.get(self.url).status_code, 202)
+            self.assertEqual(self.client.get(self.url).status_code, 202)
+            task.apply_async.assert_called_once_with(args=[self.fixture.quiz.id], countdown=0)
+
+            analytics.refresh_item_analysis(self.fixture.quiz.id)
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                QuizResponses.objects.filter(user=self.fixture.learner, question=self.questions[0]).delete()
+                QuizResponses(user=self.fixture.learner, question=self.questions[0], selected_answer='c').save()
+            self.assertEqual(task.apply_async.call_count, 2)
+            task.apply_async.assert_called_with(args=[self.fixture.quiz.id], countdown=settings.ITEM_ANALYSIS_DEBOUNCE)
+
+    @override_settings(ITEM_ANALYSIS_ASYNC=True)
+    def test_cold_read_is_not_held_back_by_a_pending_debounce(self):
+        with mock.patch('main.analytics.refresh_item_analysis_task') as task:
+            analytics.schedule_refresh(self.fixture.quiz.id)
+            task.apply_async.assert_called_once_with(args=[self.fixture.quiz.id], countdown=settings.ITEM_ANALYSIS_DEBOUNCE)
+
+            self.assertEqual(self.client.get(self.url).status_code, 202)
+            task.apply_async.assert_called_with(args=[self.fixture.quiz.id], countdown=0)
+            self.assertEqual(task.apply_async.call_count, 2)
+
+
+class ExportTests(FixtureTestCase):
+    """Exports stream one row per enrollment or submission in the requested format."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.fixture.instructor)}')
+
+    def test_enrollments_csv_streams_every_learner(self):
+        response = self.client.get(reverse('main:course_enrollments_export', kwargs={'course_guid': self.fixture.course.guid}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['User GUID', 'Name', 'Email', 'Enrolled At', 'Progress %'])
+        self.assertEqual(sorted(row[2] for row in rows[1:]), sorted(learner.email for learner in self.fixture.learners))
+        progress = UserCourseProgress.objects.get(user=self.fixture.learner, course=self.fixture.course).percentage
+        self.assertIn([str(self.fixture.learner.guid), f'{self.fixture.learner.first_name} Budget', self.fixture.learner.email],
+                      [row[:3] for row in rows])
+        self.assertEqual(float(next(row for row in rows if row[2] == self.fixture.learner.email)[4]), progress)
+
+    def test_quiz_submissions_xlsx_includes_feedback(self):
+        response = self.client.get(reverse('main:quiz_submissions_export', kwargs={'quiz_guid': self.fixture.quiz.guid}),
+                                   {'file_type': 'xlsx'})
+
+        self.assertEqual(response.status_code, 200)
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(len(rows), len(self.fixture.learners) + 1)
+        self.assertEqual(rows[0][-1], 'Feedback')
+        self.assertTrue(all(row[-1] == 'Good' for row in rows[1:]))
+
+    def test_unknown_file_type_is_rejected(self):
+        response = self.client.get(reverse('main:course_enrollments_export', kwargs={'course_guid': self.fixture.course.guid}),
+                                   {'file_type': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_formulas_are_written_as_text(self):
+        Users.objects.filter(pk=self.fixture.learner.pk).update(first_name='=HYPERLINK("http://x")')
+        QuizSubmissionFeedback.objects.filter(user=self.fixture.learner).update(feedback='@SUM(A1)')
+
+        response = self.client.get(reverse('main:course_enrollments_export', kwargs={'course_guid': self.fixture.course.guid}))
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertIn('\'=HYPERLINK("http://x") Budget', [row[1] for row in rows])
+
+        response = self.client.get(reverse('main:quiz_submissions_export', kwargs={'quiz_guid': self.fixture.quiz.guid}),
+                                   {'file_type': 'xlsx'})
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True).active
+        self.assertIn("'@SUM(A1)", [row[-1] for row in sheet.iter_rows(values_only=True)])
+
+    def test_csv_failing_mid_stream_ends_with_a_marker(self):
+        def rows():
+            yield ('first',)
+            raise RuntimeError('connection lost')
+
+        with self.assertLogs('main.exports', level='ERROR'):
+            lines = b''.join(exports.stream_csv('broken', ['Value'], rows()).streaming_content).decode().splitlines()
+
+        self.assertEqual(lines, ['Value', 'first', exports.CSV_ERROR_MARKER])
+
+
+class GradebookTests(FixtureTestCase):
+    """The gradebook matrix matches the learners' marks and pages over learners."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.fixture.instructor)}')
+        self.url = reverse('main:course_gradebook', kwargs={'course_guid': self.fixture.course.guid})
+
+    def test_scores_are_marks_earned_per_quiz(self):
+        QuizResponses.objects.filter(user=self.fixture.learners[-1], question__quiz=self.fixture.quiz).delete()
+        data = self.client.get(self.url).json()
+
+        quiz_ids = {quiz.guid: quiz.id for quiz in ModuleQuizes.objects.filter(guid__in=[quiz['guid'] for quiz in data['quizzes']])}
+        # One quiz per module plus the course's final assessment
+        self.assertEqual(len(quiz_ids), self.fixture.sizes.modules + 1)
+        for learner in data['learners']:
+            for quiz, score in zip(data['quizzes'], learner['scores']):
+                responses = QuizResponses.objects.filter(user__guid=learner['guid'], question__quiz_id=quiz_ids[UUID(quiz['guid'])])
+                expected = sum(response.question.marks for response in responses if response.is_correct) if responses else None
+                self.assertEqual(score, expected)
+            self.assertEqual(learner['total'], sum(score or 0 for score in learner['scores']))
+
+        unanswered = next(learner for learner in data['learners'] if learner['guid'] == str(self.fixture.learners[-1].guid))
+        self.assertIsNone(unanswered['scores'][[quiz['guid'] for quiz in data['quizzes']].index(str(self.fixture.quiz.guid))])
+
+    def test_learners_are_cursor_paginated(self):
+        seen = []
+        params = {'page_size': 2}
+        while True:
+            data = self.client.get(self.url, params).json()
+            seen += [learner['guid'] for learner in data['learners']]
+            if not data['next']:
+                break
+            params['cursor'] = data['next']
+        self.assertEqual(sorted(seen), sorted(str(learner.guid) for learner in self.fixture.learners))
+
+
+class StreamingUploadTests(TestCase):
+
+    def test_minio_upload_streams_the_file_in_parts(self):
+        from KFCAcademy.utils import utils
+
+        content = os.urandom(3 * 1024 * 1024 + 17)
+        upload = SimpleUploadedFile('notes.pdf', content, content_type='application/pdf')
+        received = []
+
+        def put_object(bucket_name, object_name, data, length, **kwargs):
+            # Read the way minio does: one part at a time, never more than the part size
+            while True:
+                part = data.read(1024 * 1024)
+                if not part:
+                    break
+                self.assertLessEqual(len(part), 1024 * 1024)
+                received.append(part)
+
+        with mock.patch.object(utils, 'minio_client') as client:
+            client.put_object.side_effect = put_object
+            url = utils.upload_file_to_minio_task(upload, 'notes.pdf')
+
+        self.assertEqual(url, f"{settings.MINIO_STORAGE_BUCKET_NAME}/notes.pdf")
+        args, kwargs = client.put_object.call_args
+        self.assertEqual(args[3], len(content))
+        self.assertEqual(kwargs['part_size'], settings.MINIO_UPLOAD_PART_SIZE)
+        self.assertEqual(kwargs['num_parallel_uploads'], 1)
+        self.assertEqual(kwargs['content_type'], 'application/pdf')
+        self.assertEqual(b''.join(received), content)
+
+    def test_chunked_stream_pulls_chunks_on_demand(self):
+        from KFCAcademy.utils.utils import ChunkedUploadStream
+
+        upload = mock.Mock()
+        pulled = []
+
+        def chunks(chunk_size=None):
+            for index in range(10):
+                pulled.append(index)
+                yield bytes([index]) * 100
+
+        upload.chunks.side_effect = chunks
+        stream = ChunkedUploadStream(upload)
+
+        self.assertEqual(stream.read(150), b'\x00' * 100 + b'\x01' * 50)
+        self.assertEqual(pulled, [0, 1])
+        self.assertEqual(len(stream.read()), 850)
+        self.assertEqual(stream.read(10), b'')
+
+
+class UploadSessionTests(FixtureTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.fixture.instructor)
+
+    def start(self, **data):
+        data = {'type': 'file', 'file_name': 'big handbook.pdf', 'size': 8, 'topic': str(self.fixture.topic.guid), **data}
+        response = self.client.post(reverse('main:create_upload_session'), {
+            key: value for key, value in data.items() if value is not None
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['data']
+
+    def complete(self, guid):
+        return self.client.post(reverse('main:complete_upload_session', kwargs={'guid': guid}))
+
+    def test_long_file_names_are_shortened_to_fit_the_url(self):
+        session = self.start(file_name='a' * 251 + '.pdf')
+
+        response = self.complete(session['guid'])
+
+        self.assertEqual(response.status_code, 200, response.data)
+        url = response.data['data']['url']
+        self.assertEqual(len(url), uploads.MAX_URL_LENGTH)
+        self.assertTrue(url.endswith('aaa.pdf'))
+        self.fixture.topic.refresh_from_db()
+        self.assertEqual(self.fixture.topic.files, [url])
+
+    def test_completed_upload_is_attached_to_the_topic_once(self):
+        session = self.start()
+        self.assertEqual(session['upload']['method'], 'PUT')
+        self.assertEqual(session['status'], 'pending')
+
+        first = self.complete(session['guid'])
+        second = self.complete(session['guid'])
+
+        self.assertEqual(first.status_code, 200, first.data)
+        self.assertEqual(second.status_code, 200, second.data)
+        url = first.data['data']['url']
+        self.assertTrue(url.startswith(f"{settings.MINIO_STORAGE_BUCKET_NAME}/uploads/{session['guid']}/"))
+        self.fixture.topic.refresh_from_db()
+        self.assertEqual(self.fixture.topic.files, [url])
+
+    def test_missing_or_mismatched_object_is_not_attached(self):
+        from minio.error import S3Error
+
+        session = self.start()
+        missing = S3Error('NoSuchKey', 'missing', None, None, None, None)
+        with mock.patch('main.uploads.stat_minio_object', side_effect=missing):
+            response = self.complete(session['guid'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get(guid=session['guid']).status, 'pending')
+
+        with mock.patch('main.uploads.stat_minio_object', return_value=SimpleNamespace(size=9)):
+            response = self.complete(session['guid'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get(guid=session['guid']).status, 'failed')
+        uploads.delete_file_from_minio_task.assert_called()
+        self.fixture.topic.refresh_from_db()
+        self.assertEqual(self.fixture.topic.files, [])
+
+    def test_videos_use_cloudflare_direct_uploads(self):
+        session = self.start(type='video', file_name='lecture.mp4', size=None)
+        self.assertEqual(session['provider'], 'cloudflare')
+        self.assertEqual(session['upload']['url'], 'https://upload.example.com/video-uid')
+
+        response = self.complete(session['guid'])
+        self.assertEqual(response.status_code, 200, response.data)
+        self.fixture.topic.refresh_from_db()
+        self.assertEqual(self.fixture.topic.videos, ['https://videos.example.com/video-uid/manifest/video.m3u8'])
+
+    def test_only_the_course_instructor_can_upload_to_a_topic(self):
+        self.client.force_authenticate(self.fixture.learner)
+        response = self.client.post(reverse('main:create_upload_session'), {
+            'type': 'file', 'file_name': 'notes.pdf', 'topic': str(self.fixture.topic.guid),
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class ResumableUploadTests(FixtureTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.fixture.instructor)
+        self.stored = {}
+
+        def put_minio_object(object_name, stream, length, content_type=None):
+            self.stored[object_name] = stream.read(length)
+
+        patcher = mock.patch('main.uploads.put_minio_object', side_effect=put_minio_object)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Small chunks keep the test light; the real minimum is S3's 5 MiB part size
+        patcher = mock.patch('main.uploads.MIN_CHUNK_SIZE', 4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start(self, **data):
+        response = self.client.post(reverse('main:create_resumable_upload'), {
+            'type': 'file', 'file_name': 'handbook.pdf', 'size': 10, 'topic': str(self.fixture.topic.guid), **data,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response
+
+    def send(self, location, offset, chunk):
+        return self.client.generic('PATCH', location, chunk, content_type='application/offset+octet-stream',
+                                   HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_chunks_resume_from_the_last_stored_offset(self):
+        location = self.start()['Location']
+
+        self.assertEqual(self.send(location, 0, b'0123').status_code, 200)
+        # A retried chunk for an offset already passed is refused with the offset to resume from
+        conflict = self.send(location, 0, b'0123')
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(conflict['Upload-Offset'], '4')
+        self.assertEqual(self.client.head(location)['Upload-Offset'], '4')
+
+        # Interrupted chunk: the offset only moves once the chunk is stored
+        with mock.patch('main.uploads.put_minio_object', side_effect=IOError('connection reset')):
+            self.assertEqual(self.send(location, 4, b'4567').status_code, 400)
+        self.assertEqual(self.client.head(location)['Upload-Offset'], '4')
+
+        self.assertEqual(self.send(location, 4, b'4567').status_code, 200)
+        with mock.patch('main.uploads.stat_minio_object', return_value=SimpleNamespace(size=10)):
+            response = self.send(location, 8, b'89')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['data']['status'], 'completed')
+        session = UploadSession.objects.get(guid=response.data['data']['guid'])
+        self.assertEqual(session.parts, [])
+        object_name, sources = uploads.compose_minio_object.call_args[0]
+        self.assertEqual([self.stored[source] for source in sources], [b'0123', b'4567', b'89'])
+        self.fixture.topic.refresh_from_db()
+        self.assertEqual(self.fixture.topic.files, [f"{settings.MINIO_STORAGE_BUCKET_NAME}/{object_name}"])
+
+    def test_short_chunks_and_overruns_are_refused(self):
+        location = self.start()['Location']
+
+        self.assertEqual(self.send(location, 0, b'01').status_code, 400)
+        self.assertEqual(self.send(location, 0, b'0123456789ab').status_code, 400)
+        self.assertEqual(self.client.head(location)['Upload-Offset'], '0')
+
+    def test_resumable_videos_are_copied_into_cloudflare(self):
+        location = self.start(type='video', file_name='lecture.mp4', size=4)['Location']
+
+        response = self.send(location, 0, b'0123')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['data']['provider'], 'cloudflare')
+        self.assertEqual(response.data['data']['status'], 'pending')
+        response = self.client.post(reverse('main:complete_upload_session', kwargs={'guid': response.data['data']['guid']}))
+        self.assertEqual(response.status_code, 200, response.data)
+        self.fixture.topic.refresh_from_db()
+        self.assertEqual(self.fixture.topic.videos, ['https://videos.example.com/video-uid/manifest/video.m3u8'])
+
+    def test_failed_cloudflare_copy_is_retried_without_rejoining(self):
+        started = self.start(type='video', file_name='lecture.mp4', size=4)
+        location = started['Location']
+
+        with mock.patch('main.uploads.copy_to_cloudflare', side_effect=IOError('Cloudflare unavailable')):
+            self.assertEqual(self.send(location, 0, b'0123').status_code, 400)
+        session = UploadSession.objects.get(guid=started.data['data']['guid'])
+        # Joined and its chunks dropped, but not yet handed over
+        self.assertEqual((session.parts, session.provider_uid), ([], None))
+        uploads.remove_minio_objects.assert_called()
+        composed = uploads.compose_minio_object.call_count
+
+        response = self.client.post(reverse('main:complete_upload_session', kwargs={'guid': session.guid}))
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(uploads.compose_minio_object.call_count, composed)
+        session.refresh_from_db()
+        self.assertEqual((session.provider, session.provider_uid, session.status), ('cloudflare', 'video-uid', 'completed'))
+
+
+class UploadJobTests(FixtureTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.fixture.instructor)
+
+    def upload(self, resource_type='file'):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('main:upload_course_resource'), {
+                'type': resource_type, 'file': SimpleUploadedFile('notes.pdf', b'%PDF-1.4', 'application/pdf'),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(response.data['data']['job']['status'], 'queued')
+        return self.client.get(response.data['data']['status_url']).data['data']
+
+    def test_queued_upload_reports_its_url(self):
+        job = self.upload()
+
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['url'], 'kfc-academy/notes.pdf')
+        self.assertEqual(job['size'], len(b'%PDF-1.4'))
+        staged, url = uploads.upload_file_to_minio_task.call_args[0][0], uploads.upload_file_to_minio_task.call_args[0][1]
+        self.assertEqual(url, 'notes.pdf')
+        self.assertFalse(os.path.exists(staged.name))
+
+    def test_failed_upload_is_recorded(self):
+        with mock.patch('main.uploads.upload_file_to_minio_task', return_value=None):
+            job = self.upload()
+
+        self.assertEqual(job['status'], 'failed')
+        self.assertIn('notes.pdf', job['error'])
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, uploads.STAGING_DIR, job['guid'])), [])
+
+    def test_jobs_are_private_to_their_uploader(self):
+        job = self.upload()
+
+        self.client.force_authenticate(self.fixture.learner)
+        response = self.client.get(reverse('main:upload_job_status', kwargs={'guid': job['guid']}))
+        self.assertEqual(response.status_code, 404)
+
+
+class PresignedUrlTests(FixtureTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.fixture.learner)
+
+    def presign(self, *paths):
+        with mock.patch('KFCAcademy.utils.utils.minio_client.presigned_get_object', return_value='http://127.0.0.1:9000/x'):
+            return self.client.post(reverse('main:file_presign_batch'), {'file_paths': list(paths)}, format='json')
+
+    def test_batch_urls_are_signed_once_and_cached(self):
+        from KFCAcademy.utils import utils
+
+        paths = [f'kfc-academy/topic/file-{index}.pdf' for index in range(3)]
+        ModuleTopics.objects.filter(pk=self.fixture.topic.pk).update(files=paths, audio=['kfc-academy/other.pdf'])
+        with mock.patch.object(utils.minio_client, 'presigned_get_object', side_effect=lambda **kwargs: f"http://127.0.0.1:9000/{kwargs['object_name']}") as sign:
+            first = self.client.post(reverse('main:file_presign_batch'), {'file_paths': paths}, format='json')
+            single = self.client.post(reverse('main:file_presign'), {'file_path': paths[0]}, format='json')
+            second = self.client.post(reverse('main:file_presign_batch'), {'file_paths': paths + ['kfc-academy/other.pdf']}, format='json')
+
+        self.assertEqual(first.status_code, 200)
+        urls = first.json()['presignedUrls']
+        self.assertEqual(urls[paths[0]], f"https://{settings.MINIO_PUBLIC_ENDPOINT}/topic/file-0.pdf")
+        self.assertEqual(single.json()['presignedUrl'], urls[paths[0]])
+        self.assertEqual(second.json()['presignedUrls'], {**urls, 'kfc-academy/other.pdf': f"https://{settings.MINIO_PUBLIC_ENDPOINT}/other.pdf"})
+        # Three signatures for the first batch, one for the new path; everything else came from the cache
+        self.assertEqual(sign.call_count, 4)
+        self.assertEqual(sign.call_args.kwargs['expires'], timedelta(seconds=settings.PRESIGNED_URL_EXPIRY))
+
+    def test_urls_are_cached_per_response_headers(self):
+        from KFCAcademy.utils import utils
+
+        with mock.patch.object(utils.minio_client, 'presigned_get_object', return_value='http://127.0.0.1:9000/x') as sign:
+            utils.presign_from_minio(['x.pdf'])
+            utils.presign_from_minio(['x.pdf'], response_headers={'response-content-disposition': 'attachment;'})
+            utils.presign_from_minio(['x.pdf'])
+
+        self.assertEqual(sign.call_count, 2)
+
+    def test_only_reachable_files_are_signed(self):
+        browsed_topic = ModuleTopics.objects.filter(module__course=Courses.objects.order_by('order').last()).first()
+        ModuleTopics.objects.filter(pk=browsed_topic.pk).update(files=['kfc-academy/browsed.pdf'])
+        other = self.fixture.learners[1]
+        UploadSession.objects.bulk_create([
+            UploadSession(user=user, resource_type='file', provider='minio', file_name=f'{name}.pdf', status='completed',
+                          url=f'kfc-academy/uploads/{name}.pdf', expires_at=timezone.now())
+            for user, name in ((self.fixture.learner, 'mine'), (other, 'theirs'))
+        ])
+        own = self.fixture.last_topic.files[0]
+
+        self.assertEqual(self.presign(own, 'kfc-academy/uploads/mine.pdf').status_code, 200)
+        for path in ('kfc-academy/browsed.pdf', 'kfc-academy/uploads/theirs.pdf', 'kfc-academy/uploads/x.pdf.parts/000000000000000'):
+            with self.subTest(path):
+                response = self.presign(own, path)
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(response.json()['data'], [path])
+        single = self.client.post(reverse('main:file_presign'), {'file_path': 'kfc-academy/browsed.pdf'}, format='json')
+        self.assertEqual(single.status_code, 403)
+
+        # Instructors reach the topics of the courses they teach, staff every topic
+        teacher = Users.objects.create(username='teacher', email='teacher@example.com', role=self.fixture.role)
+        Courses.objects.filter(pk=browsed_topic.module.course_id).update(instructor=teacher)
+        staff = Users.objects.create(username='staff', email='staff@example.com', role=self.fixture.role, is_staff=True)
+        for user in (teacher, staff):
+            with self.subTest(user.username):
+                self.client.force_authenticate(user)
+                self.assertEqual(self.presign('kfc-academy/browsed.pdf').status_code, 200)
+
+
+class TopicCompletionTests(FixtureTestCase):
+
+    def test_completing_twice_records_one_row(self):
+        learner, topic = self.fixture.learner, self.fixture.last_topic
+
+        self.assertEqual([UserTopicCompletion.complete(learner, topic) for _ in range(2)], [True, False])
+        self.assertEqual(UserTopicCompletion.objects.filter(user=learner, topic=topic).count(), 1)
+
+
+class TopicCompletionMigrationTests(MigrationTestCase):
+    """0014 moves UserModuleProgress.topics_completed into UserTopicCompletion rows and back."""
+    migrate_from = '0013_user_course_progress'
+    migrate_to = '0014_user_topic_completion'
+
+    def test_copies_own_topics_and_restores_the_arrays(self):
+        apps = self.apps
+        user = apps.get_model('main', 'Users').objects.create(username='learner', email='learner@example.com', password='x')
+        course = apps.get_model('main', 'Courses').objects.create(title='Course', status='PUBLISHED')
+        CourseModules = apps.get_model('main', 'CourseModules')
+        module, other_module = (CourseModules.objects.create(course=course, name=f'Module {index}', order=index) for index in range(2))
+        ModuleTopics = apps.get_model('main', 'ModuleTopics')
+        first, second = (ModuleTopics.objects.create(module=module, name=f'Topic {index}') for index in range(2))
+        foreign = ModuleTopics.objects.create(module=other_module, name='Foreign topic')
+        deleted = ModuleTopics.objects.create(module=module, name='Deleted topic')
+        deleted_guid = deleted.guid
+        deleted.delete()
+        UserModuleProgress = apps.get_model('main', 'UserModuleProgress')
+        UserModuleProgress.objects.create(user=user, module=module, topics_completed=[first.guid, foreign.guid, deleted_guid, second.guid])
+        UserModuleProgress.objects.create(user=user, module=other_module, topics_completed=[])
+
+        apps = self.migrate(self.migrate_to)
+        completions = apps.get_model('main', 'UserTopicCompletion').objects.order_by('id')
+        self.assertEqual(list(completions.values_list('user_id', 'topic_id')), [(user.id, first.id), (user.id, second.id)])
+
+        apps = self.migrate(self.migrate_from)
+        restored = dict(apps.get_model('main', 'UserModuleProgress').objects.values_list('module_id', 'topics_completed'))
+        self.assertEqual(restored, {module.id: [first.guid, second.guid], other_module.id: []})
@@ -0,0 +1,342 @@
+"""
+Direct-to-storage uploads.
+
+Large files skip the API server entirely:
+
+1. the client opens an UploadSession and gets back an upload URL, either a
+   MinIO presigned PUT (files and audio) or a Cloudflare Stream direct creator
+   upload (videos)
+2. the browser sends the file straight to that URL
+3. the client completes the session; the object is verified with
+   stat_object / the Stream API and its URL appended to the session's topic
+
+Resumable sessions (tus-style) go through the API instead, for multi-GB files
+over unreliable connections: each PATCH stores one chunk as its own MinIO
+object and only then advances the session offset, so a failed chunk is resent
+from the last committed byte. Once the last chunk lands the chunks are joined
+with compose_object; videos are then handed to Cloudflare Stream, which copies
+them from a presigned URL.
+
+UploadCourseResources stays as the fallback for small files. It only stages
+the file under MEDIA_ROOT and queues an UploadJob; the process_upload_job
+Celery task pushes it to MinIO or Cloudflare, and clients poll the job for the
+resulting URL.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from minio.error import S3Error
+
+from KFCAcademy.tasks import process_upload_job
+from KFCAcademy.utils.utils import (
+    bucket_name, compose_minio_object, copy_to_cloudflare, create_cloudflare_direct_upload,
+    delete_file_from_minio_task, file_prefix, get_cloudflare_video, get_from_minio, presigned_put_to_minio,
+    put_minio_object, remove_minio_objects, stat_minio_object, upload_file_to_minio_task,
+    upload_image_to_cloudflare_task, upload_video_to_cloudflare_task
+)
+from main.models import ModuleTopics, UploadJob, UploadSession, UsersCourseEnrollment
+
+# ModuleTopics array each resource type is listed in
+RESOURCE_FIELDS = {'file': 'files', 'image': 'images', 'audio': 'audio', 'video': 'videos'}
+
+PROVIDERS = {'file': 'minio', 'audio': 'minio', 'video': 'cloudflare'}
+
+TUS_VERSION = '1.0.0'
+
+CHUNK_CONTENT_TYPE = 'application/offset+octet-stream'
+
+# default_storage directory files wait in until their UploadJob runs
+STAGING_DIR = 'upload_staging'
+
+# S3 composes only sources of at least 5 MiB, so every chunk but the last must reach it
+MIN_CHUNK_SIZE = 5 * 1024 * 1024
+
+# "<bucket>/<object name>" is stored in UploadSession.url and the ModuleTopics arrays
+MAX_URL_LENGTH = 300
+
+
+class UploadConflict(Exception):
+    """A chunk was sent for an offset other than the session's current one"""
+
+    def __init__(self, offset):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+def _array_append(field, value, base_field):
+    return models.Func(models.F(field), models.Value(value), function='array_append', output_field=ArrayField(base_field))
+
+
+def attach_to_topic(topic_id, resource_type, url):
+    """Append url to the topic's list for resource_type in one UPDATE, so concurrent uploads don't overwrite each other."""
+    field = RESOURCE_FIELDS[resource_type]
+    ModuleTopics.objects.filter(pk=topic_id).update(**{
+        field: _array_append(field, url, models.CharField(max_length=300)),
+        'updated_at': timezone.now(),
+    })
+
+
+def readable_files(user, file_paths):
+    """
+    The file_paths ("<bucket>/<object>") the user may download: files and audio of topics
+    in courses they teach or are enrolled in (any topic for staff), and their own uploads.
+    """
+    file_paths = set(file_paths)
+    topics = ModuleTopics.objects.filter(deleted_at__isnull=True).filter(
+        models.Q(files__overlap=list(file_paths)) | models.Q(audio__overlap=list(file_paths))
+    )
+    if not user.is_staff:
+        topics = topics.filter(
+            models.Q(module__course__instructor=user)
+            | models.Q(module__course__in=UsersCourseEnrollment.objects.filter(user=user, deleted_at__isnull=True).values('course'))
+        )
+
+    readable = set()
+    for files, audio in topics.values_list('files', 'audio'):
+        readable.update(files or [], audio or [])
+    readable.update(UploadSession.objects.filter(user=user, url__in=file_paths).values_list('url', flat=True))
+    readable.update(UploadJob.objects.filter(user=user, url__in=file_paths).values_list('url', flat=True))
+    return file_paths & readable
+
+
+def start_session(user, resource_type, file_name, size=None, content_type=None, topic=None):
+    """Create an UploadSession; returns it with the instructions for uploading the file."""
+    expires_at = timezone.now() + timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    session = UploadSession(
+        user=user, topic=topic, resource_type=resource_type, provider=PROVIDERS[resource_type],
+        file_name=file_name, size=size, content_type=content_type, expires_at=expires_at,
+    )
+
+    if session.provider == 'minio':
+        session.object_name = _object_name(session.guid, file_name)
+        upload = {
+            'method': 'PUT',
+            'url': presigned_put_to_minio(session.object_name, expires=timedelta(seconds=settings.UPLOAD_SESSION_TTL)),
+            'headers': {'Content-Type': content_type} if content_type else {},
+        }
+    else:
+        # Cloudflare takes the file as a multipart form POST (or tus for very large videos)
+        session.provider_uid, upload_url = create_cloudflare_direct_upload(file_name, expires_at)
+        upload = {'method': 'POST', 'url': upload_url, 'headers': {}}
+
+    session.save()
+    return session, upload
+
+
+def _verify_minio(session):
+    try:
+        stat = stat_minio_object(session.object_name)
+    except S3Error as e:
+        if e.code == 'NoSuchKey':
+            raise ValueError("File has not been uploaded yet")
+        raise
+    if session.size is not None and stat.size != session.size:
+        # Presigned PUTs can't limit the size, so an object that doesn't match what was declared is dropped
+        delete_file_from_minio_task(f"{bucket_name}/{session.object_name}")
+        _fail(session, f"Uploaded {stat.size} bytes, expected {session.size}")
+    return f"{bucket_name}/{session.object_name}"
+
+
+def _verify_cloudflare(session):
+    video = get_cloudflare_video(session.provider_uid)
+    state = (video.get('status') or {}).get('state')
+    # 'downloading' is Cloudflare still copying a resumable upload out of MinIO
+    if state in (None, 'pendingupload', 'downloading'):
+        raise ValueError("File has not been uploaded yet")
+    if state == 'error':
+        _fail(session, (video.get('status') or {}).get('errReasonText') or "Video processing failed")
+    url = (video.get('playback') or {}).get('hls')
+    if not url:
+        raise ValueError("Video has no playback URL yet")
+    return url
+
+
+def _fail(session, error):
+    UploadSession.objects.filter(pk=session.pk, status='pending').update(status='failed', error=error, updated_at=timezone.now())
+    session.status, session.error = 'failed', error
+    raise ValueError(error)
+
+
+def complete_session(session):
+    """Verify the uploaded object and attach it to the topic; completing twice returns the first result."""
+    if session.status == 'completed':
+        return session
+    if session.status == 'failed':
+        raise ValueError(session.error or "Upload failed")
+    if session.resumable:
+        if session.offset < session.size:
+            raise ValueError(f"Upload is incomplete: {session.offset} of {session.size} bytes received")
+        # The last chunk landed but joining its parts or handing the video to Cloudflare failed; retry it
+        assemble(session)
+
+    url = _verify_minio(session) if session.provider == 'minio' else _verify_cloudflare(session)
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Only the request that flips the session attaches the file, so a retried completion can't list it twice
+        completed = UploadSession.objects.filter(pk=session.pk, status='pending').update(
+            status='completed', url=url, completed_at=now, updated_at=now
+        )
+        if completed and session.topic_id:
+            attach_to_topic(session.topic_id, session.resource_type, url)
+    if completed and session.provider == 'cloudflare' and session.object_name:
+        # Cloudflare has its own copy of a resumable video now
+        delete_file_from_minio_task(f"{bucket_name}/{session.object_name}")
+    if not completed:
+        session.refresh_from_db(fields=['status', 'url', 'error', 'completed_at'])
+        if session.status != 'completed':
+            raise ValueError(session.error or "Upload failed")
+        return session
+    session.status, session.url, session.completed_at = 'completed', url, now
+    return session
+
+
+def _object_name(guid, file_name):
+    """Storage key of an upload, with the file name shortened (keeping its extension) so the URL fits its columns."""
+    prefix = f"{file_prefix}uploads/{guid}/"
+    name = get_valid_filename(file_name)
+    room = MAX_URL_LENGTH - len(f"{bucket_name}/{prefix}")
+    if len(name) > room:
+        stem, dot, extension = name.rpartition('.')
+        extension = f".{extension}" if dot and len(extension) < room // 2 else ''
+        name = (stem if dot else name)[:room - len(extension)] + extension
+    return prefix + name
+
+
+def _part_name(session, offset):
+    return f"{session.object_name}.parts/{offset:015d}"
+
+
+def start_resumable(user, resource_type, file_name, size, content_type=None, topic=None):
+    """Create a resumable UploadSession; chunks are then sent with write_chunk()."""
+    session = UploadSession(
+        user=user, topic=topic, resource_type=resource_type, provider='minio', resumable=True,
+        file_name=file_name, size=size, content_type=content_type,
+        expires_at=timezone.now() + timedelta(seconds=settings.RESUMABLE_UPLOAD_TTL),
+    )
+    session.object_name = _object_name(session.guid, file_name)
+    session.save()
+    return session
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    Store `length` bytes of `stream` as the chunk starting at `offset`.
+
+    The chunk is uploaded before the offset moves, so an interrupted chunk
+    leaves the session where it was. The last chunk also assembles the file.
+    """
+    if not session.resumable or session.status != 'pending' or session.offset >= session.size:
+        raise ValueError("Upload is not in progress")
+    if session.expires_at < timezone.now():
+        raise ValueError("Upload session has expired")
+    if offset != session.offset:
+        raise UploadConflict(session.offset)
+    end = offset + length
+    if length <= 0 or end > session.size:
+        raise ValueError(f"Chunk must hold between 1 and {session.size - offset} bytes")
+    if end < session.size and length < MIN_CHUNK_SIZE:
+        raise ValueError(f"Every chunk but the last must be at least {MIN_CHUNK_SIZE} bytes")
+
+    # Chunk objects are named by offset, so a chunk sent twice overwrites itself
+    put_minio_object(_part_name(session, offset), stream, length, content_type='application/octet-stream')
+
+    moved = UploadSession.objects.filter(pk=session.pk, offset=offset, status='pending').update(
+        offset=end, parts=_array_append('parts', offset, models.BigIntegerField()), updated_at=timezone.now()
+    )
+    if not moved:
+        # A concurrent request stored this chunk first
+        session.refresh_from_db(fields=['offset', 'parts', 'status'])
+        raise UploadConflict(session.offset)
+    session.offset, session.parts = end, session.parts + [offset]
+
+    if end == session.size:
+        assemble(session)
+        if session.provider == 'minio':
+            complete_session(session)
+    return session
+
+
+def assemble(session):
+    """
+    Join the chunks of a finished resumable upload, then copy videos into Cloudflare Stream.
+
+    Each step is recorded before the next one starts, so a retry picks up where a
+    failed attempt stopped: chunks are only removed once the session no longer
+    lists them, and the Cloudflare copy runs until the session has its uid.
+    """
+    if session.parts:
+        parts = [_part_name(session, offset) for offset in session.parts]
+        compose_minio_object(session.object_name, parts)
+        UploadSession.objects.filter(pk=session.pk).update(parts=[], updated_at=timezone.now())
+        session.parts = []
+        remove_minio_objects(parts)
+
+    if session.resource_type == 'video' and not session.provider_uid:
+        provider_uid = copy_to_cloudflare(get_from_minio(session.object_name), session.file_name)
+        UploadSession.objects.filter(pk=session.pk).update(provider='cloudflare', provider_uid=provider_uid, updated_at=timezone.now())
+        session.provider, session.provider_uid = 'cloudflare', provider_uid
+
+
+def queue_job(user, resource_type, uploaded_file):
+    """Stage an uploaded file and queue its upload; returns the UploadJob to poll."""
+    job = UploadJob(
+        user=user, resource_type=resource_type, file_name=uploaded_file.name,
+        content_type=uploaded_file.content_type, size=uploaded_file.size,
+    )
+    # Large uploads are already in a temporary file, which the storage moves into place instead of copying
+    job.staged_path = default_storage.save(f"{STAGING_DIR}/{job.guid}/{get_valid_filename(uploaded_file.name)}", uploaded_file)
+    job.save()
+    transaction.on_commit(lambda: _schedule_job(job.pk))
+    return job
+
+
+def _schedule_job(job_id):
+    if settings.UPLOAD_JOBS_ASYNC:
+        process_upload_job.delay(job_id)
+        return
+    try:
+        process_job(job_id)
+    except Exception as e:
+        fail_job(job_id, str(e))
+
+
+def process_job(job_id):
+    """Push a staged file to MinIO (files, audio) or Cloudflare (images, videos); returns its URL."""
+    job = UploadJob.objects.get(pk=job_id)
+    if job.status == 'done':
+        return job.url
+    UploadJob.objects.filter(pk=job_id).update(status='uploading', started_at=timezone.now(), updated_at=timezone.now())
+
+    with default_storage.open(job.staged_path, 'rb') as staged:
+        staged.content_type = job.content_type
+        if job.resource_type in ('file', 'audio'):
+            url = upload_file_to_minio_task(staged, job.file_name)
+        elif job.resource_type == 'image':
+            url = upload_image_to_cloudflare_task(staged, job.file_name)
+        else:
+            url = upload_video_to_cloudflare_task(staged, job.file_name)
+    if not url:
+        # The storage helpers log the cause and return None
+        raise RuntimeError(f"Uploading {job.file_name} to storage failed")
+
+    now = timezone.now()
+    UploadJob.objects.filter(pk=job_id).update(status='done', url=url, error=None, staged_path=None, finished_at=now, updated_at=now)
+    default_storage.delete(job.staged_path)
+    return url
+
+
+def fail_job(job_id, error):
+    """Give up on an upload: record the error and drop the staged file."""
+    job = UploadJob.objects.filter(pk=job_id).only('staged_path').first()
+    if job is None:
+        return
+    now = timezone.now()
+    UploadJob.objects.filter(pk=job_id).update(status='failed', error=error, staged_path=None, finished_at=now, updated_at=now)
+    if job.staged_path:
+        default_storage.delete(job.staged_path)
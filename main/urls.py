@@ -13,7 +13,7 @@ urlpatterns = [
     re_path(r'^user/all/$', views.AllUsers.as_view(), name='all_users_by_entity'),
     re_path(r'^user/register/$', views.UserRegister.as_view(), name='user_register'),
     re_path(r'^user/by_guid/(?P<guid>[\w-]+)/$', views.OneUser.as_view(), name='one_user'),
-    re_path(r'^user/by_org/(?P<guid>[\w-]+)/$', views.OrgUsers.as_view(), name='one_user'),
+    re_path(r'^user/by_org/(?P<guid>[\w-]+)/$', views.OrgUsers.as_view(), name='org_users'),
     re_path(r'^user/admin_create/$', views.AdminCreateUser.as_view(), name='admin_create_user'),
     re_path(r'^user/admin_reactivate/$', views.AdminReactivateUser.as_view(), name='admin_reactivate_user'),
     re_path(r'^user/update_image/(?P<guid>[\w-]+)/$', views.UpdateUserProfileImage.as_view(), name='update_user_image'),
@@ -106,10 +106,12 @@ urlpatterns = [
     re_path(r'^interactions/create/$', views.CourseInteractView.as_view(), name='create_course_interactions'),
     re_path(r'^interactions/(?P<interaction_guid>[\w-]+)/delete/$', views.DeleteCourseReviewView.as_view(), name='delete_course_interactions'),   
     re_path(r'^interactions/(?P<course_guid>[\w-]+)/all/$', views.CourseInteractions.as_view(), name='course_interactions'),
+    re_path(r'^interactions/(?P<course_guid>[\w-]+)/reviews/$', views.CourseReviews.as_view(), name='course_reviews'),
 
     re_path(r'^courses/(?P<course_guid>[\w-]+)/certificate/$', views.CourseCertificate.as_view(), name='course_certificate'),
     # Quiz Responses
     re_path(r'^quiz/submit/$', views.SubmitQuizResponse.as_view(), name='submit_quiz_response'),
+    re_path(r'^quiz/submit_all/$', views.SubmitAllQuizResponses.as_view(), name='submit_all_quiz_responses'),
     re_path(r'^quizzes/(?P<quiz_guid>[\w-]+)/results/$', views.GetQuizResults.as_view(), name='quiz_results'),
 
 
@@ -125,10 +127,14 @@ urlpatterns = [
     # =============================================================================
     
     re_path(r'^courses/(?P<course_guid>[\w-]+)/enrollments/$', views.CourseEnrollments.as_view(), name='course_enrollments'),
+    re_path(r'^courses/(?P<course_guid>[\w-]+)/enrollments/export/$', views.CourseEnrollmentsExport.as_view(), name='course_enrollments_export'),
+    re_path(r'^courses/(?P<course_guid>[\w-]+)/gradebook/$', views.CourseGradebook.as_view(), name='course_gradebook'),
     
     # Instructor Quiz Management
     re_path(r'^courses/(?P<course_guid>[\w-]+)/quizzes/submissions/$', views.CourseQuizSubmissions.as_view(), name='course_quiz_submissions'),
     re_path(r'^quizzes/(?P<quiz_guid>[\w-]+)/submissions/$', views.QuizSubmissions.as_view(), name='quiz_submissions'),
+    re_path(r'^quizzes/(?P<quiz_guid>[\w-]+)/submissions/export/$', views.QuizSubmissionsExport.as_view(), name='quiz_submissions_export'),
+    re_path(r'^quizzes/(?P<quiz_guid>[\w-]+)/item_analysis/$', views.QuizItemAnalysis.as_view(), name='quiz_item_analysis'),
     re_path(r'^quiz-submissions/(?P<user_guid>[\w-]+)/(?P<quiz_guid>[\w-]+)/$', views.UserQuizSubmissionDetail.as_view(), name='user_quiz_submission_detail'),
     re_path(r'^quiz-submissions/(?P<user_guid>[\w-]+)/(?P<quiz_guid>[\w-]+)/feedback/$', views.AddQuizFeedback.as_view(), name='add_quiz_feedback'),
 
@@ -146,7 +152,14 @@ urlpatterns = [
 
     # File Management
     re_path(r'^file/upload/$', views.UploadCourseResources.as_view(), name='upload_course_resource'),
-    re_path(r'^file/delete/$', views.DeleteCourseResources.as_view(), name='upload_course_resource'),
+    re_path(r'^file/upload/jobs/(?P<guid>[\w-]+)/$', views.UploadJobStatus.as_view(), name='upload_job_status'),
+    re_path(r'^file/delete/$', views.DeleteCourseResources.as_view(), name='delete_course_resource'),
+    re_path(r'^file/presign/$', views.FileHandlerGet.as_view(), name='file_presign'),
+    re_path(r'^file/presign/batch/$', views.FileHandlerBatchGet.as_view(), name='file_presign_batch'),
+    re_path(r'^file/upload/sessions/$', views.CreateUploadSession.as_view(), name='create_upload_session'),
+    re_path(r'^file/upload/sessions/(?P<guid>[\w-]+)/complete/$', views.CompleteUploadSession.as_view(), name='complete_upload_session'),
+    re_path(r'^file/upload/resumable/$', views.CreateResumableUpload.as_view(), name='create_resumable_upload'),
+    re_path(r'^file/upload/resumable/(?P<guid>[\w-]+)/$', views.ResumableUpload.as_view(), name='resumable_upload'),
 
 
 ]
\ No newline at end of file
@@ -2,41 +2,52 @@
 import os
 import random
 import re
+import numpy as np
 import requests
+from collections import defaultdict
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from rest_framework.response import Response
 from rest_framework.status import (
-    HTTP_400_BAD_REQUEST, HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_200_OK,HTTP_404_NOT_FOUND,HTTP_401_UNAUTHORIZED,HTTP_403_FORBIDDEN)
+    HTTP_400_BAD_REQUEST, HTTP_201_CREATED, HTTP_202_ACCEPTED, HTTP_204_NO_CONTENT, HTTP_200_OK,HTTP_404_NOT_FOUND,HTTP_401_UNAUTHORIZED,HTTP_403_FORBIDDEN,HTTP_409_CONFLICT)
 from django.core.files.base import ContentFile
 from django.utils import timezone
+from django.utils.text import slugify
 from PIL import Image,ImageDraw, ImageFont
 from django.conf import settings
 from PIL import ImageColor
 from uuid import UUID
 from io import BytesIO
+from KFCAcademy import cache as shared_cache
 from KFCAcademy.settings import BASE_DIR, STATIC_URL
 from KFCAcademy.tasks import send_email
-from KFCAcademy.utils.utils import delete_cloudflare_file_task, delete_file_from_minio_task, get_from_minio, upload_file_to_minio_task, upload_image_to_cloudflare_task, upload_video_to_cloudflare_task
+from KFCAcademy.utils.utils import delete_cloudflare_file_task, delete_file_from_minio_task, get_from_minio, presign_from_minio
 from KFCAcademy.views import FreeAuthView, ProtectedAuthView, PublicAuthView
 from main.models import (
     ActionLogs, Main2FALog, Organizations, Permission, Role, Users, Courses, CourseModules,
     ModuleTopics, ModuleQuizes, QuizQuestions, QuizResponses, CourseDiscussions,
     UsersCourseEnrollment, UserModuleProgress, QuizSubmissionFeedback,
-    CourseInteractions as CourseInteractionsModel
+    CourseInteractions as CourseInteractionsModel, CourseInteractionStats, UserCourseProgress, UserTopicCompletion, UploadJob, UploadSession
 )
 from main.serializers import (
-    ActionLogsSerializer, CourseInteractSerializer, CourseInteractionResponseSerializer, CourseReviewSerializer, FilePathSerializer, Main2FASerializer, PermissionsSerializer, 
+    ActionLogsSerializer, CourseInteractSerializer, CourseInteractionResponseSerializer, CourseReviewSerializer, FilePathSerializer, FilePathsSerializer, Main2FASerializer, PermissionsSerializer, 
     RoleSerializer, UserSerializer, CourseSerializer, CourseModuleSerializer,
     QuizQuestionsSerializer, ModuleTopicSerializer, ModuleQuizSerializer,
     QuizResponseSerializer, CourseEnrollmentSerializer, UserProgressSerializer,
     PublicCourseSerializer, CourseDiscussionSerializer, TopicCompletionSerializer,
-    EnrolledCourseSerializer, UnenrollmentSerializer, QuizSubmissionFeedbackSerializer
+    EnrolledCourseSerializer, UnenrollmentSerializer, QuizSubmissionFeedbackSerializer, QuizSubmissionSerializer,
+    CreateUploadSessionSerializer, ResumableUploadSerializer, UploadJobSerializer, UploadSessionSerializer,
+    course_interaction_summary, course_top_reviews, quiz_submission_summary
 )
+from main import analytics, answer_keys, exports, uploads
+from main.progress import mark_dirty
 from main.signals import log_soft_delete
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Avg, Count
+from django.db import transaction
+from django.db.models import Avg, Count, F, OuterRef, Q, Subquery, Sum, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
 from django.template.loader import render_to_string
 from django.http import HttpResponse
 from weasyprint import HTML
@@ -51,8 +62,9 @@ class AllUsers(ProtectedAuthView):
         Get all users
         """
         all_users = Users.objects.filter(deleted_at__isnull=True)
-        serializer = UserSerializer(all_users,many=True)
-        return Response(serializer.data,status=HTTP_200_OK)
+        page = self.paginate_queryset(all_users)
+        serializer = UserSerializer(page,many=True)
+        return self.get_paginated_response(serializer.data)
 
 class OneUser(ProtectedAuthView):
     serializer_class = UserSerializer
@@ -469,8 +481,7 @@ class SyncOrganization(FreeAuthView):
         random_id = random.randint(1000, 9999)
 
         # store the random id and the organization to a short lived cache on redis with a TTL of 1 hour. This will be used to validate the registration link when the user clicks on it and to fetch the org details for pre-filling the registration form.
-        from django.core.cache import cache
-        cache.set(str(random_id), {
+        shared_cache.set('registration', str(random_id), {
             "org_guid": str(org.guid),
             "kfc_no": org.member_id,
             "org_name": org_name,
@@ -617,8 +628,9 @@ class AllRole(ProtectedAuthView):
         Get all roles
         """
         all_permissions = Role.objects.filter(deleted_at__isnull=True)
-        serializer = RoleSerializer(all_permissions,many=True)
-        return Response(serializer.data,status=HTTP_200_OK)
+        page = self.paginate_queryset(all_permissions)
+        serializer = RoleSerializer(page,many=True)
+        return self.get_paginated_response(serializer.data)
 
 class OneRole(ProtectedAuthView):
     serializer_class = RoleSerializer
@@ -735,8 +747,9 @@ class AllPermissions(ProtectedAuthView):
     Get all permissions
     """
     queryset = Permission.objects.filter(deleted_at__isnull=True)
-    serializer = self.serializer_class(queryset, many=True)
-    return Response(serializer.data, status=HTTP_200_OK)
+    page = self.paginate_queryset(queryset)
+    serializer = self.serializer_class(page, many=True)
+    return self.get_paginated_response(serializer.data)
 
 class OnePermission(ProtectedAuthView):
     serializer_class = PermissionsSerializer
@@ -838,9 +851,10 @@ class DeletePermissions(ProtectedAuthView):
 class ActionLog(ProtectedAuthView):
     serializer_class = ActionLogsSerializer
     def get(self, request, format=None):
-        all_actions = ActionLogs.objects.all().order_by('-created_at')
+        all_actions = ActionLogs.objects.all()
         optimized_queryset = ActionLogsSerializer.setup_eager_loading(all_actions)
-        return Response(ActionLogsSerializer(optimized_queryset,many=True).data, status=HTTP_200_OK)
+        page = self.paginate_queryset(optimized_queryset)
+        return self.get_paginated_response(ActionLogsSerializer(page,many=True).data)
 
 
 # =============================================================================
@@ -876,9 +890,10 @@ class AllCourses(ProtectedAuthView):
             
             # Optimize queries
             optimized_queryset = CourseSerializer.setup_eager_loading(queryset, user=request.user)
+            page = self.paginate_queryset(optimized_queryset)
             
-            serializer = CourseSerializer(optimized_queryset, many=True, context={'user': request.user})
-            return Response(serializer.data, status=HTTP_200_OK)
+            serializer = CourseSerializer(page, many=True, context={'user': request.user})
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -1034,6 +1049,7 @@ class DeleteCourse(ProtectedAuthView):
 
 class AllCourseModules(PublicAuthView):
     serializer_class = CourseModuleSerializer
+    pagination_ordering = ('course_id', 'order', 'id')
     
     def get(self, request, course_guid=None, format=None):
         """
@@ -1044,18 +1060,20 @@ class AllCourseModules(PublicAuthView):
             if course_guid:
                 # Get modules for specific course
                 course = get_object_or_404(Courses, guid=course_guid, deleted_at__isnull=True)
-                queryset = CourseModules.objects.filter(course=course, deleted_at__isnull=True).order_by('order')
+                queryset = CourseModules.objects.filter(course=course, deleted_at__isnull=True)
             else:
                 # Get all modules
-                queryset = CourseModules.objects.filter(deleted_at__isnull=True).order_by('course', 'order')
-            
-            # Optimize queries
-            queryset = queryset.select_related('course').prefetch_related('moduletopics_set')
+                queryset = CourseModules.objects.filter(deleted_at__isnull=True)
             
             # Pass user context (None for anonymous users)
             user_context = request.user if request.user.is_authenticated else None
-            serializer = CourseModuleSerializer(queryset, many=True, context={'user': user_context})
-            return Response(serializer.data, status=HTTP_200_OK)
+
+            # Optimize queries
+            queryset = CourseModuleSerializer.setup_eager_loading(queryset, user=user_context)
+            page = self.paginate_queryset(queryset)
+            
+            serializer = CourseModuleSerializer(page, many=True, context={'user': user_context})
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -1073,10 +1091,11 @@ class OneCourseModule(PublicAuthView):
         Public access - returns module info, plus user progress if authenticated
         """
         try:
-            module = get_object_or_404(CourseModules, guid=guid, deleted_at__isnull=True)
-            
             # Pass user context (None for anonymous users)
             user_context = request.user if request.user.is_authenticated else None
+            queryset = CourseModuleSerializer.setup_eager_loading(CourseModules.objects.all(), user=user_context)
+            module = get_object_or_404(queryset, guid=guid, deleted_at__isnull=True)
+            
             serializer = CourseModuleSerializer(module, context={'user': user_context})
             return Response(serializer.data, status=HTTP_200_OK)
             
@@ -1204,6 +1223,7 @@ class DeleteCourseModule(ProtectedAuthView):
 
 class AllModuleTopics(PublicAuthView):
     serializer_class = ModuleTopicSerializer
+    pagination_ordering = ('module_id', 'position', 'id')
     
     def get(self, request, module_guid=None, format=None):
         """
@@ -1214,18 +1234,21 @@ class AllModuleTopics(PublicAuthView):
             if module_guid:
                 # Get topics for specific module
                 module = get_object_or_404(CourseModules, guid=module_guid, deleted_at__isnull=True)
-                queryset = ModuleTopics.objects.filter(module=module, deleted_at__isnull=True).order_by('order')
+                queryset = ModuleTopics.objects.filter(module=module, deleted_at__isnull=True)
             else:
                 # Get all topics
-                queryset = ModuleTopics.objects.filter(deleted_at__isnull=True).order_by('module', 'order')
+                queryset = ModuleTopics.objects.filter(deleted_at__isnull=True)
             
-            # Optimize queries
-            queryset = queryset.select_related('module', 'module__course')
+            # Optimize queries; topic_order is nullable so seek on a coalesced position
+            queryset = queryset.select_related('module', 'module__course').annotate(
+                position=Coalesce('topic_order', Value(0))
+            )
+            page = self.paginate_queryset(queryset)
             
             # Pass user context for progress tracking if authenticated
             user_context = request.user if request.user.is_authenticated else None
-            serializer = ModuleTopicSerializer(queryset, many=True, context={'user': user_context})
-            return Response(serializer.data, status=HTTP_200_OK)
+            serializer = ModuleTopicSerializer(page, many=True, context={'user': user_context})
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -1370,6 +1393,7 @@ class DeleteModuleTopic(ProtectedAuthView):
 
 class AllModuleQuizzes(ProtectedAuthView):
     serializer_class = ModuleQuizSerializer
+    pagination_ordering = ('created_at', 'id')
     
     def get(self, request, module_guid=None, format=None):
         """
@@ -1386,9 +1410,10 @@ class AllModuleQuizzes(ProtectedAuthView):
             
             # Optimize queries
             queryset = queryset.select_related('module', 'module__course').prefetch_related('quizquestions_set')
+            page = self.paginate_queryset(queryset)
             
-            serializer = ModuleQuizSerializer(queryset, many=True)
-            return Response(serializer.data, status=HTTP_200_OK)
+            serializer = ModuleQuizSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -1399,6 +1424,7 @@ class AllModuleQuizzes(ProtectedAuthView):
 
 class FinalAssessQuizzes(ProtectedAuthView):
     serializer_class = ModuleQuizSerializer
+    pagination_ordering = ('created_at', 'id')
     
     def get(self, request, course_guid=None, format=None):
         """
@@ -1415,9 +1441,10 @@ class FinalAssessQuizzes(ProtectedAuthView):
             # Optimize queries
             queryset = queryset.select_related('course').prefetch_related('quizquestions_set')
             # print(queryset)
+            page = self.paginate_queryset(queryset)
             
-            serializer = ModuleQuizSerializer(queryset, many=True)
-            return Response(serializer.data, status=HTTP_200_OK)
+            serializer = ModuleQuizSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -1596,6 +1623,7 @@ class DeleteModuleQuiz(ProtectedAuthView):
 
 class AllQuizQuestions(ProtectedAuthView):
     serializer_class = QuizQuestionsSerializer
+    pagination_ordering = ('quiz_id', 'order', 'id')
     
     def get(self, request, quiz_guid=None, format=None):
         """
@@ -1605,13 +1633,14 @@ class AllQuizQuestions(ProtectedAuthView):
             if quiz_guid:
                 # Get questions for specific quiz
                 quiz = get_object_or_404(ModuleQuizes, guid=quiz_guid, deleted_at__isnull=True)
-                queryset = QuizQuestions.objects.filter(quiz=quiz, deleted_at__isnull=True).order_by('order')
+                queryset = QuizQuestions.objects.filter(quiz=quiz, deleted_at__isnull=True)
             else:
                 # Get all questions
-                queryset = QuizQuestions.objects.filter(deleted_at__isnull=True).order_by('quiz', 'order')
+                queryset = QuizQuestions.objects.filter(deleted_at__isnull=True)
             
-            serializer = QuizQuestionsSerializer(queryset, many=True)
-            return Response(serializer.data, status=HTTP_200_OK)
+            page = self.paginate_queryset(queryset)
+            serializer = QuizQuestionsSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -1859,10 +1888,11 @@ class MyCourses(ProtectedAuthView):
             
             # Optimize queries
             optimized_enrollments = EnrolledCourseSerializer.setup_eager_loading(enrollments, user=request.user)
+            page = self.paginate_queryset(optimized_enrollments)
             
-            serializer = self.serializer_class(optimized_enrollments, many=True, context={'user': request.user})
+            serializer = self.serializer_class(page, many=True, context={'user': request.user})
             
-            return Response(serializer.data, status=HTTP_200_OK)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -1893,27 +1923,24 @@ class CourseProgress(ProtectedAuthView):
                     "data": "Not enrolled in this course"
                 }, status=HTTP_400_BAD_REQUEST)
             
-            # Get modules and their progress
+            # Get modules and their progress, recomputed for all modules in one pass
             modules = CourseModules.objects.filter(course=course, deleted_at__isnull=True).order_by('order')
-            modules_progress_objects = []
-            
             for module in modules:
-                module_progress_obj, created = UserModuleProgress.objects.get_or_create(
-                    user=request.user,
-                    module=module
-                )
-                # Force update quiz progress
-                module_progress_obj.update_quiz_progress()
-                # Refresh from database to get updated values
-                module_progress_obj.refresh_from_db()
-                modules_progress_objects.append(module_progress_obj)
-            
-            # Optional: Clear cache if requested
+                module.course = course
+            modules_progress_objects = UserModuleProgress.refresh_quiz_progress(request.user, modules)
+
+            completed_topics = defaultdict(list)
+            for module_id, topic_guid in UserTopicCompletion.objects.filter(
+                user=request.user, topic__module__in=modules
+            ).order_by('id').values_list('topic__module_id', 'topic__guid'):
+                completed_topics[module_id].append(topic_guid)
+            for module_progress in modules_progress_objects:
+                module_progress._topics_completed = completed_topics[module_progress.module_id]
+            
+            # Optional: recount the progress counters if requested
             clear_cache = request.query_params.get('clear_cache', '').lower() == 'true'
             if clear_cache:
-                from django.core.cache import cache
-                cache_key = f"course_progress_{course.guid}_{request.user.guid}"
-                cache.delete(cache_key)
+                UserCourseProgress.rebuild(course.id, [request.user.id])
             
             # Serialize the progress data
             serializer = self.serializer_class(modules_progress_objects, many=True)
@@ -1983,59 +2010,49 @@ class CourseInteractions(ProtectedAuthView):
     
     def get(self, request, course_guid, format=None):
 
-        course = get_object_or_404(Courses, guid=course_guid)
-
-        interactions = CourseInteractionsModel.objects.filter(
-            course=course
-        ).select_related("user")
-
-        # likes
-        likes = interactions.filter(interaction_type="like").count()
+        course = get_object_or_404(
+            Courses.objects.select_related('interaction_stats'),
+            guid=course_guid
+        )
 
-        # saves
-        saves = interactions.filter(interaction_type="save").count()
+        summary = course_interaction_summary(course, request.user)
 
-        # ratings
-        ratings = interactions.filter(interaction_type="rating")
+        response_data = {
+            "summary": summary,
+            "reviews": course_top_reviews(course)
+        }
 
-        avg_rating = ratings.aggregate(avg=Avg("rating"))["avg"]
-        ratings_count = ratings.count()
+        serializer = CourseInteractionResponseSerializer(instance=response_data)
 
-        # reviews
-        reviews = interactions.filter(interaction_type="review")
+        return Response(serializer.data, status=HTTP_200_OK)
 
-        reviews_count = reviews.count()
 
-        user = request.user
+class CourseReviews(ProtectedAuthView):
+    serializer_class = CourseReviewSerializer
+    page_size = 10
 
-        summary = {
-            "likes": likes,
-            "saves": saves,
-            "average_rating": round(avg_rating, 1) if avg_rating else 0,
-            "ratings_count": ratings_count,
-            "reviews_count": reviews_count,
-            "user_liked": interactions.filter(
-                user=user,
-                interaction_type="like"
-            ).exists(),
-            "user_saved": interactions.filter(
-                user=user,
-                interaction_type="save"
-            ).exists(),
-            "user_rating": interactions.filter(
-                user=user,
-                interaction_type="rating"
-            ).values_list("rating", flat=True).first()
-        }
+    def get(self, request, course_guid, format=None):
+        """
+        Get a page of course reviews, newest first.
+        Pass the returned `next` value as `cursor` to fetch the following page.
+        """
+        try:
+            course = get_object_or_404(Courses, guid=course_guid)
 
-        response_data = {
-            "summary": summary,
-            "reviews": reviews
-        }
+            reviews = CourseInteractionsModel.objects.filter(
+                course=course,
+                interaction_type="review"
+            ).select_related("user")
 
-        serializer = CourseInteractionResponseSerializer(instance=response_data)
+            page = self.paginate_queryset(reviews)
+            return self.get_paginated_response(self.serializer_class(page, many=True).data)
 
-        return Response(serializer.data, status=HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Error retrieving reviews",
+                "data": str(e)
+            }, status=HTTP_400_BAD_REQUEST)
 
 
 class CourseInteractView(ProtectedAuthView):
@@ -2073,7 +2090,9 @@ class DeleteCourseReviewView(ProtectedAuthView):
             interaction_type="review"
         )
 
-        review.delete()
+        with transaction.atomic():
+            review.delete()
+            CourseInteractionStats.apply_delta(review.course, reviews_count=-1)
 
         return Response(
             {"message": "Review deleted successfully"},
@@ -2115,13 +2134,27 @@ class SubmitQuizResponse(ProtectedAuthView):
         try:
             question_guid = request.data.get('question')
             selected_answer = request.data.get('selected_answer')
+            if not selected_answer:
+                return Response({
+                    "status": "Failed",
+                    "message": "Failed to submit answer",
+                    "data": {"selected_answer": ["This field is required."]}
+                }, status=HTTP_400_BAD_REQUEST)
             
-            question = get_object_or_404(QuizQuestions, guid=question_guid, deleted_at__isnull=True)
+            question = QuizQuestions.objects.filter(guid=question_guid, deleted_at__isnull=True).only('id', 'quiz_id').first()
+            # Options, correct answer and course come from the quiz's cached answer key
+            answer_key = answer_keys.get_question_key(question) if question else None
+            if answer_key is None:
+                return Response({
+                    "status": "Failed",
+                    "message": "Question not found",
+                    "data": "Question not found or has been deleted"
+                }, status=HTTP_404_NOT_FOUND)
             
             # Check if user is enrolled in the course
             if not UsersCourseEnrollment.objects.filter(
                 user=request.user, 
-                course=question.quiz.module.course, 
+                course_id=answer_key['course_id'], 
                 deleted_at__isnull=True
             ).exists():
                 return Response({
@@ -2130,68 +2163,153 @@ class SubmitQuizResponse(ProtectedAuthView):
                     "data": "Not enrolled in this course"
                 }, status=HTTP_400_BAD_REQUEST)
             
-            # Check if already answered
-            existing_response = QuizResponses.objects.filter(
-                user=request.user,
-                question=question,
-                deleted_at__isnull=True
-            ).first()
+            # Check if already answered; a soft-deleted answer is revived since there is one row per question
+            response = QuizResponses.objects.filter(user=request.user, question=question).first()
+            created = response is None
+            if created:
+                response = QuizResponses(user=request.user, question=question, created_by=str(request.user.guid))
+            else:
+                response.updated_by = str(request.user.guid)
+                response.deleted_at = None
+                response.deleted_by = None
+            response.selected_answer = selected_answer
+            response._answer_key = answer_key
+            response.save()
             
-            if existing_response:
-                # Update existing response with new answer
-                response_data = {
-                    'selected_answer': selected_answer
+            return Response({
+                "status": "ok",
+                "message": "Answer submitted successfully" if created else "Answer updated successfully",
+                "data": {
+                    "is_correct": response.is_correct,
+                    "correct_answer": answer_key['correct_answer'] if response.is_correct else None
                 }
-                
-                serializer = QuizResponseSerializer(existing_response, data=response_data, partial=True)
-                if serializer.is_valid():
-                    response = serializer.save(updated_by=str(request.user.guid))
-                    
-                    return Response({
-                        "status": "ok",
-                        "message": "Answer updated successfully",
-                        "data": {
-                            "is_correct": response.is_correct,
-                            "correct_answer": question.correct_answer if response.is_correct else None
-                        }
-                    }, status=HTTP_200_OK)
-                else:
-                    return Response({
-                        "status": "Failed",
-                        "message": "Failed to update answer",
-                        "data": serializer.errors
-                    }, status=HTTP_400_BAD_REQUEST)
-            
-            # Prepare data for serializer (new response)
-            response_data = {
-                'user': request.user.guid,
-                'question': question.guid,
-                'selected_answer': selected_answer
-            }
+            }, status=HTTP_201_CREATED if created else HTTP_200_OK)
             
-            serializer = QuizResponseSerializer(data=response_data)
-            if serializer.is_valid():
-                response = serializer.save(created_by=str(request.user.guid))
-                
-                return Response({
-                    "status": "ok",
-                    "message": "Answer submitted successfully",
-                    "data": {
-                        "is_correct": response.is_correct,
-                        "correct_answer": question.correct_answer if response.is_correct else None
-                    }
-                }, status=HTTP_201_CREATED)
-            else:
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Failed to submit answer",
+                "data": str(e)
+            }, status=HTTP_400_BAD_REQUEST)
+
+class SubmitAllQuizResponses(ProtectedAuthView):
+    serializer_class = QuizSubmissionSerializer
+
+    def post(self, request, format=None):
+        """
+        Submit every answer of a quiz in one request
+        """
+        try:
+            serializer = self.serializer_class(data=request.data)
+            if not serializer.is_valid():
                 return Response({
                     "status": "Failed",
-                    "message": "Failed to submit answer",
+                    "message": "Invalid data",
                     "data": serializer.errors
                 }, status=HTTP_400_BAD_REQUEST)
-            
+
+            quiz = get_object_or_404(
+                ModuleQuizes.objects.select_related('module'),
+                guid=serializer.validated_data['quiz'],
+                deleted_at__isnull=True
+            )
+            course_id = quiz.module.course_id if quiz.module_id else quiz.course_id
+
+            # Check if user is enrolled in the course
+            if not UsersCourseEnrollment.objects.filter(
+                user=request.user,
+                course_id=course_id,
+                deleted_at__isnull=True
+            ).exists():
+                return Response({
+                    "status": "Failed",
+                    "message": "Not enrolled in this course",
+                    "data": "Not enrolled in this course"
+                }, status=HTTP_400_BAD_REQUEST)
+
+            # Grade in memory against the quiz's cached answer key instead of a save() per answer
+            answer_key = answer_keys.get_answer_key(quiz.pk)
+            questions = {entry['guid']: (question_id, entry) for question_id, entry in answer_key.items()}
+
+            answers = {}
+            errors = {}
+            for answer in serializer.validated_data['answers']:
+                question_guid = str(answer['question'])
+                if question_guid not in questions:
+                    errors[question_guid] = "Question not found in this quiz"
+                elif answer['selected_answer'] not in questions[question_guid][1]['options']:
+                    errors[question_guid] = "Selected answer must be one of the available options."
+                else:
+                    # A repeated question keeps its last answer
+                    answers[question_guid] = answer['selected_answer']
+            if errors:
+                return Response({
+                    "status": "Failed",
+                    "message": "Failed to submit answers",
+                    "data": errors
+                }, status=HTTP_400_BAD_REQUEST)
+
+            user_guid = str(request.user.guid)
+            responses = []
+            results = []
+            for question_guid, selected_answer in answers.items():
+                question_id, entry = questions[question_guid]
+                is_correct = answer_keys.grade(entry, selected_answer)
+                responses.append(QuizResponses(
+                    user=request.user,
+                    question_id=question_id,
+                    selected_answer=selected_answer,
+                    is_correct=is_correct,
+                    created_by=user_guid,
+                    updated_by=user_guid
+                ))
+                results.append({
+                    "question": question_guid,
+                    "is_correct": is_correct,
+                    "correct_answer": entry['correct_answer'] if is_correct else None,
+                    "marks": entry['marks'] if is_correct else 0
+                })
+
+            with transaction.atomic():
+                if quiz.module_id:
+                    # Concurrent submissions by the same user wait here, so each counts the other's answers as already given
+                    UserCourseProgress.lock(request.user.pk, course_id)
+                already_answered = QuizResponses.objects.filter(
+                    user=request.user,
+                    question_id__in=[response.question_id for response in responses]
+                ).count()
+                QuizResponses.objects.bulk_create(
+                    responses,
+                    update_conflicts=True,
+                    unique_fields=['user', 'question'],
+                    update_fields=['selected_answer', 'is_correct', 'updated_at', 'updated_by', 'deleted_at', 'deleted_by']
+                )
+                # Course progress counts each question once; final assessments are not part of it
+                if quiz.module_id and len(responses) > already_answered:
+                    UserCourseProgress.apply_delta(
+                        request.user.pk, course_id, answered_questions=len(responses) - already_answered
+                    )
+                mark_dirty(request.user.pk, quiz.module_id)
+                analytics.mark_stale(quiz.pk)
+
+            return Response({
+                "status": "ok",
+                "message": "Answers submitted successfully",
+                "data": {
+                    "quiz": str(quiz.guid),
+                    "answered": len(results),
+                    "total_questions": len(answer_key),
+                    "correct": sum(result["is_correct"] for result in results),
+                    "score": sum(result["marks"] for result in results),
+                    "total_marks": sum(entry['marks'] for entry in answer_key.values()),
+                    "results": results
+                }
+            }, status=HTTP_200_OK)
+
         except Exception as e:
             return Response({
                 "status": "Failed",
-                "message": "Failed to submit answer",
+                "message": "Failed to submit answers",
                 "data": str(e)
             }, status=HTTP_400_BAD_REQUEST)
 
@@ -2289,16 +2407,10 @@ class MarkTopicComplete(ProtectedAuthView):
                 module=topic.module
             )
             
-            # Add topic to completed list if not already there
-            # if str(topic.guid) not in module_progress.topics_completed_guids:
-            #     module_progress.topics_completed.append(str(topic.guid))
-            #     module_progress.save()
-            completed = [str(t) for t in module_progress.topics_completed or []]
-
-            if str(topic.guid) not in completed:
-                completed.append(str(topic.guid))
-                module_progress.topics_completed = completed
+            # Insert-if-absent, so concurrent completions can't lose or double count a topic
+            if UserTopicCompletion.complete(request.user, topic):
                 module_progress.update_topic_progress()
+                UserCourseProgress.apply_delta(request.user.pk, topic.module.course_id, completed_topics=1)
             
             return Response({
                 "status": "ok",
@@ -2335,7 +2447,7 @@ class PublicCourses(FreeAuthView):
             queryset = Courses.objects.filter(
                 deleted_at__isnull=True,
                 status='PUBLISHED'  # Only show published courses
-            ).select_related('instructor')
+            )
             
             # Apply filters
             featured = request.query_params.get('featured')
@@ -2346,10 +2458,11 @@ class PublicCourses(FreeAuthView):
             if expertise_level:
                 queryset = queryset.filter(expertise_level=expertise_level)
             
-            courses = queryset[:20]  # Limit to 20 courses
+            queryset = PublicCourseSerializer.setup_eager_loading(queryset, user=user_context)
+            courses = self.paginate_queryset(queryset)
             serializer = self.serializer_class(courses, many=True,context={'user': user_context})
             
-            return Response(serializer.data, status=HTTP_200_OK)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -2360,6 +2473,7 @@ class PublicCourses(FreeAuthView):
 
 class FeaturedCourses(FreeAuthView):
     serializer_class = PublicCourseSerializer
+    page_size = 10
     
     def get(self, request, format=None):
         """
@@ -2371,11 +2485,13 @@ class FeaturedCourses(FreeAuthView):
                 deleted_at__isnull=True,
                 status='PUBLISHED',
                 isFeatured=True
-            ).select_related('instructor')[:10]  # Limit to 10 featured courses
+            )
+            queryset = PublicCourseSerializer.setup_eager_loading(queryset, user=user_context)
+            courses = self.paginate_queryset(queryset)
             
-            serializer = self.serializer_class(queryset, many=True,context={'user': user_context})
+            serializer = self.serializer_class(courses, many=True,context={'user': user_context})
             
-            return Response(serializer.data, status=HTTP_200_OK)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -2418,6 +2534,7 @@ class FeaturedCourses(FreeAuthView):
 
 class CourseEnrollments(ProtectedAuthView):
     serializer_class = CourseEnrollmentSerializer
+    pagination_ordering = ('-enrolled_at', '-id')
     
     def get(self, request, course_guid, format=None):
         """
@@ -2431,19 +2548,23 @@ class CourseEnrollments(ProtectedAuthView):
                 # Add role-based permission check here for admin users
                 pass
             
-            enrollments = UsersCourseEnrollment.objects.filter(
+            enrollments = CourseEnrollmentSerializer.setup_eager_loading(UsersCourseEnrollment.objects.filter(
                 course=course,
                 deleted_at__isnull=True
-            ).select_related('user', 'course').order_by('-enrolled_at')
+            ))
+            page = self.paginate_queryset(enrollments)
             
-            quiz_submissions_data = self.serializer_class(enrollments, many=True)
+            quiz_submissions_data = self.serializer_class(page, many=True)
+            paginated = self.paginator.get_paginated_data(quiz_submissions_data.data)
             
             return Response({
                 'course': {
                     'guid': str(course.guid),
                     'title': course.title
                 },
-                'quizzes': quiz_submissions_data.data
+                'quizzes': paginated['results'],
+                'next': paginated['next'],
+                'page_size': paginated['page_size']
             }, status=HTTP_200_OK)
             
         except Exception as e:
@@ -2454,6 +2575,155 @@ class CourseEnrollments(ProtectedAuthView):
             }, status=HTTP_400_BAD_REQUEST)
 
 
+class CourseEnrollmentsExport(ProtectedAuthView):
+    """Download a course's enrollments with progress (for instructors)"""
+    
+    def get(self, request, course_guid, format=None):
+        """Stream the enrollments as CSV, or as XLSX with ?file_type=xlsx"""
+        try:
+            file_type = request.query_params.get('file_type', 'csv').lower()
+            if file_type not in exports.FILE_TYPES:
+                return Response({
+                    "status": "Failed",
+                    "message": "Invalid file type",
+                    "data": f"file_type must be one of {', '.join(exports.FILE_TYPES)}"
+                }, status=HTTP_400_BAD_REQUEST)
+            
+            course = get_object_or_404(Courses, guid=course_guid, deleted_at__isnull=True)
+            if course.instructor_id != request.user.pk and not request.user.is_staff:
+                return Response({
+                    "status": "Failed",
+                    "message": "Access denied",
+                    "data": "Only course instructors can export enrollments"
+                }, status=HTTP_403_FORBIDDEN)
+            
+            # Progress is read from the UserCourseProgress counters in the same query
+            enrollments = UsersCourseEnrollment.objects.filter(
+                course=course,
+                deleted_at__isnull=True
+            ).annotate(
+                progress=UserCourseProgress.percentage_subquery(OuterRef('user'), OuterRef('course'))
+            ).order_by('enrolled_at', 'id').values_list(
+                'user__guid', 'user__first_name', 'user__last_name', 'user__email', 'enrolled_at', 'progress'
+            ).iterator(chunk_size=exports.CHUNK_SIZE)
+            
+            def rows():
+                for guid, first_name, last_name, email, enrolled_at, progress in enrollments:
+                    yield (guid, f"{first_name} {last_name}", email, enrolled_at, round(progress, 2) if progress is not None else None)
+            
+            return exports.export_response(
+                file_type,
+                f"{slugify(course.title) or 'course'}-enrollments",
+                ['User GUID', 'Name', 'Email', 'Enrolled At', 'Progress %'],
+                rows(),
+                title='Enrollments'
+            )
+            
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Error exporting enrollments",
+                "data": str(e)
+            }, status=HTTP_400_BAD_REQUEST)
+
+
+class CourseGradebook(ProtectedAuthView):
+    """Learners x quizzes score matrix of a course (for instructors)"""
+    pagination_ordering = ('enrolled_at', 'id')
+    
+    def get(self, request, course_guid, format=None):
+        """
+        One page of enrolled learners with a score per quiz, aligned with `quizzes`.
+        A null score means the learner has not answered that quiz.
+        """
+        try:
+            course = get_object_or_404(Courses, guid=course_guid, deleted_at__isnull=True)
+            if course.instructor_id != request.user.pk and not request.user.is_staff:
+                return Response({
+                    "status": "Failed",
+                    "message": "Access denied",
+                    "data": "Only course instructors can view the gradebook"
+                }, status=HTTP_403_FORBIDDEN)
+            
+            # Module quizzes in module order, then the course's final assessments
+            quizzes = list(ModuleQuizes.objects.filter(
+                Q(module__course=course, module__deleted_at__isnull=True) | Q(course=course, module__isnull=True),
+                deleted_at__isnull=True
+            ).select_related('module').annotate(
+                max_marks=Coalesce(Sum('quizquestions__marks', filter=Q(quizquestions__deleted_at__isnull=True)), 0)
+            ).order_by(F('module__order').asc(nulls_last=True), 'id'))
+            
+            page = self.paginate_queryset(UsersCourseEnrollment.objects.filter(
+                course=course,
+                deleted_at__isnull=True
+            ).values('id', 'enrolled_at', 'user_id', 'user__guid', 'user__first_name', 'user__last_name', 'user__email'))
+            
+            # One grouped query for the whole page: marks earned per (learner, quiz)
+            learner_index = {row['user_id']: position for position, row in enumerate(page)}
+            quiz_index = {quiz.pk: position for position, quiz in enumerate(quizzes)}
+            scores = QuizResponses.objects.filter(
+                user_id__in=list(learner_index),
+                question__quiz_id__in=list(quiz_index),
+                question__deleted_at__isnull=True,
+                deleted_at__isnull=True
+            ).values('user_id', 'question__quiz_id').annotate(
+                score=Coalesce(Sum('question__marks', filter=Q(is_correct=True)), 0)
+            ).values_list('user_id', 'question__quiz_id', 'score')
+            
+            matrix = np.full((len(page), len(quizzes)), np.nan)
+            cells = np.array(list(scores), dtype=np.float64).reshape(-1, 3)
+            if len(cells):
+                rows = np.fromiter((learner_index[user_id] for user_id in cells[:, 0].astype(np.int64)), dtype=np.int64, count=len(cells))
+                columns = np.fromiter((quiz_index[quiz_id] for quiz_id in cells[:, 1].astype(np.int64)), dtype=np.int64, count=len(cells))
+                matrix[rows, columns] = cells[:, 2]
+            
+            max_marks = np.array([quiz.max_marks for quiz in quizzes], dtype=np.float64)
+            totals = np.nansum(matrix, axis=1)
+            percentages = totals * 100 / max_marks.sum() if max_marks.sum() else np.zeros(len(page))
+            # NaN -> None so unanswered quizzes serialize as null
+            score_rows = np.where(np.isnan(matrix), None, matrix).tolist()
+            
+            learners = [
+                {
+                    'guid': str(row['user__guid']),
+                    'name': f"{row['user__first_name']} {row['user__last_name']}",
+                    'email': row['user__email'],
+                    'scores': score_rows[position],
+                    'total': float(totals[position]),
+                    'percentage': round(float(percentages[position]), 2)
+                }
+                for position, row in enumerate(page)
+            ]
+            paginated = self.paginator.get_paginated_data(learners)
+            
+            return Response({
+                'course': {
+                    'guid': str(course.guid),
+                    'title': course.title
+                },
+                'quizzes': [
+                    {
+                        'guid': str(quiz.guid),
+                        'name': quiz.name,
+                        'module_name': quiz.module.name if quiz.module_id else None,
+                        'max_marks': quiz.max_marks
+                    }
+                    for quiz in quizzes
+                ],
+                'total_marks': int(max_marks.sum()),
+                'learners': paginated['results'],
+                'next': paginated['next'],
+                'page_size': paginated['page_size']
+            }, status=HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Error retrieving gradebook",
+                "data": str(e)
+            }, status=HTTP_400_BAD_REQUEST)
+
+
 # =============================================================================
 # COURSE DISCUSSION VIEWS
 # =============================================================================
@@ -2507,9 +2777,10 @@ class AllCourseDiscussions(ProtectedAuthView):
             
             # Optimize queries
             optimized_queryset = CourseDiscussionSerializer.setup_eager_loading(queryset)
+            page = self.paginate_queryset(optimized_queryset)
             
-            serializer = self.serializer_class(optimized_queryset, many=True)
-            return Response(serializer.data, status=HTTP_200_OK)
+            serializer = self.serializer_class(page, many=True)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             return Response({
@@ -2697,6 +2968,7 @@ class DeleteCourseDiscussion(ProtectedAuthView):
 
 class CourseQuizSubmissions(ProtectedAuthView):
     """Get all quiz submissions for all quizzes in a course (for instructors)"""
+    pagination_ordering = ('-submitted_at', '-user_id')
     
     def get(self, request, course_guid, format=None):
         """Get quiz submissions summary for all quizzes in the course"""
@@ -2705,7 +2977,7 @@ class CourseQuizSubmissions(ProtectedAuthView):
             course = get_object_or_404(Courses, guid=course_guid, deleted_at__isnull=True)
             
             # Check if user is the instructor of this course
-            if course.instructor != request.user:
+            if course.instructor_id != request.user.pk:
                 return Response({
                     "status": "Failed",
                     "message": "Access denied",
@@ -2713,76 +2985,50 @@ class CourseQuizSubmissions(ProtectedAuthView):
                 }, status=HTTP_403_FORBIDDEN)
             
             # Get all quizzes for this course
-            quizzes = ModuleQuizes.objects.filter(
+            quizzes = list(ModuleQuizes.objects.filter(
                 module__course=course,
                 deleted_at__isnull=True
-            ).select_related('module')
+            ).select_related('module').annotate(
+                total_questions=Count('quizquestions', filter=Q(quizquestions__deleted_at__isnull=True))
+            ).order_by('module__order', 'id'))
+            
+            # First page of every quiz's learners from one grouped aggregate; the per-quiz `next`
+            # cursor continues on quizzes/<quiz_guid>/submissions/
+            paginator = self.paginator
+            paginator.ordering = self.pagination_ordering
+            page_size = paginator.get_page_size(request, self)
+            rows = QuizResponses.submission_summary([quiz.pk for quiz in quizzes]).annotate(
+                position=Window(RowNumber(), partition_by=F('quiz_id'), order_by=[F('submitted_at').desc(), F('user_id').desc()]),
+                submissions_count=Window(Count('*'), partition_by=F('quiz_id'))
+            ).filter(position__lte=page_size).order_by('quiz_id', 'position')
+            
+            rows_by_quiz = defaultdict(list)
+            for row in rows:
+                rows_by_quiz[row['quiz_id']].append(row)
             
             quiz_submissions_data = []
-            
             for quiz in quizzes:
-                # Get unique users who have submitted responses for this quiz
-                submitted_users = QuizResponses.objects.filter(
-                    question__quiz=quiz,
-                    deleted_at__isnull=True
-               
-                ).values('user').distinct()
-                
-                quiz_data = {
+                quiz_rows = rows_by_quiz.get(quiz.pk, [])
+                submissions_count = quiz_rows[0]['submissions_count'] if quiz_rows else 0
+                quiz_submissions_data.append({
                     'quiz': {
                         'guid': str(quiz.guid),
                         'name': quiz.name,
                         'module_name': quiz.module.name,
-                        'total_questions': quiz.quizquestions_set.filter(deleted_at__isnull=True).count()
+                        'total_questions': quiz.total_questions
                     },
-                    'submissions_count': len(submitted_users),
-                    'submitted_users': []
-                }
-                
-                for user_data in submitted_users:
-                    user = Users.objects.get(id=user_data['user'])
-                    
-                    # Calculate user's performance for this quiz
-                    user_responses = QuizResponses.objects.filter(
-                        user=user,
-                        question__quiz=quiz,
-                        deleted_at__isnull=True
-                    )
-                    
-                    total_questions = quiz.quizquestions_set.filter(deleted_at__isnull=True).count()
-                    answered_questions = user_responses.count()
-                    correct_answers = user_responses.filter(is_correct=True).count()
-                    score_percentage = (correct_answers / total_questions * 100) if total_questions > 0 else 0
-                    
-                    # Check if feedback exists
-                    has_feedback = QuizSubmissionFeedback.objects.filter(
-                        user=user,
-                        quiz=quiz,
-                        deleted_at__isnull=True
-                    ).exists()
-                    
-                    quiz_data['submitted_users'].append({
-                        'user': {
-                            'guid': str(user.guid),
-                            'name': f"{user.first_name} {user.last_name}",
-                            'email': user.email
-                        },
-                        'answered_questions': answered_questions,
-                        'total_questions': total_questions,
-                        'correct_answers': correct_answers,
-                        'score_percentage': round(score_percentage, 2),
-                        'has_feedback': has_feedback,
-                        'submitted_at': user_responses.order_by('-answered_at').first().answered_at if user_responses.exists() else None
-                    })
-                
-                quiz_submissions_data.append(quiz_data)
+                    'submissions_count': submissions_count,
+                    'submitted_users': [quiz_submission_summary(row, quiz.total_questions) for row in quiz_rows],
+                    'next': paginator.encode_cursor(quiz_rows[-1]) if submissions_count > len(quiz_rows) else None
+                })
             
             return Response({
                 'course': {
                     'guid': str(course.guid),
                     'title': course.title
                 },
-                'quizzes': quiz_submissions_data
+                'quizzes': quiz_submissions_data,
+                'page_size': page_size
             }, status=HTTP_200_OK)
             
         except Exception as e:
@@ -2795,12 +3041,19 @@ class CourseQuizSubmissions(ProtectedAuthView):
 
 class QuizSubmissions(ProtectedAuthView):
     """Get all submissions for a specific quiz (for instructors)"""
+    pagination_ordering = ('-submitted_at', '-user_id')
     
     def get(self, request, quiz_guid, format=None):
-        """Get detailed submissions for a specific quiz"""
+        """Get detailed submissions for a specific quiz, newest first"""
         try:
             # Get the quiz and verify instructor ownership
-            quiz = get_object_or_404(ModuleQuizes, guid=quiz_guid, deleted_at__isnull=True)
+            quiz = get_object_or_404(
+                ModuleQuizes.objects.select_related('module__course', 'course').annotate(
+                    total_questions=Count('quizquestions', filter=Q(quizquestions__deleted_at__isnull=True))
+                ),
+                guid=quiz_guid,
+                deleted_at__isnull=True
+            )
             
             # Check if user is the instructor of the course that contains this quiz
             # if quiz.module.course.instructor != request.user:
@@ -2810,70 +3063,43 @@ class QuizSubmissions(ProtectedAuthView):
             #         "data": "Only course instructors can view quiz submissions"
                 # }, status=HTTP_403_FORBIDDEN)
             
-            # Get unique users who have submitted responses for this quiz
-            submitted_users = QuizResponses.objects.filter(
-                question__quiz=quiz,
-                deleted_at__isnull=True
-            ).values('user').distinct()
-            
-            submissions_data = []
-            total_questions = quiz.quizquestions_set.filter(deleted_at__isnull=True).count()
+            # One grouped row per learner, keyset paginated on the latest answer
+            page = self.paginate_queryset(QuizResponses.submission_summary([quiz.pk]))
             
-            for user_data in submitted_users:
-                user = Users.objects.get(id=user_data['user'])
-                
-                # Get user's responses for this quiz
-                user_responses = QuizResponses.objects.filter(
-                    user=user,
-                    question__quiz=quiz,
-                    deleted_at__isnull=True
-                ).select_related('question').order_by('question__order')
-                
-                answered_questions = user_responses.count()
-                correct_answers = user_responses.filter(is_correct=True).count()
-                score_percentage = (correct_answers / total_questions * 100) if total_questions > 0 else 0
-                
-                # Get feedback if it exists
-                feedback = QuizSubmissionFeedback.objects.filter(
-                    user=user,
+            feedbacks = {
+                feedback.user_id: feedback
+                for feedback in QuizSubmissionFeedback.objects.filter(
                     quiz=quiz,
+                    user_id__in=[row['user_id'] for row in page if row['has_feedback']],
                     deleted_at__isnull=True
-                ).first()
-                
-                submission_data = {
-                    'user': {
-                        'guid': str(user.guid),
-                        'name': f"{user.first_name} {user.last_name}",
-                        'email': user.email
-                    },
-                    'total_questions': total_questions,
-                    'answered_questions': answered_questions,
-                    'correct_answers': correct_answers,
-                    'score_percentage': round(score_percentage, 2),
-                    'submitted_at': user_responses.order_by('-answered_at').first().answered_at if user_responses.exists() else None,
-                    'has_feedback': feedback is not None,
-                    'feedback': {
-                        'feedback': feedback.feedback,
-                        'score': feedback.score,
-                        'created_at': feedback.created_at
-                    } if feedback else None
-                }
-                
-                submissions_data.append(submission_data)
+                )
+            }
             
-            # Sort by submission date (newest first)
-            submissions_data.sort(key=lambda x: x['submitted_at'] or timezone.now(), reverse=True)
+            submissions_data = []
+            for row in page:
+                submission_data = quiz_submission_summary(row, quiz.total_questions)
+                feedback = feedbacks.get(row['user_id'])
+                submission_data['feedback'] = {
+                    'feedback': feedback.feedback,
+                    'score': feedback.score,
+                    'created_at': feedback.created_at
+                } if feedback else None
+                submissions_data.append(submission_data)
+            paginated = self.paginator.get_paginated_data(submissions_data)
             
+            course = quiz.module.course if quiz.module_id else quiz.course
             return Response({
                 'quiz': {
                     'guid': str(quiz.guid),
                     'name': quiz.name,
                     'description': quiz.description,
-                    'module_name': quiz.module.name,
-                    'course_title': quiz.module.course.title,
-                    'total_questions': total_questions
+                    'module_name': quiz.module.name if quiz.module_id else None,
+                    'course_title': course.title if course else None,
+                    'total_questions': quiz.total_questions
                 },
-                'submissions': submissions_data
+                'submissions': paginated['results'],
+                'next': paginated['next'],
+                'page_size': paginated['page_size']
             }, status=HTTP_200_OK)
             
         except Exception as e:
@@ -2884,6 +3110,119 @@ class QuizSubmissions(ProtectedAuthView):
             }, status=HTTP_400_BAD_REQUEST)
 
 
+class QuizItemAnalysis(ProtectedAuthView):
+    """Per-question statistics of a quiz (for instructors)"""
+    
+    def get(self, request, quiz_guid, format=None):
+        """Get the cached item analysis of a quiz; 202 while it is first being computed"""
+        try:
+            quiz = get_object_or_404(
+                ModuleQuizes.objects.select_related('module__course', 'course'),
+                guid=quiz_guid,
+                deleted_at__isnull=True
+            )
+            course = quiz.module.course if quiz.module_id else quiz.course
+            
+            # Only the instructor of the course that contains this quiz, or staff
+            if course is None or (course.instructor_id != request.user.pk and not request.user.is_staff):
+                return Response({
+                    "status": "Failed",
+                    "message": "Access denied",
+                    "data": "Only course instructors can view quiz analysis"
+                }, status=HTTP_403_FORBIDDEN)
+            
+            analysis = analytics.get_item_analysis(quiz.pk)
+            if analysis is None:
+                analytics.request_refresh(quiz.pk)
+                analysis = analytics.get_item_analysis(quiz.pk)
+            if analysis is None:
+                return Response({
+                    "status": "ok",
+                    "message": "Item analysis is being computed, try again shortly",
+                    "data": None
+                }, status=HTTP_202_ACCEPTED)
+            
+            return Response({
+                "status": "ok",
+                "message": "Item analysis retrieved successfully",
+                "data": {
+                    'quiz': {
+                        'guid': str(quiz.guid),
+                        'name': quiz.name
+                    },
+                    **analysis
+                }
+            }, status=HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Error retrieving item analysis",
+                "data": str(e)
+            }, status=HTTP_400_BAD_REQUEST)
+
+
+class QuizSubmissionsExport(ProtectedAuthView):
+    """Download every submission of a quiz with the instructor's feedback score (for instructors)"""
+    
+    def get(self, request, quiz_guid, format=None):
+        """Stream the quiz submissions as CSV, or as XLSX with ?file_type=xlsx"""
+        try:
+            file_type = request.query_params.get('file_type', 'csv').lower()
+            if file_type not in exports.FILE_TYPES:
+                return Response({
+                    "status": "Failed",
+                    "message": "Invalid file type",
+                    "data": f"file_type must be one of {', '.join(exports.FILE_TYPES)}"
+                }, status=HTTP_400_BAD_REQUEST)
+            
+            quiz = get_object_or_404(
+                ModuleQuizes.objects.select_related('module__course', 'course').annotate(
+                    total_questions=Count('quizquestions', filter=Q(quizquestions__deleted_at__isnull=True))
+                ),
+                guid=quiz_guid,
+                deleted_at__isnull=True
+            )
+            course = quiz.module.course if quiz.module_id else quiz.course
+            if course is None or (course.instructor_id != request.user.pk and not request.user.is_staff):
+                return Response({
+                    "status": "Failed",
+                    "message": "Access denied",
+                    "data": "Only course instructors can export quiz submissions"
+                }, status=HTTP_403_FORBIDDEN)
+            
+            feedbacks = QuizSubmissionFeedback.objects.filter(user_id=OuterRef('user_id'), quiz=quiz, deleted_at__isnull=True)
+            submissions = QuizResponses.submission_summary([quiz.pk]).annotate(
+                feedback_score=Subquery(feedbacks.values('score')[:1]),
+                feedback=Subquery(feedbacks.values('feedback')[:1])
+            ).order_by('-submitted_at', '-user_id').iterator(chunk_size=exports.CHUNK_SIZE)
+            
+            def rows():
+                for row in submissions:
+                    summary = quiz_submission_summary(row, quiz.total_questions)
+                    yield (
+                        summary['user']['guid'], summary['user']['name'], summary['user']['email'],
+                        summary['answered_questions'], summary['total_questions'], summary['correct_answers'],
+                        summary['score_percentage'], summary['submitted_at'], row['feedback_score'], row['feedback']
+                    )
+            
+            return exports.export_response(
+                file_type,
+                f"{slugify(quiz.name) or 'quiz'}-submissions",
+                ['User GUID', 'Name', 'Email', 'Answered Questions', 'Total Questions', 'Correct Answers',
+                 'Score %', 'Submitted At', 'Feedback Score', 'Feedback'],
+                rows(),
+                title='Submissions'
+            )
+            
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Error exporting quiz submissions",
+                "data": str(e)
+            }, status=HTTP_400_BAD_REQUEST)
+
+
 class UserQuizSubmissionDetail(ProtectedAuthView):
     """Get detailed submission for a specific user and quiz (for instructors)"""
     
@@ -3143,6 +3482,9 @@ class AddQuizFeedback(ProtectedAuthView):
 class UploadCourseResources(ProtectedAuthView):
 
     def post(self, request, format=None):
+        """
+        Upload a resource through the API; large files should use CreateUploadSession instead
+        """
         try:
             resource_type = request.data.get("type")
             uploaded_file = request.FILES.get("file")
@@ -3161,39 +3503,224 @@ class UploadCourseResources(ProtectedAuthView):
                     "message": "No file provided"
                 }, status=HTTP_400_BAD_REQUEST)
             
-            file_data = uploaded_file.read()
-            file_name = uploaded_file.name
+            # Stage the file and let a Celery worker push it to storage; poll the job for its URL
+            job = uploads.queue_job(request.user, resource_type, uploaded_file)
 
-            # Upload based on type
-            if resource_type in ["file", "audio"]:
-                file_url = upload_file_to_minio_task(
-                    file_data, file_name,
+            return Response({
+                "status": "OK",
+                "message": "File upload queued",
+                "data": {
+                    "type": resource_type,
+                    "url": None,
+                    "job": UploadJobSerializer(job).data,
+                    "status_url": request.build_absolute_uri(reverse('main:upload_job_status', kwargs={'guid': job.guid}))
+                }
+            }, status=HTTP_202_ACCEPTED)
+
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": str(e)
+            }, status=HTTP_400_BAD_REQUEST)
+
+
+class UploadJobStatus(ProtectedAuthView):
+    serializer_class = UploadJobSerializer
+
+    def get(self, request, guid, format=None):
+        """
+        Status of a queued upload, with the file URL once it is done
+        """
+        try:
+            job = get_object_or_404(UploadJob, guid=guid, user=request.user)
+            return Response({
+                "status": "OK",
+                "message": "Upload job retrieved successfully",
+                "data": UploadJobSerializer(job).data
+            }, status=HTTP_200_OK)
+
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Upload job not found",
+                "data": str(e)
+            }, status=HTTP_404_NOT_FOUND)
+
+
+class CreateUploadSession(ProtectedAuthView):
+    serializer_class = CreateUploadSessionSerializer
+
+    def post(self, request, format=None):
+        """
+        Open a direct upload: returns a URL the browser sends the file to without going through the API
+        """
+        try:
+            serializer = self.serializer_class(data=request.data)
+            if not serializer.is_valid():
+                return Response({
+                    "status": "Failed",
+                    "message": "Invalid data",
+                    "data": serializer.errors
+                }, status=HTTP_400_BAD_REQUEST)
+            data = serializer.validated_data
+
+            topic = None
+            if data.get('topic'):
+                topic = get_object_or_404(
+                    ModuleTopics.objects.select_related('module__course'),
+                    guid=data['topic'],
+                    deleted_at__isnull=True
                 )
-            else:
-                if resource_type == 'image':
-                    file_url = upload_image_to_cloudflare_task(
-                        file_data, file_name,
-                    )
-                else:
-                    file_url = upload_video_to_cloudflare_task(
-                        file_data, file_name,
-                    )
+                if topic.module.course.instructor_id != request.user.pk and not request.user.is_staff:
+                    return Response({
+                        "status": "Failed",
+                        "message": "Access denied",
+                        "data": "Only course instructors can upload topic resources"
+                    }, status=HTTP_403_FORBIDDEN)
 
+            session, upload = self.start_upload(request, data, topic)
             return Response({
                 "status": "OK",
-                "message": "File uploaded successfully",
+                "message": "Upload session created",
                 "data": {
-                    "type": resource_type,
-                    "url": file_url
+                    **UploadSessionSerializer(session).data,
+                    "upload": upload
                 }
+            }, status=HTTP_201_CREATED)
+
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Upload session not created",
+                "data": str(e)
+            }, status=HTTP_400_BAD_REQUEST)
+
+    def start_upload(self, request, data, topic):
+        return uploads.start_session(
+            request.user, data['type'], data['file_name'],
+            size=data.get('size'), content_type=data.get('content_type'), topic=topic
+        )
+
+
+class CreateResumableUpload(CreateUploadSession):
+    serializer_class = ResumableUploadSerializer
+
+    def post(self, request, format=None):
+        """
+        Open a resumable upload: the file is then sent in chunks with PATCH to the returned Location
+        """
+        response = super().post(request, format)
+        if response.status_code == HTTP_201_CREATED:
+            response['Location'] = response.data['data']['upload']['url']
+            response['Tus-Resumable'] = uploads.TUS_VERSION
+        return response
+
+    def start_upload(self, request, data, topic):
+        session = uploads.start_resumable(
+            request.user, data['type'], data['file_name'], data['size'],
+            content_type=data.get('content_type'), topic=topic
+        )
+        return session, {
+            'method': 'PATCH',
+            'url': request.build_absolute_uri(reverse('main:resumable_upload', kwargs={'guid': session.guid})),
+            'headers': {'Content-Type': uploads.CHUNK_CONTENT_TYPE, 'Tus-Resumable': uploads.TUS_VERSION},
+            'chunk_size': max(settings.MINIO_UPLOAD_PART_SIZE, uploads.MIN_CHUNK_SIZE),
+        }
+
+
+class ResumableUpload(ProtectedAuthView):
+
+    def progress_headers(self, response, session):
+        response['Upload-Offset'] = str(session.offset)
+        response['Upload-Length'] = str(session.size)
+        response['Tus-Resumable'] = uploads.TUS_VERSION
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def head(self, request, guid, format=None):
+        """
+        How many bytes of the upload are stored, in the Upload-Offset header
+        """
+        try:
+            session = get_object_or_404(UploadSession, guid=guid, user=request.user, resumable=True)
+            return self.progress_headers(Response(status=HTTP_200_OK), session)
+
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Upload not found",
+                "data": str(e)
+            }, status=HTTP_404_NOT_FOUND)
+
+    def patch(self, request, guid, format=None):
+        """
+        Store the chunk in the request body at the Upload-Offset header; a chunk for any other offset gets 409
+        """
+        try:
+            if request.content_type != uploads.CHUNK_CONTENT_TYPE:
+                return Response({
+                    "status": "Failed",
+                    "message": "Invalid content type",
+                    "data": f"Chunks must be sent as {uploads.CHUNK_CONTENT_TYPE}"
+                }, status=HTTP_400_BAD_REQUEST)
+
+            session = get_object_or_404(
+                UploadSession.objects.select_related('topic'),
+                guid=guid,
+                user=request.user,
+                resumable=True
+            )
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+
+            # The body is read straight from the socket in upload parts, never as request.body
+            try:
+                session = uploads.write_chunk(session, offset, request.stream, length)
+            except uploads.UploadConflict as e:
+                response = Response({
+                    "status": "Failed",
+                    "message": "Offset mismatch",
+                    "data": str(e)
+                }, status=HTTP_409_CONFLICT)
+                return self.progress_headers(response, session)
+
+            return self.progress_headers(Response({
+                "status": "OK",
+                "message": "File uploaded successfully" if session.status == 'completed' else "Chunk stored",
+                "data": UploadSessionSerializer(session).data
+            }, status=HTTP_200_OK), session)
+
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Chunk not stored",
+                "data": str(e)
+            }, status=HTTP_400_BAD_REQUEST)
+
+
+class CompleteUploadSession(ProtectedAuthView):
+
+    def post(self, request, guid, format=None):
+        """
+        Verify a direct upload reached storage and attach it to its topic
+        """
+        try:
+            session = get_object_or_404(UploadSession.objects.select_related('topic'), guid=guid, user=request.user)
+            session = uploads.complete_session(session)
+            return Response({
+                "status": "OK",
+                "message": "File uploaded successfully",
+                "data": UploadSessionSerializer(session).data
             }, status=HTTP_200_OK)
 
         except Exception as e:
             return Response({
                 "status": "Failed",
-                "message": str(e)
+                "message": "Upload not completed",
+                "data": str(e)
             }, status=HTTP_400_BAD_REQUEST)
-        
+
+
 class DeleteCourseResources(ProtectedAuthView):
 
     def delete(self, request, format=None):
@@ -3246,6 +3773,13 @@ class FileHandlerGet(ProtectedAuthView):
     serializer_class = FilePathSerializer
     def post(self, request, format=None):
         try:
+            if not uploads.readable_files(request.user, [request.data['file_path']]):
+                return Response({
+                    "status": "Failed",
+                    "message": "Access denied",
+                    "data": "You don't have access to this file"
+                }, status=HTTP_403_FORBIDDEN)
+
             # remove leading word before first slash
             file_path = request.data['file_path'].split('/', 1)[-1]
             presigned_url = get_from_minio(file_path)
@@ -3265,4 +3799,40 @@ class FileHandlerGet(ProtectedAuthView):
             }, status=HTTP_400_BAD_REQUEST)
 
 
+class FileHandlerBatchGet(ProtectedAuthView):
+    serializer_class = FilePathsSerializer
+
+    def post(self, request, format=None):
+        """
+        Presigned URLs for every file of a page in one request, keyed by the paths sent
+        """
+        try:
+            serializer = self.serializer_class(data=request.data)
+            if not serializer.is_valid():
+                return Response({
+                    "status": "Failed",
+                    "message": "Invalid data",
+                    "data": serializer.errors
+                }, status=HTTP_400_BAD_REQUEST)
+
+            file_paths = serializer.validated_data['file_paths']
+            denied = set(file_paths) - uploads.readable_files(request.user, file_paths)
+            if denied:
+                return Response({
+                    "status": "Failed",
+                    "message": "Access denied",
+                    "data": sorted(denied)
+                }, status=HTTP_403_FORBIDDEN)
 
+            # remove leading word (the bucket) before first slash
+            object_names = {file_path: file_path.split('/', 1)[-1] for file_path in file_paths}
+            presigned_urls = presign_from_minio(set(object_names.values()))
+            return JsonResponse({'presignedUrls': {
+                file_path: presigned_urls[object_name] for file_path, object_name in object_names.items()
+            }})
+        except Exception as e:
+            return Response({
+                "status": "Failed",
+                "message": "Request has failed",
+                "data": f"{e}"
+            }, status=HTTP_400_BAD_REQUEST)